@@ -0,0 +1,152 @@
+"""
+同期版MyExchangeと非同期版AsyncMyExchangeの「足確定 → 注文送信」レイテンシの比較
+
+各リクエストに一定の遅延を入れたローカルの偽取引所を使い、
+1サイクル分(最新足の取得 → ポジション確認 → 成行注文)にかかる時間を計測する。
+
+実行例:
+    uv run python -m benchmarks.bench_async_exchange
+    uv run python -m benchmarks.bench_async_exchange --latency-ms 80 --cycles 20
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from unittest.mock import MagicMock
+
+from src.config.config import ExchangeConfig
+from src.exchanges.async_my_exchange import AsyncMyExchange
+from src.exchanges.my_exchange import MyExchange
+
+SYMBOL = "BTCUSDT"
+
+
+class _FakeExchangeBase:
+    """遅延以外の応答を返す偽取引所の共通部分"""
+
+    id = "fake"
+    has = {"fetchPosition": True, "fetchBalance": True}
+
+    def __init__(self, latency_sec: float):
+        self.latency_sec = latency_sec
+
+    @staticmethod
+    def _ohlcv(limit):
+        now = int(time.time() * 1000) // 60000 * 60000
+        return [
+            [now - (limit - i) * 60000, 100.0, 101.0, 99.0, 100.5, 1.0]
+            for i in range(limit)
+        ]
+
+    @staticmethod
+    def _order(side, amount):
+        return {"id": "1", "side": side, "amount": amount, "status": "closed"}
+
+
+class FakeSyncExchange(_FakeExchangeBase):
+    def fetch_ohlcv(self, symbol, timeframe="1m", since=None, limit=None):
+        time.sleep(self.latency_sec)
+        return self._ohlcv(limit)
+
+    def fetch_position(self, symbol):
+        time.sleep(self.latency_sec)
+        return {"contracts": 0, "side": None}
+
+    def fetch_ticker(self, symbol):
+        time.sleep(self.latency_sec)
+        return {"last": 100.5}
+
+    def create_market_buy_order(self, symbol, amount, params=None):
+        time.sleep(self.latency_sec)
+        return self._order("buy", amount)
+
+
+class FakeAsyncExchange(_FakeExchangeBase):
+    async def fetch_ohlcv(self, symbol, timeframe="1m", since=None, limit=None):
+        await asyncio.sleep(self.latency_sec)
+        return self._ohlcv(limit)
+
+    async def fetch_position(self, symbol):
+        await asyncio.sleep(self.latency_sec)
+        return {"contracts": 0, "side": None}
+
+    async def fetch_ticker(self, symbol):
+        await asyncio.sleep(self.latency_sec)
+        return {"last": 100.5}
+
+    async def create_market_buy_order(self, symbol, amount, params=None):
+        await asyncio.sleep(self.latency_sec)
+        return self._order("buy", amount)
+
+
+def _config() -> ExchangeConfig:
+    return ExchangeConfig(
+        name="fake",
+        api_key="",
+        api_secret="",
+        symbol=SYMBOL,
+        position_size=0.001,
+        leverage=1,
+        buy_leverage=1,
+        sell_leverage=1,
+        margin_type="cross",
+        timeframe="1m",
+        max_position=1,
+        retry_count=0,
+        retry_interval=0,
+        testnet=False,
+        dry_run=False,
+        simulation_initial_balance=0,
+        fee_rate=0,
+    )
+
+
+def bench_sync(latency_sec: float, cycles: int) -> list[float]:
+    """同期版: 最新足の取得、ポジション確認、注文を順番に行う"""
+    exchange = MyExchange(FakeSyncExchange(latency_sec), _config(), MagicMock())
+    elapsed = []
+    for _ in range(cycles):
+        start = time.perf_counter()
+        exchange.fetch_ohlcv(SYMBOL, timeframe="1m", limit=2)
+        exchange.place_order(SYMBOL, "long", 0.001)
+        elapsed.append(time.perf_counter() - start)
+    return elapsed
+
+
+async def bench_async(latency_sec: float, cycles: int) -> list[float]:
+    """非同期版: 最新足・ポジション・ティッカーを同時に取得してから注文する"""
+    exchange = AsyncMyExchange(FakeAsyncExchange(latency_sec), _config(), MagicMock())
+    elapsed = []
+    for _ in range(cycles):
+        start = time.perf_counter()
+        snapshot = await exchange.fetch_cycle_snapshot(SYMBOL, "1m")
+        await exchange.place_order(SYMBOL, "long", 0.001, snapshot=snapshot)
+        elapsed.append(time.perf_counter() - start)
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="足確定から注文送信までのレイテンシ比較"
+    )
+    parser.add_argument(
+        "--latency-ms", type=float, default=50, help="1リクエストあたりの遅延"
+    )
+    parser.add_argument("--cycles", type=int, default=10, help="計測するサイクル数")
+    args = parser.parse_args()
+
+    latency_sec = args.latency_ms / 1000
+    sync_elapsed = bench_sync(latency_sec, args.cycles)
+    async_elapsed = asyncio.run(bench_async(latency_sec, args.cycles))
+
+    sync_median = statistics.median(sync_elapsed) * 1000
+    async_median = statistics.median(async_elapsed) * 1000
+    print(f"latency per request: {args.latency_ms}ms, cycles: {args.cycles}")
+    print(f"sync  (MyExchange)     : {sync_median:8.1f}ms (median)")
+    print(f"async (AsyncMyExchange): {async_median:8.1f}ms (median)")
+    print(f"reduction              : {sync_median - async_median:8.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
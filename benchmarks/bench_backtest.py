@@ -0,0 +1,69 @@
+"""
+バックテストの処理速度(本/秒)のベンチマーク
+
+移動平均の大小で売買するストラテジーで、売買判断をentry_signals/exit_signalsで
+まとめて計算した場合(bulk)と、足ごとにshould_entry/should_exitを呼ぶ場合(per-bar)を比較する。
+per-barは遅いため--per-bar-max-barsまでの本数で計測する。
+
+実行例:
+    uv run python -m benchmarks.bench_backtest
+    uv run python -m benchmarks.bench_backtest --bars 525600  # 1分足1年分
+"""
+
+import argparse
+
+import numpy as np
+
+from src.backtest import Backtester
+from src.config.config import ExchangeConfig
+from src.strategy.sma_cross import SmaCross, random_walk_ohlcv
+
+
+def main():
+    parser = argparse.ArgumentParser(description="バックテストの処理速度")
+    parser.add_argument("--bars", type=int, default=525_600, help="足の本数")
+    parser.add_argument(
+        "--per-bar-max-bars",
+        type=int,
+        default=20_000,
+        help="per-barを計測する最大の本数",
+    )
+    args = parser.parse_args()
+
+    config = ExchangeConfig(
+        name="bybit",
+        api_key="",
+        api_secret="",
+        symbol="BTCUSDT",
+        position_size=0.01,
+        leverage=10,
+        buy_leverage=10,
+        sell_leverage=10,
+        margin_type="isolated",
+        timeframe="1m",
+        max_position=0.01,
+        retry_count=3,
+        retry_interval=1,
+        testnet=False,
+        dry_run=True,
+        simulation_initial_balance=500,
+        fee_rate=0.00055,
+    )
+    ohlcv = np.array(random_walk_ohlcv(args.bars, step=20))
+
+    print(f"{'mode':>8} {'bars':>10} {'trades':>8} {'elapsed[s]':>12} {'bars/s':>12}")
+    for mode, bars in (
+        ("bulk", args.bars),
+        ("per-bar", min(args.bars, args.per_bar_max_bars)),
+    ):
+        result = Backtester(
+            SmaCross(fast=15, slow=60, bulk=mode == "bulk"), config
+        ).run(ohlcv[:bars])
+        print(
+            f"{mode:>8} {result.bars:>10} {len(result.tracker.trades):>8} "
+            f"{result.elapsed_sec:12.2f} {result.bars_per_second:12,.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
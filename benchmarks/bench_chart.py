@@ -0,0 +1,154 @@
+"""
+チャート作成のスループット(PNG/秒)とピークメモリ(RSS)の比較
+
+- fresh: 毎回新しい図を作成する従来の方法(mpf.plotにsavefigを指定)
+- cached: 図と軸を使い回すrender_candles
+- process: render_candlesを常駐プロセスで実行するChartRenderer(mode="process")
+
+ピークRSSが混ざらないよう、各方式は別プロセスで計測する。
+processのRSSは呼び出し元と描画プロセスの合計。
+
+実行例:
+    uv run python -m benchmarks.bench_chart
+    uv run python -m benchmarks.bench_chart --renders 200 --bars 500 --max-bars 200
+"""
+
+import argparse
+import io
+import json
+import resource
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+MODES = ["fresh", "cached", "process"]
+
+
+def make_ohlcv(bars: int, seed: int = 0) -> pd.DataFrame:
+    """ランダムウォークのOHLCVを作成する"""
+    rng = np.random.default_rng(seed)
+    close = 60000 + np.cumsum(rng.normal(0, 50, bars))
+    open_ = np.concatenate([[close[0]], close[:-1]])
+    spread = np.abs(rng.normal(0, 30, bars))
+    return pd.DataFrame(
+        {
+            "open": open_,
+            "high": np.maximum(open_, close) + spread,
+            "low": np.minimum(open_, close) - spread,
+            "close": close,
+            "volume": rng.uniform(1, 10, bars),
+        },
+        index=pd.date_range("2024-01-01", periods=bars, freq="15min", name="timestamp"),
+    )
+
+
+def render_fresh(df: pd.DataFrame) -> tuple[io.BytesIO, str]:
+    """毎回新しい図を作成して保存する"""
+    import mplfinance as mpf
+
+    image = io.BytesIO()
+    mpf.plot(
+        df,
+        type="candle",
+        columns=("open", "high", "low", "close", "volume"),
+        style="yahoo",
+        figsize=(12, 6),
+        savefig=dict(fname=image, format="png"),
+    )
+    image.seek(0)
+    return image, str(df.index[-1])
+
+
+def _peak_rss_mb() -> float:
+    """このプロセスと終了済みの子プロセスのピークRSS(MB)。Linuxではru_maxrssはKB単位"""
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return (own + children) / 1024
+
+
+def run_single(mode: str, renders: int, bars: int, max_bars: int) -> dict:
+    """1つの方式を計測する(別プロセスから呼ばれる)"""
+    import matplotlib
+
+    matplotlib.use("Agg")
+
+    from src.utils.chart_renderer import ChartRenderer, render_candles
+
+    df = make_ohlcv(bars)
+    if mode == "fresh":
+        renderer = ChartRenderer(render_fresh, max_bars=max_bars)
+    else:
+        renderer = ChartRenderer(
+            render_candles,
+            mode="process" if mode == "process" else "thread",
+            max_bars=max_bars,
+        )
+
+    # 初回は読み込みや図の作成を含むため計測から除く
+    renderer(df)
+    start = time.perf_counter()
+    for i in range(renders):
+        image, _ = renderer(df.iloc[: bars - renders + i + 1])
+    elapsed = time.perf_counter() - start
+    png_bytes = len(image.getvalue())
+    renderer.close()
+    time.sleep(0.2)  # 描画プロセスの終了を待ち、RUSAGE_CHILDRENに反映させる
+
+    return {
+        "mode": mode,
+        "png_per_sec": renders / elapsed,
+        "ms_per_png": elapsed / renders * 1000,
+        "peak_rss_mb": _peak_rss_mb(),
+        "png_kb": png_bytes / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="チャート作成のベンチマーク")
+    parser.add_argument("--renders", type=int, default=50, help="計測する作成回数")
+    parser.add_argument("--bars", type=int, default=1000, help="入力の足の本数")
+    parser.add_argument("--max-bars", type=int, default=200, help="描画する足の本数")
+    parser.add_argument("--modes", nargs="+", default=MODES, choices=MODES)
+    parser.add_argument("--single", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single:
+        result = run_single(args.single, args.renders, args.bars, args.max_bars)
+        print(json.dumps(result))
+        return
+
+    print(
+        f"renders={args.renders}, bars={args.bars}, max_bars={args.max_bars}\n"
+        f"{'mode':>8} {'PNG/s':>8} {'ms/PNG':>8} {'peak RSS(MB)':>13} {'PNG(KB)':>8}"
+    )
+    for mode in args.modes:
+        output = subprocess.run(
+            [
+                sys.executable,
+                "-m",
+                "benchmarks.bench_chart",
+                "--single",
+                mode,
+                "--renders",
+                str(args.renders),
+                "--bars",
+                str(args.bars),
+                "--max-bars",
+                str(args.max_bars),
+            ],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(
+            f"{mode:>8} {result['png_per_sec']:>8.1f} {result['ms_per_png']:>8.1f} "
+            f"{result['peak_rss_mb']:>13.1f} {result['png_kb']:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+RCI計算のベンチマーク
+
+従来のループ実装とベクトル化実装の処理時間を比較し、速度向上率を表示する。
+ループ実装は非常に遅いため、--loop-max-barsを超える本数では
+--loop-max-bars本での1本あたり処理時間から線形に推定する。
+
+実行例:
+    uv run python -m benchmarks.bench_rci
+    uv run python -m benchmarks.bench_rci --sizes 10000 100000 --period 52
+    uv run python -m benchmarks.bench_rci --multi 9 26 52
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.indicators import _calculate_rci_loop, calculate_rci, calculate_rci_multi
+
+
+def _measure(func, *args) -> float:
+    """関数を1回実行して経過秒数を返す"""
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def _calculate_rci_each(df: pd.DataFrame, periods: list[int]) -> None:
+    """期間ごとにcalculate_rciを呼ぶ(一括計算との比較用)"""
+    for period in periods:
+        calculate_rci(df, period)
+
+
+def bench_multi(sizes: list[int], periods: list[int]) -> None:
+    """期間ごとの計算とcalculate_rci_multiの処理時間を比較する"""
+    rng = np.random.default_rng(0)
+
+    print(f"periods={periods}")
+    print(f"{'bars':>10} {'each[s]':>12} {'multi[s]':>12} {'speedup':>10}")
+    for size in sizes:
+        close = np.round(30000 + np.cumsum(rng.normal(0, 10, size)), 1)
+        df = pd.DataFrame({"close": close})
+
+        each_sec = _measure(_calculate_rci_each, df, periods)
+        multi_sec = _measure(calculate_rci_multi, df, periods)
+        print(
+            f"{size:>10} {each_sec:12.3f} {multi_sec:12.3f} "
+            f"{each_sec / multi_sec:9.1f}x"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RCI計算のベンチマーク")
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[10_000, 100_000, 1_000_000],
+        help="計測するバー数",
+    )
+    parser.add_argument("--period", type=int, default=26, help="RCI計算期間")
+    parser.add_argument(
+        "--loop-max-bars",
+        type=int,
+        default=10_000,
+        help="ループ実装を実測する最大バー数(超える場合は推定)",
+    )
+    parser.add_argument(
+        "--multi",
+        type=int,
+        nargs="+",
+        default=None,
+        help="指定した複数期間について、期間ごとの計算と一括計算を比較する",
+    )
+    args = parser.parse_args()
+
+    if args.multi:
+        bench_multi(args.sizes, args.multi)
+        return
+
+    rng = np.random.default_rng(0)
+    loop_sec_per_bar = None
+
+    print(f"period={args.period}")
+    print(f"{'bars':>10} {'loop[s]':>12} {'vectorized[s]':>14} {'speedup':>10}")
+    for size in args.sizes:
+        close = np.round(30000 + np.cumsum(rng.normal(0, 10, size)), 1)
+        df = pd.DataFrame({"close": close})
+
+        vectorized_sec = _measure(calculate_rci, df, args.period)
+
+        if size <= args.loop_max_bars:
+            loop_sec = _measure(_calculate_rci_loop, df, args.period)
+            loop_sec_per_bar = loop_sec / size
+            loop_label = f"{loop_sec:12.3f}"
+        else:
+            if loop_sec_per_bar is None:
+                sample = df.iloc[: args.loop_max_bars]
+                loop_sec_per_bar = (
+                    _measure(_calculate_rci_loop, sample, args.period)
+                    / args.loop_max_bars
+                )
+            loop_sec = loop_sec_per_bar * size
+            loop_label = f"{loop_sec:11.3f}*"
+
+        speedup = loop_sec / vectorized_sec
+        print(f"{size:>10} {loop_label} {vectorized_sec:14.3f} {speedup:9.1f}x")
+
+    print("* ループ実装の1本あたり処理時間からの推定値")
+
+
+if __name__ == "__main__":
+    main()
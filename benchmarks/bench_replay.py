@@ -0,0 +1,77 @@
+"""
+リプレイ(main()と同じループをSimulatedClockで動かす)の処理速度(本/秒)のベンチマーク
+
+移動平均の大小で売買するストラテジーで、DryRunと注文(ReplayExchangeで約定)の
+それぞれについて計測する。同じ足でのBacktesterの速度も参考に表示する。
+
+実行例:
+    uv run python -m benchmarks.bench_replay
+    uv run python -m benchmarks.bench_replay --bars 20000
+"""
+
+import argparse
+import os
+from dataclasses import replace
+
+from src.backtest import Backtester
+from src.config.config import Config, DiscordConfig, ExchangeConfig, LoggingConfig
+from src.replay import Replayer
+from src.strategy.sma_cross import SmaCross, random_walk_ohlcv
+from src.utils.logger import Logger
+
+
+def main():
+    parser = argparse.ArgumentParser(description="リプレイの処理速度")
+    parser.add_argument("--bars", type=int, default=5_000, help="足の本数")
+    args = parser.parse_args()
+
+    config = Config(
+        # ログファイルを作成しない
+        logging=LoggingConfig(level="WARNING", file=os.devnull, rotation="none"),
+        exchange=ExchangeConfig(
+            name="bybit",
+            api_key="",
+            api_secret="",
+            symbol="BTCUSDT",
+            position_size=0.01,
+            leverage=10,
+            buy_leverage=10,
+            sell_leverage=10,
+            margin_type="isolated",
+            timeframe="1m",
+            max_position=0.01,
+            retry_count=3,
+            retry_interval=1,
+            testnet=False,
+            dry_run=True,
+            simulation_initial_balance=500,
+            fee_rate=0.00055,
+        ),
+        discord=DiscordConfig("", "", enabled=False),
+    )
+    # サイクルごとのログを出力すると、ログの出力時間が大半を占めるため抑制する
+    Logger.configure(config.logging)
+    ohlcv = random_walk_ohlcv(args.bars, step=20)
+
+    print(f"{'mode':>10} {'bars':>10} {'trades':>8} {'elapsed[s]':>12} {'bars/s':>12}")
+    for mode, dry_run in (("dry-run", True), ("orders", False)):
+        mode_config = replace(
+            config, exchange=replace(config.exchange, dry_run=dry_run)
+        )
+        result = Replayer(SmaCross(mode_config, fast=15, slow=60), mode_config).run(
+            ohlcv
+        )
+        print(
+            f"{mode:>10} {result.bars:>10} {len(result.trades):>8} "
+            f"{result.elapsed_sec:12.2f} {result.bars_per_second:12,.0f}"
+        )
+
+    result = Backtester(SmaCross(config, fast=15, slow=60), config.exchange).run(ohlcv)
+    print(
+        f"{'backtest':>10} {result.bars:>10} {len(result.tracker.trades):>8} "
+        f"{result.elapsed_sec:12.2f} {result.bars_per_second:12,.0f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
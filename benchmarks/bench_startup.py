@@ -0,0 +1,83 @@
+"""
+起動時間(モジュールの読み込み時間)の計測
+
+`python -X importtime -c "import <module>"`を別プロセスで実行し、
+読み込み全体の時間と、累積時間の大きいモジュールを表示する。
+再起動時の停止時間の短縮や、重いモジュールの読み込みを遅延させた効果の確認に使う。
+
+実行例:
+    uv run python -m benchmarks.bench_startup
+    uv run python -m benchmarks.bench_startup --module src.historical_data --runs 10 --top 15
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+
+
+def measure(module: str) -> dict[str, int]:
+    """
+    moduleを読み込み、モジュールごとの累積読み込み時間（マイクロ秒）を返す
+
+    Returns:
+    --------
+    dict[str, int]
+        {モジュール名: 累積時間(us)}。トップレベルで読み込んだモジュールの合計は"<total>"
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    cumulative: dict[str, int] = {}
+    total = 0
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative_us, name = line[len("import time:") :].split("|")
+        name_stripped = name.strip()
+        cumulative[name_stripped] = int(cumulative_us)
+        # インデントなし(トップレベル)の読み込みを合計する
+        if name.startswith(" ") and not name.startswith("  "):
+            total += int(cumulative_us)
+    cumulative["<total>"] = total
+    return cumulative
+
+
+def main():
+    parser = argparse.ArgumentParser(description="起動時間(モジュール読み込み)の計測")
+    parser.add_argument("--module", default="src.main", help="読み込むモジュール")
+    parser.add_argument("--runs", type=int, default=5, help="計測回数")
+    parser.add_argument("--top", type=int, default=10, help="表示するモジュール数")
+    args = parser.parse_args()
+
+    runs = [measure(args.module) for _ in range(args.runs)]
+
+    totals = [run["<total>"] / 1000 for run in runs]
+    print(
+        f"import {args.module}: median={statistics.median(totals):.1f}ms "
+        f"min={min(totals):.1f}ms max={max(totals):.1f}ms (runs={args.runs})"
+    )
+
+    # 各モジュールの累積時間の中央値が大きい順に表示
+    names = set().union(*runs) - {"<total>"}
+    medians = {
+        name: statistics.median(run.get(name, 0) for run in runs) / 1000
+        for name in names
+    }
+    print(f"\n{'cumulative(ms)':>14}  module")
+    for name, value in sorted(medians.items(), key=lambda item: -item[1])[: args.top]:
+        print(f"{value:>14.1f}  {name}")
+
+    # 起動時に読み込まれていないことを確認したい重いモジュール
+    for heavy in ("matplotlib", "mplfinance", "talib"):
+        loaded = any(heavy in run for run in runs)
+        print(f"{heavy}: {'読み込み済み' if loaded else '未読み込み'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+取引ストアのベンチマーク
+
+指定した件数の取引をPnLTracker経由でTradeStoreに追記し、
+追記の処理時間(fsyncの方針ごと)と、再起動時の状態の復元にかかる時間を表示する。
+
+実行例:
+    uv run python -m benchmarks.bench_trade_store
+    uv run python -m benchmarks.bench_trade_store --sizes 100000 1000000
+"""
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+from unittest.mock import MagicMock
+
+from src.trade_store import TradeStore
+from src.utils.pnl_tracker import PnLTracker
+
+
+def _tracker(store: TradeStore) -> PnLTracker:
+    return PnLTracker(
+        simulation_initial_balance=500,
+        fee_rate=0.00055,
+        leverage=10,
+        discord=MagicMock(),  # 通知はしない
+        store=store,
+    )
+
+
+def _write(path: Path, size: int, fsync: str) -> float:
+    """size件の取引(エントリーと決済を交互)を追記して経過秒数を返す"""
+    rng = random.Random(0)
+    tracker = _tracker(TradeStore(path, fsync=fsync))
+    start = time.perf_counter()
+    for i in range(size):
+        price = rng.uniform(90, 110)
+        if tracker.position is None:
+            tracker.add_trade(i, rng.choice(["long", "short"]), price, 0.01)
+        else:
+            side = "sell" if tracker.position.side == "long" else "buy"
+            tracker.add_trade(i, side, price, 0.01)
+    tracker.store.close()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="取引ストアのベンチマーク")
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[10_000, 100_000],
+        help="計測する取引数",
+    )
+    parser.add_argument(
+        "--fsync",
+        nargs="+",
+        default=["never", "interval"],
+        choices=TradeStore.FSYNC_POLICIES,
+        help="追記を計測するfsyncの方針",
+    )
+    args = parser.parse_args()
+
+    header = f"{'trades':>10}"
+    for fsync in args.fsync:
+        header += f" {'write(' + fsync + ')[s]':>20}"
+    print(header + f" {'restore[ms]':>12}")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for size in args.sizes:
+            line = f"{size:>10}"
+            for fsync in args.fsync:
+                path = Path(tmpdir) / f"{size}_{fsync}.trades"
+                line += f" {_write(path, size, fsync):20.3f}"
+
+            start = time.perf_counter()
+            tracker = _tracker(TradeStore(path))
+            restore_ms = (time.perf_counter() - start) * 1000
+            tracker.store.close()
+            print(line + f" {restore_ms:12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,281 @@
+"""
+BaseStrategyのサブクラスを過去のOHLCVで評価するバックテスト
+
+インジケーターは全期間について1回だけ計算し、ストラテジーがentry_signals/exit_signalsを
+実装していれば売買判断も全期間まとめて受け取る。実装していない場合は、計算済みの
+インジケーターを足ごとに切り出してshould_entry/should_exit2(main()と同じ決済判断)を呼ぶ。
+
+約定はmain()のDryRunと同じく、判断した確定足の終値でPnLTrackerに記録するため、
+手数料・レバレッジの計算はDryRunと同じになる。
+
+実行例:
+    uv run python -m src.backtest --strategy src.strategy.my_strategy:MyStrategy
+    uv run python -m src.backtest --strategy src.strategy.my_strategy:MyStrategy \\
+        --since 2024-01-01 --until 2024-04-01
+"""
+
+import argparse
+import importlib
+import time
+from dataclasses import dataclass, replace
+from datetime import datetime, timezone
+from typing import Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from src.config.config import ExchangeConfig
+from src.strategy.base_strategy import BaseStrategy
+from src.utils.discord import DiscordNotifier
+from src.utils.pnl_tracker import PnLTracker
+from src.utils.time_utils import YEAR_MS, convert_to_jst, timeframe_to_ms
+
+OHLCV_COLUMNS = ["open", "high", "low", "close", "volume"]
+
+
+def ohlcv_to_frame(ohlcv: Union[np.ndarray, list[list]]) -> pd.DataFrame:
+    """
+    OHLCVをHistoricalData.dataと同じ形式のDataFrameにする
+
+    Parameters:
+    -----------
+    ohlcv : numpy.ndarray or list[list]
+        OHLCVStore.readの構造化配列、またはfetch_ohlcvと同じ形式のリスト
+
+    Returns:
+    --------
+    pandas.DataFrame
+        インデックスが日本時間のDatetimeIndex("timestamp")で、
+        open, high, low, close, volumeのカラムを持つDataFrame
+    """
+    if isinstance(ohlcv, np.ndarray) and ohlcv.dtype.names:
+        timestamps = ohlcv["timestamp"]
+        columns = {name: np.asarray(ohlcv[name], dtype=float) for name in OHLCV_COLUMNS}
+    else:
+        values = np.asarray(ohlcv, dtype=float).reshape(-1, 6)
+        timestamps = values[:, 0].astype(np.int64)
+        columns = {name: values[:, i + 1] for i, name in enumerate(OHLCV_COLUMNS)}
+
+    index = convert_to_jst(pd.Index(np.asarray(timestamps), name="timestamp"))
+    return pd.DataFrame(columns, index=index)
+
+
+@dataclass
+class BacktestResult:
+    """バックテストの結果"""
+
+    tracker: PnLTracker  # 取引履歴・集計値・リスク指標
+    equity: np.ndarray  # 各足の評価額(判断を始める前の足はNaN)
+    bars: int  # 評価した足の本数(ウォームアップの足を除く)
+    elapsed_sec: float  # 所要時間(インジケーター計算を含む)
+
+    @property
+    def bars_per_second(self) -> float:
+        return self.bars / self.elapsed_sec if self.elapsed_sec > 0 else float("inf")
+
+    def summary(self) -> dict:
+        """PnLTracker.get_summaryに取引数と処理速度を加えたもの"""
+        return {
+            **self.tracker.get_summary(),
+            "取引数": len(self.tracker.trades),
+            "足の本数": self.bars,
+            "処理速度": f"{self.bars_per_second:,.0f}本/秒",
+        }
+
+
+class Backtester:
+    """
+    ストラテジーを過去のOHLCVで評価するクラス
+
+    main()と同じく、1本ごとに(1)ポジションがあれば決済判断、(2)ポジションがなければ
+    エントリー判断、の順に行い、max_position分を確定足の終値で約定させる。
+    """
+
+    def __init__(
+        self,
+        strategy: BaseStrategy,
+        config: ExchangeConfig,
+        warmup: Optional[int] = None,
+    ):
+        """
+        Parameters:
+        -----------
+        strategy : BaseStrategy
+            評価するストラテジー
+        config : ExchangeConfig
+            取引所の設定(初期残高・手数料率・レバレッジ・注文数量・タイムフレーム)
+        warmup : int, optional
+            売買判断を始める前に読み飛ばす足の本数。
+            Noneの場合はストラテジーのrequired_bars(なければ0)
+        """
+        self.strategy = strategy
+        self.config = config
+        self.warmup = (
+            warmup if warmup is not None else getattr(strategy, "required_bars", 0)
+        )
+
+    def _new_tracker(self) -> PnLTracker:
+        return PnLTracker(
+            simulation_initial_balance=self.config.simulation_initial_balance,
+            fee_rate=self.config.fee_rate,
+            leverage=self.config.leverage,
+            # バックテストの取引はDiscordに通知しない
+            discord=DiscordNotifier("", "", enabled=False),
+            periods_per_year=YEAR_MS / timeframe_to_ms(self.config.timeframe),
+            quiet=True,
+        )
+
+    def run(self, ohlcv: Union[np.ndarray, list[list], pd.DataFrame]) -> BacktestResult:
+        """
+        バックテストを実行する
+
+        Parameters:
+        -----------
+        ohlcv : numpy.ndarray, list[list] or pandas.DataFrame
+            古い順のOHLCV(ohlcv_to_frameが受け付ける形式、またはその結果のDataFrame)
+
+        Returns:
+        --------
+        BacktestResult
+            バックテストの結果
+        """
+        start_time = time.perf_counter()
+        df = ohlcv if isinstance(ohlcv, pd.DataFrame) else ohlcv_to_frame(ohlcv)
+        strategy = self.strategy
+        strategy.position = None
+
+        # インジケーターと(実装されていれば)売買判断を全期間について1回だけ計算する
+        indicators = strategy.calculate_indicators(df)
+        entries = strategy.entry_signals(indicators)
+        exits = {
+            side: strategy.exit_signals(indicators, side) for side in ("long", "short")
+        }
+        entry_sides = entries.to_numpy(dtype=object) if entries is not None else None
+        exit_flags = {
+            side: signals.to_numpy(dtype=bool) if signals is not None else None
+            for side, signals in exits.items()
+        }
+
+        timestamps = df.index.as_unit("ms").asi8.tolist()
+        closes = df["close"].to_numpy().tolist()
+        amount = self.config.max_position
+        tracker = self._new_tracker()
+        equity = np.full(len(df), np.nan)
+        # 足iの終値で約定するため、取引は足の確定時刻(次の足の開始時刻)で記録する
+        # (ライブ・リプレイでの約定時刻と揃える)
+        interval = timeframe_to_ms(self.config.timeframe)
+        start = min(self.warmup, len(df))
+
+        for i in range(start, len(df)):
+            price = closes[i]
+            closed_at = timestamps[i] + interval
+
+            # 決済判断
+            position = tracker.position
+            if position is not None:
+                flags = exit_flags.get(position.side)
+                if flags is not None:
+                    should_exit = flags[i]
+                else:
+                    strategy.position = position.side
+                    # main()と同じくshould_exit2で判断する
+                    should_exit = strategy.should_exit2(indicators.iloc[: i + 1])
+                if should_exit:
+                    side = "sell" if position.side == "long" else "buy"
+                    tracker.add_trade(closed_at, side, price, position.amount)
+
+            # エントリー判断(ポジションがない場合のみ)
+            if tracker.position is None:
+                if entry_sides is not None:
+                    side = entry_sides[i]
+                else:
+                    strategy.position = None
+                    ok, side = strategy.should_entry(indicators.iloc[: i + 1])
+                    side = side if ok else None
+                if isinstance(side, str):
+                    tracker.add_trade(closed_at, side, price, amount)
+
+            equity[i] = tracker.mark_to_market(price)
+
+        strategy.position = tracker.position.side if tracker.position else None
+        return BacktestResult(
+            tracker=tracker,
+            equity=equity,
+            bars=len(df) - start,
+            elapsed_sec=time.perf_counter() - start_time,
+        )
+
+
+def _parse_datetime(value: str) -> int:
+    """ISO8601の日時(タイムゾーン省略時はUTC)をミリ秒に変換する"""
+    dt = datetime.fromisoformat(value)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp() * 1000)
+
+
+def load_strategy(path: str) -> type[BaseStrategy]:
+    """
+    ストラテジーのクラスを読み込む
+
+    Parameters:
+    -----------
+    path : str
+        "モジュール:クラス名"の形式(例: "src.strategy.my_strategy:MyStrategy")
+    """
+    module_name, _, class_name = path.partition(":")
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def main():
+    from src.config.config import Config
+    from src.ohlcv_store import OHLCVStore
+    from src.utils.logger import Logger
+
+    config = Config.shared()
+    Logger.configure(config.logging)
+
+    parser = argparse.ArgumentParser(description="ストラテジーのバックテスト")
+    parser.add_argument(
+        "--strategy",
+        default="src.strategy.my_strategy:MyStrategy",
+        help="ストラテジーのクラス(モジュール:クラス名)",
+    )
+    parser.add_argument(
+        "--since", help="開始日時(ISO8601, UTC)。省略時は保存済みの先頭"
+    )
+    parser.add_argument(
+        "--until", help="終了日時(ISO8601, UTC)。省略時は保存済みの末尾"
+    )
+    parser.add_argument("--symbol", default=config.exchange.symbol)
+    parser.add_argument("--timeframe", default=config.exchange.timeframe)
+    parser.add_argument("--directory", default=config.storage.download_directory)
+    args = parser.parse_args()
+
+    # OHLCVはsrc.ohlcv_downloaderで保存したものを使う
+    store = OHLCVStore.open(
+        args.directory, config.exchange.name, args.symbol, args.timeframe
+    )
+    records = store.read()
+    if args.since:
+        records = records[records["timestamp"] >= _parse_datetime(args.since)]
+    if args.until:
+        records = records[records["timestamp"] < _parse_datetime(args.until)]
+    if len(records) == 0:
+        print(f"OHLCVが保存されていません: {store.path}")
+        return
+
+    # バックテスト中はストラテジーからもDiscordに通知しない
+    config = replace(config, discord=replace(config.discord, enabled=False))
+    exchange_config = replace(
+        config.exchange, symbol=args.symbol, timeframe=args.timeframe
+    )
+    strategy = load_strategy(args.strategy)(config)
+
+    result = Backtester(strategy, exchange_config).run(records)
+    for key, value in result.summary().items():
+        print(f"{key}: {value:.2f}" if isinstance(value, float) else f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
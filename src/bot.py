@@ -0,0 +1,368 @@
+"""
+売買ボットのメインループ
+
+main()が初期化した取引所・ストラテジーを受け取り、足の確定ごとに
+データ更新 → インジケーター計算 → 決済判断 → エントリー判断 → ポジションの突き合わせ、
+の1サイクルを実行する。リプレイ(src.replay)も同じコードを偽の取引所・時計で動かす。
+"""
+
+import time
+import traceback
+import uuid
+from typing import Callable, Optional
+
+from src.config.config import Config
+from src.exchanges.my_exchange import MyExchange
+from src.historical_data import HistoricalData
+from src.ohlcv_store import OHLCVStore
+from src.strategy.base_strategy import BaseStrategy
+from src.utils.chart_renderer import ChartRenderer
+from src.utils.chart_worker import ChartWorker
+from src.utils.clock_sync import ClockSync
+from src.utils.discord import DiscordNotifier
+from src.utils.latency import latency
+from src.utils.logger import Logger
+from src.utils.metrics import LogCountHandler, MetricsServer, metrics
+from src.utils.scheduler import CandleCloseScheduler
+from src.utils.time_utils import Clock
+
+
+class RetryLimitExceededError(RuntimeError):
+    """サイクル中のエラーの回数がretry_countを超えた場合の例外"""
+
+
+class TradingBot:
+    """足の確定ごとに売買判断と注文を行うボット"""
+
+    def __init__(
+        self,
+        config: Config,
+        exchange: MyExchange,
+        strategy: BaseStrategy,
+        discord: DiscordNotifier,
+        historical_data: HistoricalData,
+        clock_sync: ClockSync,
+        scheduler: CandleCloseScheduler,
+        chart_renderer: Optional[ChartRenderer] = None,
+        chart_worker: Optional[ChartWorker] = None,
+        clock: Optional[Clock] = None,
+    ):
+        self.config = config
+        self.exchange = exchange
+        self.strategy = strategy
+        self.discord = discord
+        self.historical_data = historical_data
+        self.clock_sync = clock_sync
+        self.scheduler = scheduler
+        self.chart_renderer = chart_renderer
+        self.chart_worker = chart_worker
+        self.clock = clock or Clock()
+        self.logger = Logger.get_logger()
+        self.error_count = 0  # retry_countを超えるとRetryLimitExceededErrorになる
+        self.cycles = 0  # 正常に終えたサイクル数
+
+    @classmethod
+    def create(
+        cls,
+        config: Config,
+        exchange: MyExchange,
+        strategy: BaseStrategy,
+        discord: DiscordNotifier,
+        clock: Optional[Clock] = None,
+        store: Optional[OHLCVStore] = None,
+    ) -> "TradingBot":
+        """
+        既存ポジションの検出、初期データの取得、サーバー時刻との同期を行ってボットを作成する
+
+        Parameters:
+        -----------
+        config : Config
+            設定
+        exchange : MyExchange
+            取引所
+        strategy : BaseStrategy
+            ストラテジー
+        discord : DiscordNotifier
+            通知クライアント
+        clock : Clock, optional
+            時計。省略時は実際の時刻を使う(リプレイではSimulatedClock)
+        store : OHLCVStore, optional
+            初期データに使い、確定足を追記するOHLCVストア
+
+        Returns:
+        --------
+        TradingBot
+            最初の足の確定を待つ前の状態のボット
+        """
+        clock = clock or Clock()
+
+        # 現在のポジション状態を確認
+        current_position, position_side = exchange.get_position_info(
+            config.exchange.symbol
+        )
+        if config.exchange.dry_run and exchange.pnl_tracker.position is not None:
+            # DryRun時は復元したシミュレーション上のポジションを引き継ぐ
+            position_side = exchange.pnl_tracker.position.side
+        if position_side is not None:
+            strategy.position = position_side
+            discord.print_and_notify(
+                f"既存ポジションを検出: {strategy.position}, {current_position}",
+                level="info",
+            )
+
+        # 保持しておく必要があるバー数。
+        # 例: ストラテジーで指標計算に必要なバー数が101の場合。
+        # (100本＋1本。＋1本は一つ前の時間でも指標が計算できている必要があるため。)
+        # この場合はrequired_bars = 202となる。
+        # 202本取得した場合、確定足の本数は最新の一つを除いた201本となる。
+        # 201本あれば、100本分くらいのローソク足や指標計算結果の描画と、
+        # エントリー判断の計算に必要なデータは十分である。
+        required_bars = strategy.required_bars * 2
+
+        # 初期データの取得
+        # (OHLCVストアが有効な場合は保存済みの足を使い、不足分のみ取得する)
+        historical_data = HistoricalData.load(
+            required_bars,
+            exchange,
+            config.exchange.symbol,
+            config.exchange.timeframe,
+            discord,
+            store=store,
+        )
+
+        # サーバー時刻との同期(複数回の計測から往復時間を考慮してオフセットを推定)
+        clock_sync = ClockSync(
+            exchange.fetch_time,
+            clock=clock,
+            samples=config.clock_sync.samples,
+            refresh_interval=config.clock_sync.refresh_interval,
+        )
+        clock_sync.sync()
+        discord.print_and_notify(f"サーバー時刻とのオフセット: {clock_sync}")
+
+        # チャートの作成と送信を行うバックグラウンドワーカー
+        # (every_n_bars本ごとに、最大max_bars本を描画する。
+        # create_chartはデフォルトでは図を使い回すrender_candlesで、常駐プロセスにも渡せる)
+        chart_renderer = chart_worker = None
+        if config.chart.enabled:
+            chart_renderer = ChartRenderer(
+                strategy.create_chart,
+                mode=config.chart.mode,
+                every_n_bars=config.chart.every_n_bars,
+                max_bars=config.chart.max_bars,
+            )
+            chart_worker = ChartWorker(chart_renderer, discord)
+
+        # 足の確定を検知するスケジューラー
+        # (確定時刻まで待機し、新しい足が現れるまで短い間隔でポーリングする)
+        scheduler = CandleCloseScheduler(
+            lambda symbol, timeframe: exchange.fetch_ohlcv(
+                symbol,
+                timeframe=timeframe,
+                limit=2,  # 2つ取得すると、先頭要素が最新の確定足
+            ),
+            clock=clock,
+            offset_ms=lambda: clock_sync.offset_ms,
+        )
+        scheduler.add(config.exchange.symbol, config.exchange.timeframe)
+
+        return cls(
+            config,
+            exchange,
+            strategy,
+            discord,
+            historical_data,
+            clock_sync,
+            scheduler,
+            chart_renderer=chart_renderer,
+            chart_worker=chart_worker,
+            clock=clock,
+        )
+
+    def start_metrics_server(self) -> None:
+        """メトリクスを登録し、HTTPで公開する(Prometheusのテキスト形式)"""
+        config, discord, exchange = self.config, self.discord, self.exchange
+        metrics.gauge(
+            "discord_queue_depth",
+            lambda: discord.dispatcher.qsize() if discord.dispatcher else 0,
+            help="Discordの送信待ちの通知数",
+        )
+        metrics.gauge(
+            "error_count",
+            lambda: self.error_count,
+            help="エラーの回数(retry_countを超えると終了する)",
+        )
+        metrics.gauge(
+            "historical_data_bars",
+            lambda: len(self.historical_data),
+            help="HistoricalDataが保持している足の本数",
+        )
+        metrics.gauge("trades", lambda: len(exchange.pnl_tracker.trades), help="取引数")
+        if config.exchange.dry_run:
+            pnl_tracker = exchange.pnl_tracker
+            metrics.gauge(
+                "equity",
+                lambda: pnl_tracker.risk.equity,
+                help="DryRunの評価額(残高 + 含み損益)",
+            )
+            metrics.gauge(
+                "max_drawdown",
+                lambda: pnl_tracker.risk.max_drawdown,
+                help="DryRunの最大ドローダウン(ピークからの下落率)",
+            )
+        metrics.gauge(
+            "chart_dropped",
+            lambda: self.chart_worker.dropped if self.chart_worker else 0,
+            help="捨てたチャート数",
+        )
+        self.logger.addHandler(LogCountHandler(metrics))
+        MetricsServer(metrics, config.metrics.host, config.metrics.port).start()
+
+    def run_cycle(self) -> None:
+        """次の足の確定を待ち、1本分の売買判断と注文を行う"""
+        config, exchange, strategy = self.config, self.exchange, self.strategy
+        discord, clock = self.discord, self.clock
+
+        # 定期的にオフセットを再計算(足の確定を待つ前に行い、判断・注文を遅らせない)
+        if self.clock_sync.maybe_refresh():
+            discord.print_and_notify(
+                f"サーバー時刻とのオフセットを更新: {self.clock_sync}",
+                level="debug",
+            )
+
+        wait_time = self.scheduler.seconds_until_next()
+        if wait_time > 0:
+            discord.print_and_notify(f"ローソク足更新までの待機時間: {wait_time:.3f}秒")
+
+        # 最新の確定足を取得
+        with latency.timer("loop.wait"):
+            candle = self.scheduler.wait_next()
+        cycle_start = time.perf_counter()
+
+        # 確定済みのローソク足を使用(前回から欠損があればまとめて補完される)
+        with latency.timer("loop.update"):
+            self.historical_data.update(candle.bar)
+
+        # インジケーターを計算
+        # (データが前回から変わっていなければキャッシュした結果を使う)
+        with latency.timer("loop.indicators"):
+            df = strategy.get_indicators(self.historical_data)
+
+        # 現在ポジションがある場合、決済判断し条件を満たせば全決済
+        # if strategy.position and strategy.should_exit(df):
+        if strategy.position and strategy.should_exit2(df):
+            with latency.timer("loop.close_all_position"):
+                exchange.close_all_position(config.exchange.symbol)
+            latency.record(
+                "candle_close_to_order",
+                (clock.monotonic() - candle.closed_at) * 1000,
+            )
+            strategy.position = None
+
+        # エントリー判断
+        should_entry, position = strategy.should_entry(df)
+        latency.record(
+            "candle_close_to_decision",
+            (clock.monotonic() - candle.closed_at) * 1000,
+        )
+        if should_entry:
+            if strategy.position:
+                discord.print_and_notify(
+                    "既にポジションを持っているためエントリーしない.",
+                    level="info",
+                )
+            else:
+                # exchange.place_order(
+                #    config.exchange.symbol, position, config.exchange.position_size
+                # )
+                with latency.timer("loop.place_order"):
+                    exchange.place_order(
+                        config.exchange.symbol,
+                        position,
+                        config.exchange.max_position,  # 一度にmax_position分のポジションを持つ方針
+                    )
+                # 足の確定から注文を送信し終えるまでの時間
+                latency.record(
+                    "candle_close_to_order",
+                    (clock.monotonic() - candle.closed_at) * 1000,
+                )
+                strategy.position = position  # DryRun時もポジション方向を記録
+
+        # チャートの作成と送信
+        # (売買判断・注文の後に、バックグラウンドで行い次のサイクルを遅らせない)
+        if self.chart_worker is not None and self.chart_renderer.should_render():
+            self.chart_worker.submit(df)
+
+        # DryRun時は確定足の終値で評価額・リスク指標を更新し、PnLを表示
+        if config.exchange.dry_run:
+            exchange.pnl_tracker.mark_to_market(candle.bar[4])
+            exchange.pnl_tracker.print_summary()
+
+        # 注文の直前に取引所へ問い合わせないよう、サイクルの合間に
+        # ポジションのキャッシュを定期的に取引所と突き合わせる
+        with latency.timer("loop.reconcile"):
+            exchange.reconcile_position(config.exchange.symbol)
+
+        # 足の確定を検知してからサイクルの終わりまでの時間
+        latency.record("loop.cycle", (time.perf_counter() - cycle_start) * 1000)
+        latency.maybe_log(self.logger, config.logging.latency_log_interval)
+        self.cycles += 1
+
+    def handle_error(self, e: Exception) -> None:
+        """
+        サイクル中のエラーを通知し、retry_interval秒待機する。
+
+        Raises:
+        -------
+        RetryLimitExceededError
+            エラーの回数がretry_countを超えた場合
+            (ライブではmain()が異常終了し、リプレイではエラー数を記録して終了する)
+        """
+        config, discord = self.config, self.discord
+
+        error_location = traceback.extract_tb(e.__traceback__)[-1]
+        file_name = error_location.filename.split("/")[-1]  # ファイル名のみ抽出
+        line_no = error_location.lineno
+        func_name = error_location.name
+
+        error_message = (
+            f"エラーが発生しました。{config.exchange.retry_interval}秒後にリトライします:\n"
+            f"場所: {file_name}, 行: {line_no}, 関数: {func_name}\n"
+            f"種類: {type(e).__name__}\n"
+            f"詳細: {str(e)}\n"
+            f"スタックトレース:\n{traceback.format_exc()}"
+        )
+        discord.print_and_notify(error_message, title="エラー通知", level="error")
+
+        # ポジションの状態が不明になっている可能性があるので取得し直させる
+        self.exchange.invalidate_position_cache()
+
+        self.error_count += 1
+        if config.exchange.retry_count < self.error_count:
+            raise RetryLimitExceededError(
+                f"エラーの回数({self.error_count})がリトライ回数"
+                f"({config.exchange.retry_count})を超えました"
+            ) from e
+        self.clock.sleep(config.exchange.retry_interval)
+
+    def run(self, should_stop: Optional[Callable[[], bool]] = None) -> None:
+        """
+        サイクルを繰り返す
+
+        Parameters:
+        -----------
+        should_stop : Callable[[], bool], optional
+            各サイクルの前に呼び出し、Trueを返したら終了する関数。省略時は終了しない
+
+        Raises:
+        -------
+        RetryLimitExceededError
+            エラーの回数がretry_countを超えた場合
+        """
+        while should_stop is None or not should_stop():
+            # このサイクルのログを紐付けるID(JSON形式のログに出力される)
+            Logger.set_cycle_id(uuid.uuid4().hex[:8])
+            try:
+                self.run_cycle()
+            except Exception as e:
+                self.handle_error(e)
@@ -1,6 +1,6 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, ClassVar, Dict, Optional
 
 import yaml
 
@@ -9,6 +9,13 @@ import yaml
 class LoggingConfig:
     level: str
     file: str
+    latency_log_interval: float = 3600.0  # 処理時間の集計をログに出力する間隔(秒)
+    use_queue: bool = True  # ファイル・コンソールへの書き込みをバックグラウンドで行うか
+    format: str = "text"  # "text"または"json"(1行1JSON、サイクルIDを含む)
+    rotation: str = "size"  # "none", "size"(max_bytesごと), "time"(whenごと)
+    max_bytes: int = 10 * 1024 * 1024  # rotation="size"の場合のファイルの最大サイズ
+    when: str = "midnight"  # rotation="time"の場合のローテーションの単位
+    backup_count: int = 5  # 残しておく過去のログファイルの数
 
 
 @dataclass
@@ -30,6 +37,8 @@ class ExchangeConfig:
     dry_run: bool  # エントリー条件を満たしても実際には注文をしないモード
     simulation_initial_balance: float
     fee_rate: float
+    # ポジションのキャッシュを取引所と突き合わせる間隔(秒)
+    position_sync_interval: int = 3600
 
     def __repr__(self) -> str:
         """機密情報をマスキングして文字列表現を返す"""
@@ -49,7 +58,8 @@ class ExchangeConfig:
             f"retry_count={self.retry_count}, "
             f"retry_interval={self.retry_interval}, "
             f"testnet={self.testnet}, "
-            f"dry_run={self.dry_run}"
+            f"dry_run={self.dry_run}, "
+            f"position_sync_interval={self.position_sync_interval}"
             f")"
         )
 
@@ -75,6 +85,10 @@ class DiscordConfig:
     webhook_url: str
     mention_user_id: str
     enabled: bool = True  # 通知の有効/無効を切り替え
+    async_dispatch: bool = True  # バックグラウンドでまとめて送信するか
+    queue_size: int = 1000  # バックグラウンド送信時に保持する通知の最大数
+    connect_timeout: float = 3.0  # Webhookへの接続のタイムアウト(秒)
+    read_timeout: float = 10.0  # Webhookからの応答のタイムアウト(秒)
 
     def __repr__(self) -> str:
         """webhook_urlをマスキングして文字列表現を返す"""
@@ -83,15 +97,76 @@ class DiscordConfig:
             f"webhook_url='{'*' * 8}', "  # マスキング
             f"mention_user_id={self.mention_user_id},"
             f"enabled={self.enabled},"
+            f"async_dispatch={self.async_dispatch},"
+            f"queue_size={self.queue_size},"
+            f"connect_timeout={self.connect_timeout},"
+            f"read_timeout={self.read_timeout},"
             ")"
         )
 
 
+@dataclass
+class StorageConfig:
+    enabled: bool = False  # OHLCVをローカルに保存し、起動時に再利用するか
+    directory: str = "data/ohlcv"  # OHLCVストアの保存先ディレクトリ
+    # src.ohlcv_downloaderで取得したOHLCVの保存先(ライブのストアとは分ける)
+    download_directory: str = "data/ohlcv_download"
+
+
+@dataclass
+class TradeJournalConfig:
+    enabled: bool = False  # DryRun時の取引をファイルに追記し、起動時に状態を復元するか
+    directory: str = "data/trades"  # 取引ストアの保存先ディレクトリ
+    fsync: str = "interval"  # "always", "interval", "never"
+    fsync_interval: float = 1.0  # fsync="interval"の場合のfsyncの最小間隔(秒)
+
+
+@dataclass
+class ClockSyncConfig:
+    samples: int = 5  # 1回の同期でサーバー時刻を取得する回数
+    refresh_interval: float = 600.0  # 再同期する間隔(秒)
+
+
+@dataclass
+class ChartConfig:
+    enabled: bool = True  # チャートを作成してDiscordへ送信するか
+    every_n_bars: int = 1  # 何本ごとにチャートを作成するか
+    max_bars: Optional[int] = None  # 描画する最大の足の本数(Noneは制限なし)
+    mode: str = "thread"  # "thread"または"process"(常駐プロセスで描画)
+
+
+@dataclass
+class MetricsConfig:
+    enabled: bool = False  # メトリクスをHTTPで公開するか
+    host: str = "127.0.0.1"  # 待ち受けるアドレス(外部に公開しないためlocalhostを推奨)
+    port: int = 9108  # 待ち受けるポート
+
+
 @dataclass
 class Config:
     logging: LoggingConfig
     exchange: ExchangeConfig
     discord: DiscordConfig
+    storage: StorageConfig = field(default_factory=StorageConfig)
+    trade_journal: TradeJournalConfig = field(default_factory=TradeJournalConfig)
+    clock_sync: ClockSyncConfig = field(default_factory=ClockSyncConfig)
+    chart: ChartConfig = field(default_factory=ChartConfig)
+    metrics: MetricsConfig = field(default_factory=MetricsConfig)
+
+    # Config.sharedで返す設定(プロセス内で1回だけ読み込む)
+    _shared: ClassVar[Optional["Config"]] = None
+
+    @classmethod
+    def shared(cls) -> "Config":
+        """
+        プロセス全体で共有する設定を返す
+
+        初回のみデフォルトの設定ファイルを読み込み、以降は同じインスタンスを返す。
+        main()とLoggerなどで設定ファイルを何度も読み込まないために使う。
+        """
+        if cls._shared is None:
+            cls._shared = cls.load()
+        return cls._shared
 
     @classmethod
     def load(cls, config_path: str = None) -> "Config":
@@ -108,4 +183,9 @@ class Config:
             logging=LoggingConfig(**config_dict["logging"]),
             exchange=ExchangeConfig(**config_dict["exchange"]),
             discord=DiscordConfig(**config_dict["discord"]),
+            storage=StorageConfig(**config_dict.get("storage", {})),
+            trade_journal=TradeJournalConfig(**config_dict.get("trade_journal", {})),
+            clock_sync=ClockSyncConfig(**config_dict.get("clock_sync", {})),
+            chart=ChartConfig(**config_dict.get("chart", {})),
+            metrics=MetricsConfig(**config_dict.get("metrics", {})),
         )
@@ -0,0 +1,293 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import List, Optional
+
+import ccxt.async_support as ccxt_async
+
+from src.config.config import ExchangeConfig
+from src.exchanges.base_exchange import BaseExchange
+from src.exchanges.bybit import config_async as bybit_config_async
+from src.trade_store import TradeStore
+from src.utils.discord import DiscordNotifier
+from src.utils.latency import latency
+from src.utils.logger import Logger
+
+logger = Logger.get_logger()
+
+
+@dataclass
+class CycleSnapshot:
+    """1サイクルの判断に必要な取引所の情報をまとめて取得した結果"""
+
+    ohlcv: List[List]  # [[timestamp, open, high, low, close, volume], ...] 古い順
+    position_size: float  # 常に正の値
+    position_side: Optional[str]  # "long", "short", None（ポジションなし）
+    last_price: float  # 最終取引価格
+
+
+class AsyncMyExchange(BaseExchange):
+    """
+    ccxt.async_supportを使うMyExchangeの非同期版
+
+    公開メソッドはMyExchangeと同じ(取引所にリクエストするものはコルーチン)。
+    ポジションのキャッシュや注文数量の制限などの処理はMyExchangeと共通(BaseExchange)。
+    互いに依存しないリクエスト(OHLCV、ポジション、ティッカー)を
+    fetch_cycle_snapshotでまとめて送信し、注文までの待ち時間を短縮する。
+    """
+
+    @classmethod
+    async def create(
+        cls,
+        config: ExchangeConfig,
+        discord: DiscordNotifier,
+        trade_store: Optional[TradeStore] = None,
+    ) -> "AsyncMyExchange":
+        """取引所インスタンスを作成(trade_storeはMyExchange.createと同じ)"""
+        exchange_class = getattr(ccxt_async, config.name)
+        exchange = exchange_class(config.get_ccxt_config())
+
+        if config.name == "bybit":
+            if config.testnet:
+                exchange.set_sandbox_mode(True)
+                discord.print_and_notify(
+                    "Bybitのtestnetで稼働.", title="Bybit testnet mode", level="info"
+                )
+
+            # レバレッジと証拠金モードを設定
+            await bybit_config_async(exchange, config)
+
+        return cls(exchange, config, discord, trade_store)
+
+    async def close(self) -> None:
+        """取引所との接続を閉じる"""
+        await self._exchange.close()
+
+    async def _request(self, method: str, *args, **kwargs):
+        """MyExchange._requestと同じ(所要時間とエラー数を記録する)"""
+        try:
+            with latency.timer(f"exchange.{method}"):
+                return await getattr(self._exchange, method)(*args, **kwargs)
+        except Exception as e:
+            self._count_request_error(method, e)
+            raise
+
+    async def fetch_ohlcv(
+        self,
+        symbol: str,
+        timeframe: str = "15m",
+        limit: Optional[int] = None,
+        since: Optional[int] = None,
+    ) -> List[List]:
+        """
+        OHLCVデータを取得する。MyExchange.fetch_ohlcvと同じ
+
+        Returns:
+            [[timestamp, open, high, low, close, volume], ...]
+            並び順は古い順。
+        """
+        logger.info(
+            f"Fetching OHLCV - Symbol: {symbol}, Timeframe: {timeframe}, "
+            f"Limit: {limit}, Since: {since}"
+        )
+        data = await self._request(
+            "fetch_ohlcv", symbol, timeframe=timeframe, since=since, limit=limit
+        )
+        logger.info(f"Fetched {len(data)} candles")
+        return data
+
+    async def fetch_time(self) -> int:
+        """取引所のサーバー時刻（ミリ秒）を取得する。MyExchange.fetch_timeと同じ"""
+        return await self._request("fetch_time")
+
+    async def get_time_offset(self) -> int:
+        """
+        取引所のサーバー時刻と現在時刻のオフセットを計算する。MyExchange.get_time_offsetと同じ
+
+        Returns:
+            int: オフセット（ミリ秒）
+        """
+        start = time.time() * 1000
+        server_time = await self.fetch_time()
+        end = time.time() * 1000
+        return self._time_offset(start, server_time, end)
+
+    async def fetch_last_price(self, symbol: str) -> float:
+        """最終取引価格を取得する"""
+        ticker = await self._request("fetch_ticker", symbol)
+        return ticker["last"]
+
+    async def fetch_cycle_snapshot(
+        self, symbol: str, timeframe: str, limit: int = 2
+    ) -> CycleSnapshot:
+        """
+        OHLCV、ポジション、ティッカーを同時にリクエストしてまとめて返す
+
+        Args:
+            symbol (str): 取引ペア
+            timeframe (str): タイムフレーム
+            limit (int): 取得するOHLCVの本数
+
+        Returns:
+            CycleSnapshot: 取得結果
+        """
+        ohlcv, (position_size, position_side), last_price = await asyncio.gather(
+            self.fetch_ohlcv(symbol, timeframe=timeframe, limit=limit),
+            self.get_position_info(symbol),
+            self.fetch_last_price(symbol),
+        )
+        return CycleSnapshot(
+            ohlcv=ohlcv,
+            position_size=position_size,
+            position_side=position_side,
+            last_price=last_price,
+        )
+
+    async def place_order(
+        self,
+        symbol: str,
+        side: str,
+        amount: float,
+        snapshot: Optional[CycleSnapshot] = None,
+    ) -> Optional[dict]:
+        """
+        ポジションサイズをチェックして成行注文を実行
+
+        Args:
+            symbol (str): 取引ペア
+            side (str): 注文サイド ("long" or "short")
+            amount (float): 注文数量(正の値)
+            snapshot (Optional[CycleSnapshot]): 同じサイクルで取得済みの情報。
+                指定した場合は価格を取得し直さない(ポジションは同じサイクルの
+                close_all_positionで変わるため、snapshotではなくキャッシュから取得する)
+
+        Returns:
+            Optional[dict]: 注文が成功した場合は注文情報、制限された場合はNone
+        """
+        if snapshot is not None:
+            current_position = await self.get_position_size(symbol)
+            price = snapshot.last_price
+        elif self._config.dry_run:
+            current_position, price = await asyncio.gather(
+                self.get_position_size(symbol), self.fetch_last_price(symbol)
+            )
+        else:
+            current_position, price = await self.get_position_size(symbol), None
+
+        if self._exceeds_max_position(current_position, amount):
+            return None
+
+        # dry_runモードの場合
+        if self._config.dry_run:
+            return self.pnl_tracker.simulate_trade(
+                symbol=symbol,
+                side=side,
+                price=price,
+                amount=amount,
+            )
+
+        method, order_side = self._order_method(side)
+        self._notify_order(symbol, side, amount)
+        try:
+            order = await self._request(method, symbol, amount)
+            self._apply_order_to_position_cache(symbol, order_side, order)
+        except Exception:
+            # 注文が通ったかどうか分からないため、次回は取引所から取得し直す
+            self.invalidate_position_cache(symbol)
+            raise
+        return order
+
+    async def get_position_info(
+        self, symbol: str, force_sync: bool = False
+    ) -> tuple[float, Optional[str]]:
+        """
+        現在のポジション情報を取得。MyExchange.get_position_infoと同じ
+
+        Args:
+            symbol (str): 取引ペア（例: 'BTCUSDT'）
+            force_sync (bool): Trueの場合はキャッシュを使わず取引所から取得する
+
+        Returns:
+            tuple[float, Optional[str]]: (ポジションサイズ, ポジションの方向)
+        """
+        cached = self._cached_position(symbol, force_sync)
+        if cached is not None:
+            return cached
+
+        method, args = self._position_request(symbol)
+        try:
+            response = await self._request(method, *args)
+            size, side = self._parse_position(method, response, symbol)
+        except Exception as e:
+            self._notify_position_error(e)
+            raise
+        self._cache_position(symbol, size, side)
+        return size, side
+
+    async def reconcile_position(self, symbol: str) -> bool:
+        """
+        必要な場合に取引所からポジション情報を取得し直す。MyExchange.reconcile_positionと同じ
+
+        Returns:
+            bool: 取引所から取得し直した場合はTrue
+        """
+        if not self._needs_reconcile(symbol):
+            return False
+
+        cached_info = self._cached_position(symbol)
+        synced_info = await self.get_position_info(symbol, force_sync=True)
+        self._notify_reconciled(cached_info, synced_info)
+        return True
+
+    async def get_position_size(self, symbol: str) -> float:
+        """現在のポジションサイズを取得（常に正の値）"""
+        size, _ = await self.get_position_info(symbol)
+        return size
+
+    async def close_all_position(
+        self, symbol: str, snapshot: Optional[CycleSnapshot] = None
+    ) -> Optional[dict]:
+        """
+        ポジションをすべて決済
+
+        Args:
+            symbol (str): 取引ペア
+            snapshot (Optional[CycleSnapshot]): 同じサイクルで取得済みの情報。
+                指定した場合はポジションと価格を取得し直さない
+        """
+        try:
+            if self._config.dry_run:
+                if snapshot is not None:
+                    price = snapshot.last_price
+                else:
+                    price = await self.fetch_last_price(symbol)
+                self._simulate_close(symbol, price)
+                return
+
+            if snapshot is not None:
+                position_size, position_side = (
+                    snapshot.position_size,
+                    snapshot.position_side,
+                )
+            else:
+                position_size, position_side = await self.get_position_info(symbol)
+
+            if position_size == 0:
+                self._notify_no_position()
+                return
+
+            if position_side not in ("long", "short"):
+                self._notify_unknown_side()
+                return
+
+            method, order_side = self._close_method(position_side)
+            order = await self._request(
+                method, symbol, abs(position_size), params={"reduceOnly": True}
+            )
+            self._apply_order_to_position_cache(symbol, order_side, order)
+            self._notify_closed(position_side, order)
+            return order
+
+        except Exception as e:
+            self._notify_close_error(symbol, e)
+            raise
@@ -0,0 +1,259 @@
+from typing import Optional
+
+from src.config.config import ExchangeConfig
+from src.trade_store import TradeStore
+from src.utils.discord import DiscordNotifier
+from src.utils.metrics import metrics
+from src.utils.pnl_tracker import PnLTracker
+from src.utils.time_utils import YEAR_MS, Clock, timeframe_to_ms
+
+
+class BaseExchange:
+    """
+    MyExchangeとAsyncMyExchangeに共通する、取引所への通信を含まない処理
+
+    ポジションのキャッシュ、取引所の応答の解釈、注文数量の制限、通知を扱う。
+    取引所へのリクエストは各サブクラスが同期(MyExchange)または
+    非同期(AsyncMyExchange)で行い、結果をここのメソッドに渡す。
+    """
+
+    def __init__(
+        self,
+        exchange,
+        config: ExchangeConfig,
+        discord: DiscordNotifier,
+        trade_store: Optional[TradeStore] = None,
+        clock: Optional[Clock] = None,
+    ):
+        self._exchange = exchange
+        self._config = config
+        self._discord = discord
+        # ポジションの同期時刻やDryRunの取引時刻に使う時計(リプレイでは偽の時計)
+        self._clock = clock or Clock()
+        self.pnl_tracker = PnLTracker(
+            simulation_initial_balance=config.simulation_initial_balance,
+            fee_rate=config.fee_rate,
+            leverage=config.leverage,
+            discord=discord,
+            store=trade_store,
+            # リスク指標の年率換算用(足は暗号資産なので365日24時間)
+            periods_per_year=YEAR_MS / timeframe_to_ms(config.timeframe),
+            clock=self._clock,
+        )
+        # シンボルごとのポジションのキャッシュ: (ポジションサイズ, 方向, 取引所と同期した時刻)
+        # 自分の注文結果で更新し、結果が不明な場合やエラー時は破棄して取引所から取得し直す
+        self._position_cache: dict[str, tuple[float, Optional[str], float]] = {}
+
+    @staticmethod
+    def _count_request_error(method: str, error: Exception) -> None:
+        """取引所APIのメソッドごとのエラー数を加算する"""
+        metrics.inc(
+            "exchange_errors_total",
+            help="取引所APIのエラー数",
+            method=method,
+            error=type(error).__name__,
+        )
+
+    @staticmethod
+    def _time_offset(start_ms: float, server_time: int, end_ms: float) -> int:
+        """リクエストの往復時間の中間時点とサーバー時刻を比較したオフセット(ミリ秒)"""
+        return int(server_time - (start_ms + end_ms) / 2)
+
+    def _position_request(self, symbol: str) -> tuple[str, tuple]:
+        """
+        ポジション情報の取得に使うccxtのメソッド名と引数を返す
+
+        Raises:
+            NotImplementedError: ポジション情報の取得に対応していない取引所の場合
+        """
+        # 先物取引所の場合
+        if self._exchange.has["fetchPosition"]:
+            return "fetch_position", (symbol,)
+        # 現物取引所の場合
+        if self._exchange.has["fetchBalance"]:
+            return "fetch_balance", ()
+        raise NotImplementedError(
+            f"この取引所（{self._exchange.id}）はポジション情報の取得に対応していません"
+        )
+
+    @staticmethod
+    def _parse_position(
+        method: str, response: Optional[dict], symbol: str
+    ) -> tuple[float, Optional[str]]:
+        """fetch_position/fetch_balanceの応答を(ポジションサイズ, 方向)にする"""
+        if method == "fetch_position":
+            if response is None or response["contracts"] == 0:
+                return 0.0, None
+            return float(response["contracts"]), response["side"]
+
+        base_currency = symbol.split("/")[0]  # 例: 'BTC/USDT' -> 'BTC'
+        size = float(response[base_currency]["free"])
+        return size, "long" if size > 0 else None
+
+    def _notify_position_error(self, error: Exception) -> None:
+        self._discord.print_and_notify(
+            f"ポジション情報の取得に失敗: {str(error)}",
+            title="ポジション情報取得エラー",
+            level="error",
+        )
+
+    def _cached_position(
+        self, symbol: str, force_sync: bool = False
+    ) -> Optional[tuple[float, Optional[str]]]:
+        """キャッシュ済みのポジション情報。キャッシュが無いかforce_syncの場合はNone"""
+        cached = self._position_cache.get(symbol)
+        if cached is None or force_sync:
+            return None
+        return cached[0], cached[1]
+
+    def _cache_position(self, symbol: str, size: float, side: Optional[str]) -> None:
+        """取引所から取得したポジション情報をキャッシュする"""
+        self._position_cache[symbol] = (size, side, self._clock.monotonic())
+
+    def _needs_reconcile(self, symbol: str) -> bool:
+        """キャッシュが無い、またはposition_sync_interval秒以上同期していないか"""
+        cached = self._position_cache.get(symbol)
+        return (
+            cached is None
+            or self._clock.monotonic() - cached[2]
+            >= self._config.position_sync_interval
+        )
+
+    def _notify_reconciled(
+        self,
+        cached_info: Optional[tuple[float, Optional[str]]],
+        synced_info: tuple[float, Optional[str]],
+    ) -> None:
+        """突き合わせの結果、キャッシュが取引所と異なっていた場合に通知する"""
+        if cached_info is not None and cached_info != synced_info:
+            self._discord.print_and_notify(
+                f"ポジションのキャッシュが取引所と異なっていたため更新しました: "
+                f"{cached_info} -> {synced_info}",
+                title="ポジション同期",
+                level="warning",
+            )
+
+    def invalidate_position_cache(self, symbol: Optional[str] = None) -> None:
+        """
+        ポジションのキャッシュを破棄する。次回のget_position_infoで取引所から取得する
+
+        Args:
+            symbol (Optional[str]): 破棄するシンボル。Noneの場合は全シンボル
+        """
+        if symbol is None:
+            self._position_cache.clear()
+        else:
+            self._position_cache.pop(symbol, None)
+
+    def _apply_order_to_position_cache(
+        self, symbol: str, order_side: str, order: Optional[dict]
+    ) -> None:
+        """
+        約定済みの注文結果でポジションのキャッシュを更新する。
+        約定数量が分からない場合(成行注文の応答に約定情報が含まれない取引所など)は
+        キャッシュを破棄する
+
+        Args:
+            symbol (str): 取引ペア
+            order_side (str): 注文サイド ("buy" or "sell")
+            order (Optional[dict]): ccxtの注文結果
+        """
+        cached = self._position_cache.get(symbol)
+        filled = order.get("filled") if order else None
+        if cached is None or not filled or order.get("status") != "closed":
+            self.invalidate_position_cache(symbol)
+            return
+
+        size, side, synced_at = cached
+        # ロングを正、ショートを負とした数量で計算する
+        signed_size = size if side == "long" else -size
+        signed_size += filled if order_side == "buy" else -filled
+
+        if signed_size > 0:
+            new_side = "long"
+        elif signed_size < 0:
+            new_side = "short"
+        else:
+            new_side = None
+        self._position_cache[symbol] = (abs(signed_size), new_side, synced_at)
+
+    def _exceeds_max_position(self, current_position: float, amount: float) -> bool:
+        """注文後のポジションが最大ポジション数量を超える場合は通知してTrueを返す"""
+        if current_position + amount <= self._config.max_position:
+            return False
+        self._discord.print_and_notify(
+            f"最大ポジション数量({self._config.max_position})を超えるため注文をスキップ(現在のポジションサイズ: {current_position})",
+            title="注文制限",
+            level="warning",
+        )
+        return True
+
+    def _simulate_close(self, symbol: str, price: float) -> None:
+        """DryRunのポジションを価格priceですべて決済する"""
+        position = self.pnl_tracker.position
+        side = "sell" if position.side == "long" else "buy"
+        self.pnl_tracker.simulate_trade(
+            symbol=symbol,
+            side=side,
+            price=price,
+            amount=abs(position.amount),
+        )
+
+    @staticmethod
+    def _order_method(side: str) -> tuple[str, str]:
+        """注文サイド("long" or "short")に対応する(ccxtのメソッド名, 約定サイド)"""
+        if side == "long":
+            return "create_market_buy_order", "buy"
+        return "create_market_sell_order", "sell"
+
+    @staticmethod
+    def _close_method(position_side: str) -> tuple[str, str]:
+        """決済するポジションの方向に対応する(ccxtのメソッド名, 約定サイド)"""
+        if position_side == "long":
+            # ロングポジションの決済（成行売り）
+            return "create_market_sell_order", "sell"
+        # ショートポジションの決済（成行買い）
+        return "create_market_buy_order", "buy"
+
+    def _notify_order(self, symbol: str, side: str, amount: float) -> None:
+        """成行注文を送信することを通知する"""
+        self._discord.send_only_mention()
+        if side == "long":
+            message = f"Creating market buy order - Symbol: {symbol}, Amount: {amount}"
+            title = "成行買い注文"
+        else:
+            message = f"Creating market sell order - Symbol: {symbol}, Amount: {amount}"
+            title = "成行売り注文"
+        self._discord.print_and_notify(message, title=title, level="info", urgent=True)
+
+    def _notify_no_position(self) -> None:
+        self._discord.print_and_notify(
+            "決済すべきポジションがありません", title="ポジション決済", level="warning"
+        )
+
+    def _notify_unknown_side(self) -> None:
+        self._discord.print_and_notify(
+            f"{type(self).__name__}.close_all_position(): ポジションの方向が不明です",
+            title="ポジション決済",
+            level="error",
+        )
+
+    def _notify_closed(self, position_side: str, order: Optional[dict]) -> None:
+        """ポジションを決済したことを通知する"""
+        self._discord.send_only_mention()
+        label = "ロング" if position_side == "long" else "ショート"
+        self._discord.print_and_notify(
+            f"{label}ポジションを決済しました: {order}",
+            title="ポジション決済",
+            level="info",
+            urgent=True,
+        )
+
+    def _notify_close_error(self, symbol: str, error: Exception) -> None:
+        """決済に失敗した場合はキャッシュを破棄して通知する"""
+        self.invalidate_position_cache(symbol)
+        self._discord.print_and_notify(
+            f"ポジション決済に失敗: {str(error)}",
+            title="ポジション決済エラー",
+            level="error",
+        )
@@ -50,3 +50,37 @@ def config(exchange: ccxt.Exchange, config: ExchangeConfig) -> ccxt.Exchange:
             print(f"Margin mode is already set to {config.margin_type}")
 
     return exchange
+
+
+async def config_async(exchange, config: ExchangeConfig):
+    """Bybit取引所の設定を行う(ccxt.async_support用)
+
+    処理内容はconfig()と同じ。
+
+    Args:
+        exchange (ccxt.async_support.Exchange): 取引所インスタンス
+        config (ExchangeConfig): 取引所の設定
+
+    Returns:
+        ccxt.async_support.Exchange: 設定済みの取引所インスタンス
+    """
+    try:
+        await exchange.set_leverage(config.leverage, config.symbol)
+    except BadRequest as e:
+        if "Set leverage not modified" in str(e):
+            print(f"Leverage is already set to {config.leverage}")
+
+    try:
+        await exchange.set_margin_mode(
+            config.margin_type,
+            config.symbol,
+            params={
+                "buy_leverage": config.buy_leverage,
+                "sell_leverage": config.sell_leverage,
+            },
+        )
+    except MarginModeAlreadySet as e:
+        if "Cross/isolated margin mode is not modified" in str(e):
+            print(f"Margin mode is already set to {config.margin_type}")
+
+    return exchange
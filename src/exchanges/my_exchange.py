@@ -4,31 +4,36 @@ from typing import List, Optional
 import ccxt
 
 from src.config.config import ExchangeConfig
+from src.exchanges.base_exchange import BaseExchange
 from src.exchanges.bybit import config as bybit_config
+from src.trade_store import TradeStore
 from src.utils.discord import DiscordNotifier
+from src.utils.latency import latency
 from src.utils.logger import Logger
-from src.utils.pnl_tracker import PnLTracker
 
 logger = Logger.get_logger()
 
 
-class MyExchange:
-    def __init__(
-        self, exchange: ccxt.Exchange, config: ExchangeConfig, discord: DiscordNotifier
-    ):
-        self._exchange = exchange
-        self._config = config
-        self._discord = discord
-        self.pnl_tracker = PnLTracker(
-            simulation_initial_balance=config.simulation_initial_balance,
-            fee_rate=config.fee_rate,
-            leverage=config.leverage,
-            discord=discord,
-        )
+class MyExchange(BaseExchange):
+    """
+    ccxtの同期APIで取引所とやり取りするクラス
+
+    ポジションのキャッシュや注文数量の制限などの処理はAsyncMyExchangeと共通(BaseExchange)。
+    """
 
     @classmethod
-    def create(cls, config: ExchangeConfig, discord: DiscordNotifier) -> "MyExchange":
-        """取引所インスタンスを作成"""
+    def create(
+        cls,
+        config: ExchangeConfig,
+        discord: DiscordNotifier,
+        trade_store: Optional[TradeStore] = None,
+    ) -> "MyExchange":
+        """
+        取引所インスタンスを作成
+
+        trade_storeを指定した場合、DryRun時の取引を追記し、保存済みの取引から
+        PnLTrackerの状態を復元する
+        """
         exchange_class = getattr(ccxt, config.name)
         exchange = exchange_class(config.get_ccxt_config())
 
@@ -42,11 +47,27 @@ class MyExchange:
             # レバレッジと証拠金モードを設定
             bybit_config(exchange, config)
 
-        instance = cls(exchange, config, discord)
+        instance = cls(exchange, config, discord, trade_store)
         return instance
 
+    def _request(self, method: str, *args, **kwargs):
+        """
+        ccxtのAPI(method)を呼び出し、所要時間を"exchange.<method>"として記録する。
+        失敗した場合はメソッドごとのエラー数を加算する
+        """
+        try:
+            with latency.timer(f"exchange.{method}"):
+                return getattr(self._exchange, method)(*args, **kwargs)
+        except Exception as e:
+            self._count_request_error(method, e)
+            raise
+
     def fetch_ohlcv(
-        self, symbol: str, timeframe: str = "15m", limit: Optional[int] = None
+        self,
+        symbol: str,
+        timeframe: str = "15m",
+        limit: Optional[int] = None,
+        since: Optional[int] = None,
     ) -> List[List]:
         """
         OHLCVデータを取得する。
@@ -55,14 +76,23 @@ class MyExchange:
         (https://docs.ccxt.com/#/?id=ohlcv-candlestick-charts)
         (ローソク足更新のタイミングで呼び出せば、最新分もほぼ確定足にできる。)
 
+        Args:
+            symbol (str): 取引ペア
+            timeframe (str): タイムフレーム
+            limit (Optional[int]): 取得する本数
+            since (Optional[int]): 取得開始時刻(ミリ秒)。指定した場合はこの時刻以降の足を返す
+
         Returns:
             [[timestamp, open, high, low, close, volume], ...]
             並び順は古い順。
         """
         logger.info(
-            f"Fetching OHLCV - Symbol: {symbol}, Timeframe: {timeframe}, Limit: {limit}"
+            f"Fetching OHLCV - Symbol: {symbol}, Timeframe: {timeframe}, "
+            f"Limit: {limit}, Since: {since}"
+        )
+        data = self._request(
+            "fetch_ohlcv", symbol, timeframe=timeframe, since=since, limit=limit
         )
-        data = self._exchange.fetch_ohlcv(symbol, timeframe=timeframe, limit=limit)
         logger.info(f"Fetched {len(data)} candles")
 
         ## タイムスタンプをISO8601形式に変換したデータをログ出力
@@ -76,18 +106,35 @@ class MyExchange:
 
         return data
 
-    def get_time_offset(self) -> int:
+    def fetch_time(self) -> int:
         """
-        取引所のサーバー時刻と現在時刻のオフセットを計算する。
+        取引所のサーバー時刻を取得する。
         TODO: fetch_time()はすべての取引所でサポートされているわけではないかもしれないので注意
         Bybitはサポートされている。
 
+        Returns:
+            int: サーバー時刻（ミリ秒）
+        """
+        return self._request("fetch_time")
+
+    def get_time_offset(self) -> int:
+        """
+        取引所のサーバー時刻と現在時刻のオフセットを計算する。
+        1回の取得で往復時間の中間時点と比較する簡易版。
+        精度が必要な場合はsrc.utils.clock_sync.ClockSyncを使う。
+
         Returns:
             int: オフセット（ミリ秒）
         """
-        server_time = self._exchange.fetch_time()  # サーバー時刻を取得(ミリ秒)
-        local_time = int(time.time() * 1000)  # ローカル時刻をミリ秒に変換
-        return server_time - local_time
+        start = time.time() * 1000
+        server_time = self.fetch_time()  # サーバー時刻を取得(ミリ秒)
+        end = time.time() * 1000
+        return self._time_offset(start, server_time, end)
+
+    def fetch_last_price(self, symbol: str) -> float:
+        """最終取引価格を取得する"""
+        ticker = self._request("fetch_ticker", symbol)
+        return ticker["last"]
 
     def place_order(self, symbol: str, side: str, amount: float) -> Optional[dict]:
         """
@@ -102,87 +149,86 @@ class MyExchange:
             Optional[dict]: 注文が成功した場合は注文情報、制限された場合はNone
         """
         current_position = self.get_position_size(symbol)  # 正の値
-        new_position_size = current_position + amount
-
-        if new_position_size > self._config.max_position:
-            self._discord.print_and_notify(
-                f"最大ポジション数量({self._config.max_position})を超えるため注文をスキップ(現在のポジションサイズ: {current_position})",
-                title="注文制限",
-                level="warning",
-            )
+        if self._exceeds_max_position(current_position, amount):
             return None
 
         # dry_runモードの場合
         if self._config.dry_run:
-            # 現在の価格を取得
-            ticker = self._exchange.fetch_ticker(symbol)
-            price = ticker["last"]
-
-            # シミュレーション実行と通知メッセージの生成
-            order_info = self.pnl_tracker.simulate_trade(
+            # 現在の価格でシミュレーション実行
+            return self.pnl_tracker.simulate_trade(
                 symbol=symbol,
                 side=side,
-                price=price,
+                price=self.fetch_last_price(symbol),
                 amount=amount,
             )
 
-            return order_info
-
-        if side == "long":
-            self._discord.send_only_mention()
-            self._discord.print_and_notify(
-                f"Creating market buy order - Symbol: {symbol}, Amount: {amount}",
-                title="成行買い注文",
-                level="info",
-            )
-            return self._exchange.create_market_buy_order(symbol, amount)
-        else:
-            self._discord.send_only_mention()
-            self._discord.print_and_notify(
-                f"Creating market sell order - Symbol: {symbol}, Amount: {amount}",
-                title="成行売り注文",
-                level="info",
-            )
-            return self._exchange.create_market_sell_order(symbol, amount)
+        method, order_side = self._order_method(side)
+        self._notify_order(symbol, side, amount)
+        try:
+            order = self._request(method, symbol, amount)
+            self._apply_order_to_position_cache(symbol, order_side, order)
+        except Exception:
+            # 注文が通ったかどうか分からないため、次回は取引所から取得し直す
+            self.invalidate_position_cache(symbol)
+            raise
+        return order
 
-    def get_position_info(self, symbol: str) -> tuple[float, Optional[str]]:
+    def get_position_info(
+        self, symbol: str, force_sync: bool = False
+    ) -> tuple[float, Optional[str]]:
         """
         現在のポジション情報を取得
 
+        キャッシュがあればそれを返し、取引所には問い合わせない。
+        キャッシュは自分の注文結果で更新され、注文結果が不明な場合やエラー時に破棄される。
+        取引所との突き合わせはreconcile_positionで定期的に行う。
+
         Args:
             symbol (str): 取引ペア（例: 'BTCUSDT'）
+            force_sync (bool): Trueの場合はキャッシュを使わず取引所から取得する
 
         Returns:
             tuple[float, Optional[str]]: (ポジションサイズ, ポジションの方向)
             - ポジションサイズ: 常に正の値
             - ポジションの方向: "long", "short", None（ポジションなし）
         """
-        try:
-            # 先物取引所の場合
-            if self._exchange.has["fetchPosition"]:
-                position = self._exchange.fetch_position(symbol)
-                if position is None or position["contracts"] == 0:
-                    return 0.0, None
-                return float(position["contracts"]), position["side"]
-
-            # 現物取引所の場合
-            elif self._exchange.has["fetchBalance"]:
-                balance = self._exchange.fetch_balance()
-                base_currency = symbol.split("/")[0]  # 例: 'BTC/USDT' -> 'BTC'
-                size = float(balance[base_currency]["free"])
-                return size, "long" if size > 0 else None
+        cached = self._cached_position(symbol, force_sync)
+        if cached is not None:
+            return cached
 
+        size, side = self._fetch_position_info(symbol)
+        self._cache_position(symbol, size, side)
+        return size, side
+
+    def _fetch_position_info(self, symbol: str) -> tuple[float, Optional[str]]:
+        """取引所から現在のポジション情報を取得"""
+        method, args = self._position_request(symbol)
+        try:
+            response = self._request(method, *args)
+            return self._parse_position(method, response, symbol)
         except Exception as e:
-            self._discord.print_and_notify(
-                f"ポジション情報の取得に失敗: {str(e)}",
-                title="ポジション情報取得エラー",
-                level="error",
-            )
+            self._notify_position_error(e)
             raise
 
-        raise NotImplementedError(
-            f"この取引所（{self._exchange.id}）はポジション情報の取得に対応していません"
-        )
+    def reconcile_position(self, symbol: str) -> bool:
+        """
+        キャッシュが無い、またはposition_sync_interval秒以上取引所と同期していない場合に、
+        取引所からポジション情報を取得し直す。
+        注文の直前ではなく、サイクルの合間に呼び出すことを想定している
+
+        Args:
+            symbol (str): 取引ペア
+
+        Returns:
+            bool: 取引所から取得し直した場合はTrue
+        """
+        if not self._needs_reconcile(symbol):
+            return False
+
+        cached_info = self._cached_position(symbol)
+        synced_info = self.get_position_info(symbol, force_sync=True)
+        self._notify_reconciled(cached_info, synced_info)
+        return True
 
     def get_position_size(self, symbol: str) -> float:
         """
@@ -201,62 +247,29 @@ class MyExchange:
         """ポジションをすべて決済"""
         try:
             if self._config.dry_run:
-                # 今持っているポジション(＝今保有中の全数量)
-                position_size = self.pnl_tracker.position.amount
-
-                # 現在の価格を取得
-                ticker = self._exchange.fetch_ticker(symbol)
-                price = ticker["last"]
-
-                side = "sell" if self.pnl_tracker.position.side == "long" else "buy"
-                self.pnl_tracker.simulate_trade(
-                    symbol=symbol,
-                    side=side,
-                    price=price,
-                    amount=abs(position_size),
-                )
+                # 今持っているポジションを現在の価格ですべて決済
+                self._simulate_close(symbol, self.fetch_last_price(symbol))
                 return
 
             # 現在のポジションサイズを取得
             position_size, position_side = self.get_position_info(symbol)
 
             if position_size == 0:
-                message = "決済すべきポジションがありません"
-                self._discord.print_and_notify(
-                    message, title="ポジション決済", level="warning"
-                )
+                self._notify_no_position()
                 return
 
-            if position_side == "long":
-                # ロングポジションの決済（成行売り）
-                order = self._exchange.create_market_sell_order(
-                    symbol, abs(position_size), params={"reduceOnly": True}
-                )
-                self._discord.send_only_mention()
-                message = f"ロングポジションを決済しました: {order}"
-                self._discord.print_and_notify(
-                    message, title="ポジション決済", level="info"
-                )
-            elif position_side == "short":
-                # ショートポジションの決済（成行買い）
-                order = self._exchange.create_market_buy_order(
-                    symbol, abs(position_size), params={"reduceOnly": True}
-                )
-                self._discord.send_only_mention()
-                message = f"ショートポジションを決済しました: {order}"
-                self._discord.print_and_notify(
-                    message, title="ポジション決済", level="info"
-                )
-            else:
-                self._discord.print_and_notify(
-                    "MyExchange.close_all_position(): ポジションの方向が不明です",
-                    title="ポジション決済",
-                    level="error",
-                )
+            if position_side not in ("long", "short"):
+                self._notify_unknown_side()
+                return
 
-        except Exception as e:
-            error_message = f"ポジション決済に失敗: {str(e)}"
-            self._discord.print_and_notify(
-                error_message, title="ポジション決済エラー", level="error"
+            method, order_side = self._close_method(position_side)
+            order = self._request(
+                method, symbol, abs(position_size), params={"reduceOnly": True}
             )
+            self._apply_order_to_position_cache(symbol, order_side, order)
+            self._notify_closed(position_side, order)
+            return order
+
+        except Exception as e:
+            self._notify_close_error(symbol, e)
             raise
@@ -1,7 +1,15 @@
+import time
+from collections import deque
+from typing import Optional
+
 import pandas as pd
 
+from src.exchanges.my_exchange import MyExchange
+from src.ohlcv_buffer import OHLCVRingBuffer
+from src.ohlcv_downloader import BulkOHLCVDownloader
+from src.ohlcv_store import OHLCVStore
 from src.utils.discord import DiscordNotifier
-from src.utils.time_utils import convert_to_jst
+from src.utils.time_utils import timeframe_to_ms
 
 
 class HistoricalData:
@@ -12,6 +20,10 @@ class HistoricalData:
         num_bars: int,
         initial_data: list[list],
         discord: DiscordNotifier,
+        store: Optional[OHLCVStore] = None,
+        exchange: Optional[MyExchange] = None,
+        symbol: Optional[str] = None,
+        timeframe: Optional[str] = None,
     ):
         """_summary_
 
@@ -19,28 +31,238 @@ class HistoricalData:
             num_bars (int): 保持するデータ数
             initial_data (list[list]): 初期データ。本数分のCOLUMNSデータリストのリスト
             discord (DiscordNotifier): discordクライアント
+            store (Optional[OHLCVStore]): 確定足を追記するOHLCVストア
+            exchange (Optional[MyExchange]): 欠損した足の補完に使う取引所
+            symbol (Optional[str]): 欠損した足の補完に使う取引ペア
+            timeframe (Optional[str]): タイムフレーム。指定した場合はupdate時に欠損を検出する
         """
         self.num_bars = num_bars  # 保持するデータ数
-        initial_df = pd.DataFrame(initial_data, columns=self.COLUMNS)
-        initial_df.set_index("timestamp", inplace=True)
-        self.data = convert_to_jst(initial_df)
+        # 事前確保したリングバッファで保持し、更新のたびにDataFrameを作り直さない
+        self._buffer = OHLCVRingBuffer(num_bars)
+        self._buffer.extend(initial_data)
         self.discord = discord
+        self.store = store
+        self.exchange = exchange
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self._interval = timeframe_to_ms(timeframe) if timeframe else None
+
+        # データが変わるたびに増える版数。DataFrameやインジケーターのキャッシュキーに使う
+        self.version = 0
+        self._frame: Optional[pd.DataFrame] = None
+        self._frame_version: Optional[int] = None
+
+    @classmethod
+    def load(
+        cls,
+        num_bars: int,
+        exchange: MyExchange,
+        symbol: str,
+        timeframe: str,
+        discord: DiscordNotifier,
+        store: Optional[OHLCVStore] = None,
+    ) -> "HistoricalData":
+        """
+        初期データを用意してHistoricalDataを作成する
+
+        storeに十分な本数の新しい足が保存されていれば、保存済みの足を読み込み、
+        保存済みの最新足以降だけを取引所から取得する。
+        num_bars本以上停止していた場合は、ストアに穴を残さないよう停止中の足をすべて
+        ストアに補完してから読み込む。ストアが空の場合(初回起動)は従来通りnum_bars本を取得する。
+        取得した確定足はstoreに追記する。
+
+        Args:
+            num_bars (int): 保持するデータ数
+            exchange (MyExchange): 取引所
+            symbol (str): 取引ペア
+            timeframe (str): タイムフレーム
+            discord (DiscordNotifier): discordクライアント
+            store (Optional[OHLCVStore]): OHLCVストア
+
+        Returns:
+            HistoricalData: 確定足で初期化したHistoricalData
+        """
+        interval = timeframe_to_ms(timeframe)
+        stored = store.load(limit=num_bars) if store is not None else []
+
+        fetched = None
+        if stored:
+            # 保存済みの最新足から現在の未確定足までの本数
+            now = int(time.time() * 1000)
+            bars_since_last = (now - stored[-1][0]) // interval + 1
+            if bars_since_last >= num_bars:
+                # 停止中の確定足をページに分けてストアに追記し、直近の分を読み込み直す
+                BulkOHLCVDownloader(exchange, symbol, timeframe).download(
+                    stored[-1][0] + interval, now // interval * interval, store=store
+                )
+                stored = store.load(limit=num_bars)
+                bars_since_last = (now - stored[-1][0]) // interval + 1
+            if bars_since_last < num_bars and len(stored) + bars_since_last >= num_bars:
+                fetched = exchange.fetch_ohlcv(
+                    symbol,
+                    timeframe=timeframe,
+                    since=stored[-1][0],
+                    limit=bars_since_last + 2,  # 時刻のずれを考慮して少し多めに取得
+                )
+        if fetched is None:
+            stored = []
+            fetched = exchange.fetch_ohlcv(symbol, timeframe=timeframe, limit=num_bars)
+
+        # 最後の要素（未確定足）を除外し、保存済みの足より新しいものだけを使う
+        last_stored = stored[-1][0] if stored else None
+        new_rows = [
+            row for row in fetched[:-1] if last_stored is None or row[0] > last_stored
+        ]
+        if store is not None:
+            store.append(new_rows)
+
+        discord.print_and_notify(
+            f"初期データ: 保存済み{len(stored)}本 + 取得{len(new_rows)}本",
+            level="info",
+        )
+        return cls(
+            num_bars,
+            (stored + new_rows)[-num_bars:],
+            discord,
+            store=store,
+            exchange=exchange,
+            symbol=symbol,
+            timeframe=timeframe,
+        )
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    @property
+    def last_timestamp(self) -> Optional[int]:
+        """最新の足のタイムスタンプ(ミリ秒)。データがない場合はNone"""
+        return self._buffer.last_timestamp
+
+    @property
+    def token(self) -> tuple[Optional[int], int]:
+        """
+        データの状態を表すトークン(最新足のタイムスタンプ, 版数)。
+        トークンが同じであればdataの内容も同じであることが保証される
+        """
+        return self.last_timestamp, self.version
+
+    @property
+    def data(self) -> pd.DataFrame:
+        """
+        保持しているデータ(日本時間のインデックス)のDataFrame。
+
+        最初に参照された時点で作成し、次にデータが更新されるまでは同じオブジェクトを返す。
+        バッファとは値を共有しないため、呼び出し元で変更してもバッファには影響しない
+        """
+        if self._frame is None or self._frame_version != self.version:
+            self._frame = self._buffer.to_frame(copy=True)
+            self._frame_version = self.version
+        return self._frame
+
+    def view(self) -> pd.DataFrame:
+        """
+        保持しているデータをコピーせずに参照するDataFrameを返す。
+        値は読み取り専用で、次のupdate以降は内容が変わりうるため一時的な参照に使う
+        """
+        return self._buffer.to_frame()
+
+    def _append(self, row: list) -> None:
+        """1本分の新しい足を追加し、ストアにも追記する"""
+        self._buffer.append(row)
+        if self.store is not None:
+            self.store.append([row])
+
+    def _backfill(self, next_timestamp: int) -> int:
+        """
+        最新足からnext_timestampの直前までの欠損した足を1回のリクエストでまとめて取得して追加する
+
+        Returns:
+            int: 補完した足の本数
+        """
+        last_timestamp = self._buffer.last_timestamp
+        missing = (next_timestamp - last_timestamp) // self._interval - 1
 
-    def update(self, new_data: list, enable_log: bool = True) -> None:
-        """1件分のデータで更新する"""
-        new_df = pd.DataFrame([new_data], columns=self.COLUMNS)
-        new_df.set_index("timestamp", inplace=True)
-        new_df = convert_to_jst(new_df)
+        if self.exchange is None:
+            self.discord.print_and_notify(
+                f"{missing}本の足の欠損を検出しましたが、取引所が未設定のため補完しません",
+                title="データ欠損",
+                level="warning",
+            )
+            return 0
+
+        if self.store is not None and missing > self.num_bars:
+            # ストアには穴を残さないよう、保持数を超える欠損もページに分けて全期間を取得する
+            # (バッファには直近のnum_bars本だけを追加する)
+            recent: deque = deque(maxlen=self.num_bars)
+            repaired = BulkOHLCVDownloader(
+                self.exchange, self.symbol, self.timeframe
+            ).download(
+                last_timestamp + self._interval,
+                next_timestamp,
+                store=self.store,
+                on_rows=recent.extend,
+            )
+            self._buffer.extend([row for row in recent if row[0] > last_timestamp])
+            self.discord.print_and_notify(
+                f"{missing}本の足の欠損を検出し、{repaired}本を補完しました",
+                title="データ欠損",
+                level="warning",
+            )
+            return repaired
+
+        # 保持数を超える分は取得しても捨てられるので、直近の分だけ取得する
+        count = min(missing, self.num_bars)
+        since = next_timestamp - count * self._interval
+        rows = self.exchange.fetch_ohlcv(
+            self.symbol, timeframe=self.timeframe, since=since, limit=count
+        )
+
+        repaired = 0
+        for row in rows:
+            # 範囲外や重複した足は除く
+            if (
+                since <= row[0] < next_timestamp
+                and row[0] > self._buffer.last_timestamp
+            ):
+                self._append(row)
+                repaired += 1
+
+        self.discord.print_and_notify(
+            f"{missing}本の足の欠損を検出し、{repaired}本を補完しました",
+            title="データ欠損",
+            level="warning",
+        )
+        return repaired
+
+    def update(self, new_data: list, enable_log: bool = True) -> int:
+        """
+        1件分のデータで更新する
+
+        前回の最新足との間に欠損がある場合(timeframe指定時のみ)は、
+        欠損分を取引所からまとめて取得して補完してから追加する。
+
+        Returns:
+            int: 補完した足の本数
+        """
+        repaired = 0
+        last_timestamp = self._buffer.last_timestamp
 
         # 同じ時刻の足の場合は更新し、そうでない場合は追加
-        if new_df.index[-1] == self.data.index[-1]:
-            self.data.loc[new_df.index[-1]] = new_df.iloc[-1]
+        # (データ数の制限はリングバッファが行う)
+        if new_data[0] == last_timestamp:
+            # リトライ等で同じ足を再取得した場合は版数を変えない
+            if [float(value) for value in new_data[1:6]] == self._buffer.last()[1:]:
+                return 0
+            self._buffer.replace_last(new_data)
         else:
-            self.data = pd.concat([self.data, new_df])
-
-        # データ数を制限
-        if len(self.data) > self.num_bars:
-            self.data = self.data.tail(self.num_bars)
+            if (
+                self._interval is not None
+                and last_timestamp is not None
+                and new_data[0] > last_timestamp + self._interval
+            ):
+                repaired = self._backfill(new_data[0])
+            self._append(new_data)
+        self.version += 1
 
         # データの状態を確認（日本時間で表示）
         if enable_log:
@@ -50,3 +272,5 @@ class HistoricalData:
             #    level="debug",
             # )
             pass
+
+        return repaired
@@ -1,11 +1,146 @@
+import math
+import random
+from collections import deque
+from typing import Optional
+
 import numpy as np
 import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+# 一度に処理する窓要素数の上限(窓数 × 期間)。大きな入力でもメモリを食い潰さないよう分割する
+_CHUNK_ELEMENTS = 1 << 22
+
+
+def _average_ranks_sorted(sorted_values: np.ndarray) -> np.ndarray:
+    """
+    各行が昇順にソート済みの2次元配列に対して、同値を平均した順位(1始まり)を返す。
+    pandas.Series.rank()(method="average")と同じ順位付けになる。
+
+    Parameters:
+    -----------
+    sorted_values : numpy.ndarray
+        shape=(窓数, 期間)の各行昇順ソート済み配列
+
+    Returns:
+    --------
+    numpy.ndarray
+        sorted_valuesと同じshapeの平均順位
+    """
+    rows, period = sorted_values.shape
+    positions = np.arange(period)
+
+    # 同値グループの先頭位置: 直前と値が異なる位置で更新し、右方向に伝播させる
+    group_head = np.empty((rows, period), dtype=bool)
+    group_head[:, 0] = True
+    np.not_equal(sorted_values[:, 1:], sorted_values[:, :-1], out=group_head[:, 1:])
+    start = np.where(group_head, positions, 0)
+    np.maximum.accumulate(start, axis=1, out=start)
+
+    # 同値グループの末尾位置: 直後と値が異なる位置で更新し、左方向に伝播させる
+    group_tail = np.empty((rows, period), dtype=bool)
+    group_tail[:, -1] = True
+    group_tail[:, :-1] = group_head[:, 1:]
+    end = np.where(group_tail, positions, period - 1)
+    end = np.minimum.accumulate(end[:, ::-1], axis=1)[:, ::-1]
+
+    return (start + end) / 2 + 1
+
+
+def _rci_from_sorted(sorted_values: np.ndarray, positions: np.ndarray) -> np.ndarray:
+    """
+    窓ごとに昇順ソートされた価格と、その各要素の窓内位置からRCIを一括計算する
+
+    Parameters:
+    -----------
+    sorted_values : numpy.ndarray
+        shape=(窓数, 期間)の各行昇順ソート済み価格
+    positions : numpy.ndarray
+        sorted_valuesの各要素の窓内位置(古い方から0始まり)
+
+    Returns:
+    --------
+    numpy.ndarray
+        各窓のRCI値
+    """
+    period = sorted_values.shape[1]
+
+    # ソート後の各要素について、時系列順位(位置 + 1)と価格順位の差を取る
+    price_ranks = _average_ranks_sorted(sorted_values)
+    diff = positions + 1 - price_ranks
+    # NaNはソートで末尾に回るため、NaN以外の価格順位は従来の実装(Series.rank())と同じになる。
+    # Series.rank()はNaNの順位をNaNとし、差の合計から除外するので、ここでも0として扱う
+    diff[np.isnan(sorted_values)] = 0.0
+    d_square = np.sum(diff**2, axis=1)
+
+    return (1 - 6 * d_square / (period * (period**2 - 1))) * 100
+
+
+def _rci_arrays(close: np.ndarray, periods: list[int]) -> dict[int, np.ndarray]:
+    """
+    複数期間のRCIをまとめて計算する
+
+    各時点を末尾とする最大期間の窓を1度だけソートし、短い期間の窓は
+    そのソート順から窓内に含まれる要素だけを抜き出して使う。
+    (短い期間の窓は長い期間の窓の末尾部分なので、ソート済みの並びをそのまま流用できる)
+
+    Parameters:
+    -----------
+    close : numpy.ndarray
+        終値の配列
+    periods : list[int]
+        RCI計算期間のリスト
+
+    Returns:
+    --------
+    dict[int, numpy.ndarray]
+        期間ごとのRCI値。計算前の期間はNaN
+    """
+    results = {period: np.full(len(close), np.nan) for period in periods}
+    valid_periods = sorted({period for period in periods if period <= len(close)})
+    if not valid_periods:
+        return results
+
+    max_period = valid_periods[-1]
+    min_period = valid_periods[0]
+
+    # 先頭を(最大期間 - 1)本のNaNで埋め、全ての時点を末尾とする最大期間の窓を作る。
+    # NaNはソートで末尾に回り、各期間の窓に含まれない位置なので抜き出しで除外される
+    padded = np.concatenate([np.full(max_period - 1, np.nan), close])
+    windows = sliding_window_view(padded, max_period)[min_period - 1 :]
+
+    chunk_rows = max(1, _CHUNK_ELEMENTS // max_period)
+    for start in range(0, len(windows), chunk_rows):
+        chunk = windows[start : start + chunk_rows]
+        offset = start + min_period - 1
+        order = np.argsort(chunk, axis=1)
+
+        for period in valid_periods:
+            skip = max_period - period
+            if skip == 0:
+                positions = order
+            else:
+                # 窓の末尾period本に当たる要素だけをソート順を保ったまま抜き出す
+                positions = order[order >= skip].reshape(len(chunk), period) - skip
+            sorted_values = np.take_along_axis(chunk[:, skip:], positions, axis=1)
+            results[period][offset : offset + len(chunk)] = _rci_from_sorted(
+                sorted_values, positions
+            )
+
+    # 窓が揃っていない時点(パディングを含む)はNaNに戻す
+    for period in valid_periods:
+        results[period][: period - 1] = np.nan
+
+    return results
 
 
 def calculate_rci(df: pd.DataFrame, period: int) -> pd.Series:
     """
     指定した期間のRCIを計算する関数
 
+    NumPyの移動窓ビューに対して窓単位の順位付けを一括で行う。
+    同値は平均順位として扱い、窓内のNaNは順位付けから除外して、
+    従来のループ実装(Series.rank())と同じ値を返す。
+
     Parameters:
     -----------
     df : pandas.DataFrame
@@ -21,6 +156,340 @@ def calculate_rci(df: pd.DataFrame, period: int) -> pd.Series:
     if len(df) < period:
         return pd.Series(index=df.index, dtype=float)
 
+    close = df["close"].to_numpy(dtype=float)
+    rci_values = _rci_arrays(close, [period])[period]
+
+    return pd.Series(rci_values, index=df.index)
+
+
+def calculate_rci_multi(df: pd.DataFrame, periods: list[int]) -> pd.DataFrame:
+    """
+    複数期間のRCIをまとめて計算する関数
+
+    最大期間の窓のソート結果を全期間で共有するため、
+    calculate_rciを期間ごとに呼ぶよりも計算量が少ない。
+
+    Parameters:
+    -----------
+    df : pandas.DataFrame
+        価格データを含むデータフレーム
+    periods : list[int]
+        RCI計算期間のリスト(例: [9, 26, 52])
+
+    Returns:
+    --------
+    pandas.DataFrame
+        期間をカラム名とした各時点のRCI値。
+        各カラムはcalculate_rci(df, period)と同じ値になる
+
+    Examples:
+    --------
+    >>> rci = calculate_rci_multi(df, periods=[9, 26, 52])
+    >>> rci[9]  # 期間9のRCI
+    """
+    close = df["close"].to_numpy(dtype=float)
+    rci_values = _rci_arrays(close, list(periods))
+
+    return pd.DataFrame(
+        {period: rci_values[period] for period in periods}, index=df.index
+    )
+
+
+class _TreapNode:
+    """_OrderStatisticTreeのノード。同じ価格の要素は1ノードにまとめる"""
+
+    __slots__ = (
+        "key",
+        "priority",
+        "count",
+        "seq_sum",
+        "size",
+        "total_seq",
+        "left",
+        "right",
+    )
+
+    def __init__(self, key: float, seq: int, priority: float):
+        self.key = key
+        self.priority = priority
+        self.count = 1  # このノードの価格を持つ要素数
+        self.seq_sum = seq  # このノードの要素の通し番号の合計
+        self.size = 1  # 部分木の要素数
+        self.total_seq = seq  # 部分木の通し番号の合計
+        self.left: Optional["_TreapNode"] = None
+        self.right: Optional["_TreapNode"] = None
+
+
+class _OrderStatisticTree:
+    """
+    価格をキーとしたTreap(平衡二分探索木)。
+    部分木ごとに要素数と通し番号の合計を保持し、
+    「ある価格未満の要素数」「ある価格より大きい要素の通し番号の合計」を
+    O(log n)で求められるようにする。
+    """
+
+    def __init__(self):
+        self._root: Optional[_TreapNode] = None
+        self._random = random.Random()
+
+    @staticmethod
+    def _size(node: Optional[_TreapNode]) -> int:
+        return node.size if node else 0
+
+    @staticmethod
+    def _total_seq(node: Optional[_TreapNode]) -> int:
+        return node.total_seq if node else 0
+
+    def _update(self, node: _TreapNode) -> None:
+        node.size = node.count + self._size(node.left) + self._size(node.right)
+        node.total_seq = (
+            node.seq_sum + self._total_seq(node.left) + self._total_seq(node.right)
+        )
+
+    def _rotate_right(self, node: _TreapNode) -> _TreapNode:
+        left = node.left
+        node.left = left.right
+        self._update(node)
+        left.right = node
+        self._update(left)
+        return left
+
+    def _rotate_left(self, node: _TreapNode) -> _TreapNode:
+        right = node.right
+        node.right = right.left
+        self._update(node)
+        right.left = node
+        self._update(right)
+        return right
+
+    def _merge(
+        self, left: Optional[_TreapNode], right: Optional[_TreapNode]
+    ) -> Optional[_TreapNode]:
+        """leftの全キー < rightの全キーである2つの木を結合する"""
+        if left is None:
+            return right
+        if right is None:
+            return left
+        if left.priority > right.priority:
+            left.right = self._merge(left.right, right)
+            self._update(left)
+            return left
+        right.left = self._merge(left, right.left)
+        self._update(right)
+        return right
+
+    def _insert(self, node: Optional[_TreapNode], key: float, seq: int) -> _TreapNode:
+        if node is None:
+            return _TreapNode(key, seq, self._random.random())
+        if key == node.key:
+            node.count += 1
+            node.seq_sum += seq
+        elif key < node.key:
+            node.left = self._insert(node.left, key, seq)
+            if node.left.priority > node.priority:
+                return self._rotate_right(node)
+        else:
+            node.right = self._insert(node.right, key, seq)
+            if node.right.priority > node.priority:
+                return self._rotate_left(node)
+        self._update(node)
+        return node
+
+    def _remove(
+        self, node: Optional[_TreapNode], key: float, seq: int
+    ) -> Optional[_TreapNode]:
+        if node is None:
+            raise KeyError(key)
+        if key < node.key:
+            node.left = self._remove(node.left, key, seq)
+        elif key > node.key:
+            node.right = self._remove(node.right, key, seq)
+        else:
+            node.count -= 1
+            node.seq_sum -= seq
+            if node.count == 0:
+                return self._merge(node.left, node.right)
+        self._update(node)
+        return node
+
+    def insert(self, key: float, seq: int) -> None:
+        self._root = self._insert(self._root, key, seq)
+
+    def remove(self, key: float, seq: int) -> None:
+        self._root = self._remove(self._root, key, seq)
+
+    def query(self, key: float) -> tuple[int, int, int, int]:
+        """
+        Returns:
+            tuple[int, int, int, int]: (keyより小さい要素数,
+                keyより大きい要素の通し番号の合計,
+                keyと等しい要素数, keyと等しい要素の通し番号の合計)
+        """
+        less = 0
+        greater_seq = 0
+        node = self._root
+        while node is not None:
+            if key < node.key:
+                greater_seq += node.seq_sum + self._total_seq(node.right)
+                node = node.left
+            elif key > node.key:
+                less += node.count + self._size(node.left)
+                node = node.right
+            else:
+                less += self._size(node.left)
+                greater_seq += self._total_seq(node.right)
+                return less, greater_seq, node.count, node.seq_sum
+        return less, greater_seq, 0, 0
+
+
+class StreamingRCI:
+    """
+    確定足を1本ずつ受け取ってRCIを逐次計算するクラス
+
+    窓内の価格を順序統計木で管理し、1本の更新をO(log period)で行う。
+    同値は平均順位として扱い、calculate_rciと同じ値を返す。
+
+    d^2 = Σt^2 + Σr^2 - 2Σtr (t: 時系列順位, r: 価格順位)について、
+    - Σt^2 は期間のみで決まる定数
+    - Σr^2 は定数から同値グループごとの補正 (c^3 - c) / 12 を引いたもの
+    - Σtr は同値グループごとの「順位 × 通し番号の合計」の総和から求まる
+    ため、要素の追加・削除ごとに影響するグループ分だけ差分更新すればよい。
+    (半整数の順位を避けるため、内部では順位を2倍した整数で保持する)
+
+    Examples:
+    --------
+    >>> rci = StreamingRCI(period=9)
+    >>> for close in closes:
+    ...     value = rci.update(close)  # 期間分のデータが揃うまではNaN
+    """
+
+    def __init__(self, period: int):
+        """
+        Parameters:
+        -----------
+        period : int
+            RCI計算期間
+        """
+        if period < 2:
+            raise ValueError(f"RCI計算期間は2以上を指定してください: {period}")
+
+        self.period = period
+        self._tree = _OrderStatisticTree()
+        self._window: deque[tuple[float, int]] = deque()  # (価格, 通し番号)
+        self._next_seq = 0
+        self._rank_seq_sum = 0  # Σ(2 × グループの順位 × グループの通し番号の合計)
+        self._tie_correction = 0  # Σ(c^3 - c)
+        self.value = math.nan
+
+    def __len__(self) -> int:
+        return len(self._window)
+
+    def _insert(self, close: float, seq: int) -> None:
+        less, greater_seq, count, seq_sum = self._tree.query(close)
+        # 自分より高い価格の要素は順位が1つ上がる
+        self._rank_seq_sum += 2 * greater_seq
+        # 同じ価格のグループは順位が1/2上がり、通し番号の合計が増える
+        self._rank_seq_sum += (2 * less + count + 2) * (seq_sum + seq) - (
+            2 * less + count + 1
+        ) * seq_sum
+        self._tie_correction += (count + 1) ** 3 - (count + 1) - (count**3 - count)
+        self._tree.insert(close, seq)
+
+    def _remove(self, close: float, seq: int) -> None:
+        less, greater_seq, count, seq_sum = self._tree.query(close)
+        self._rank_seq_sum -= 2 * greater_seq
+        self._rank_seq_sum += (2 * less + count) * (seq_sum - seq) - (
+            2 * less + count + 1
+        ) * seq_sum
+        self._tie_correction += (count - 1) ** 3 - (count - 1) - (count**3 - count)
+        self._tree.remove(close, seq)
+
+    def _calculate(self) -> float:
+        if len(self._window) < self.period:
+            return math.nan
+
+        p = self.period
+        # 窓の最古の要素の時系列順位が1になるよう通し番号をずらす量
+        base = self._window[0][1] - 1
+        # 12 × d^2 を整数で計算する
+        d_square_12 = (
+            4 * p * (p + 1) * (2 * p + 1)
+            - self._tie_correction
+            - 12 * self._rank_seq_sum
+            + 12 * base * p * (p + 1)
+        )
+        d_square = d_square_12 / 12
+        return (1 - 6 * d_square / (p * (p**2 - 1))) * 100
+
+    def update(self, close: float) -> float:
+        """
+        新しい確定足の終値を追加し、最新のRCIを返す
+
+        Parameters:
+        -----------
+        close : float
+            終値
+
+        Returns:
+        --------
+        float
+            最新のRCI値。期間分のデータが揃っていない場合はNaN
+        """
+        close = float(close)
+        if math.isnan(close):
+            raise ValueError("StreamingRCIにNaNは追加できません")
+
+        seq = self._next_seq
+        self._next_seq += 1
+        self._insert(close, seq)
+        self._window.append((close, seq))
+
+        if len(self._window) > self.period:
+            oldest_close, oldest_seq = self._window.popleft()
+            self._remove(oldest_close, oldest_seq)
+
+        self.value = self._calculate()
+        return self.value
+
+    def replace_last(self, close: float) -> float:
+        """
+        最新の足の終値を置き換え、最新のRCIを返す
+        (HistoricalData.updateで同じ時刻の足を更新する場合に対応)
+
+        Parameters:
+        -----------
+        close : float
+            置き換える終値
+
+        Returns:
+        --------
+        float
+            最新のRCI値。期間分のデータが揃っていない場合はNaN
+        """
+        if not self._window:
+            return self.update(close)
+
+        close = float(close)
+        if math.isnan(close):
+            raise ValueError("StreamingRCIにNaNは追加できません")
+
+        last_close, last_seq = self._window.pop()
+        self._remove(last_close, last_seq)
+        self._insert(close, last_seq)
+        self._window.append((close, last_seq))
+
+        self.value = self._calculate()
+        return self.value
+
+
+def _calculate_rci_loop(df: pd.DataFrame, period: int) -> pd.Series:
+    """
+    1本ずつSeries.rank()を呼ぶ従来のRCI実装。
+    ベンチマークと一致確認のための参照実装として残している。
+    """
+    if len(df) < period:
+        return pd.Series(index=df.index, dtype=float)
+
     # 移動窓でRCIを計算
     rci_values = []
     close_series = df["close"]
@@ -0,0 +1,144 @@
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from src.utils.time_utils import convert_to_jst
+
+
+class OHLCVRingBuffer:
+    """
+    固定長のOHLCVリングバッファ
+
+    タイムスタンプ(int64, ミリ秒)とOHLCV(float64)をカラムごとに事前確保した
+    配列で保持し、追加・最新足の置き換えをO(1)で行う。
+
+    配列は容量の2倍を確保し、各足を位置iとi+容量の両方に書き込む(ミラーリング)。
+    これにより有効なデータは常に[先頭, 先頭+件数)の連続領域となり、
+    コピーせずにスライス(ビュー)として取り出せる。
+    """
+
+    VALUE_COLUMNS = ["open", "high", "low", "close", "volume"]
+
+    def __init__(self, capacity: int):
+        """
+        Parameters:
+        -----------
+        capacity : int
+            保持する最大の足の本数
+        """
+        if capacity <= 0:
+            raise ValueError(f"capacityは1以上を指定してください: {capacity}")
+
+        self.capacity = capacity
+        self._timestamps = np.zeros(2 * capacity, dtype=np.int64)
+        self._values = np.zeros((len(self.VALUE_COLUMNS), 2 * capacity))
+        self._start = 0  # 最古の足の位置 (0 <= _start < capacity)
+        self._length = 0
+
+    def __len__(self) -> int:
+        return self._length
+
+    @property
+    def last_timestamp(self) -> Optional[int]:
+        """最新の足のタイムスタンプ(ミリ秒)。空の場合はNone"""
+        if self._length == 0:
+            return None
+        return int(self._timestamps[self._start + self._length - 1])
+
+    def last(self) -> Optional[list]:
+        """最新の足を[timestamp, open, high, low, close, volume]で返す。空の場合はNone"""
+        if self._length == 0:
+            return None
+        position = self._start + self._length - 1
+        return [int(self._timestamps[position]), *self._values[:, position].tolist()]
+
+    def _write(self, position: int, row: list) -> None:
+        """位置positionとそのミラー位置に1本分のデータを書き込む"""
+        for pos in (position, position + self.capacity):
+            self._timestamps[pos] = row[0]
+            self._values[:, pos] = row[1:6]
+
+    def append(self, row: list) -> None:
+        """
+        1本分のデータを末尾に追加する。容量を超える場合は最古の足を捨てる
+
+        Parameters:
+        -----------
+        row : list
+            [timestamp, open, high, low, close, volume]
+        """
+        if self._length < self.capacity:
+            self._write((self._start + self._length) % self.capacity, row)
+            self._length += 1
+        else:
+            # 最古の足の位置に上書きし、先頭を1つ進める
+            self._write(self._start, row)
+            self._start = (self._start + 1) % self.capacity
+
+    def replace_last(self, row: list) -> None:
+        """
+        最新の足を置き換える
+
+        Parameters:
+        -----------
+        row : list
+            [timestamp, open, high, low, close, volume]
+        """
+        if self._length == 0:
+            raise IndexError("空のバッファの最新足は置き換えられません")
+        self._write((self._start + self._length - 1) % self.capacity, row)
+
+    def extend(self, rows: list[list]) -> None:
+        """
+        複数本のデータをまとめて末尾に追加する
+
+        Parameters:
+        -----------
+        rows : list[list]
+            [[timestamp, open, high, low, close, volume], ...] (古い順)
+        """
+        for row in rows[-self.capacity :]:
+            self.append(row)
+
+    def timestamps(self) -> np.ndarray:
+        """タイムスタンプ(ミリ秒)の読み取り専用ビューを古い順で返す"""
+        view = self._timestamps[self._start : self._start + self._length]
+        view.flags.writeable = False
+        return view
+
+    def column(self, name: str) -> np.ndarray:
+        """指定したカラム("open", "close"など)の読み取り専用ビューを古い順で返す"""
+        index = self.VALUE_COLUMNS.index(name)
+        view = self._values[index, self._start : self._start + self._length]
+        view.flags.writeable = False
+        return view
+
+    def to_frame(self, copy: bool = False) -> pd.DataFrame:
+        """
+        保持しているデータをDataFrameとして返す
+
+        インデックスはHistoricalDataの従来形式と同じ日本時間のDatetimeIndex
+        (名前は"timestamp")で、タイムスタンプ分のみ変換のため新たに確保する。
+
+        Parameters:
+        -----------
+        copy : bool, default=False
+            Falseの場合はOHLCV部分をバッファのビューとして共有する(読み取り専用)。
+            Trueの場合はコピーを返すため、呼び出し元で自由に変更できる
+
+        Returns:
+        --------
+        pandas.DataFrame
+            open, high, low, close, volumeのカラムを持つDataFrame
+        """
+        values = self._values[:, self._start : self._start + self._length]
+        if copy:
+            values = values.copy()
+        else:
+            values.flags.writeable = False
+
+        index = convert_to_jst(pd.Index(self.timestamps(), name="timestamp"))
+        return pd.DataFrame(
+            values.T, index=index, columns=self.VALUE_COLUMNS, copy=False
+        )
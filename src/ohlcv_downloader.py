@@ -0,0 +1,323 @@
+"""
+過去のOHLCVを期間指定でまとめて取得するダウンローダー
+
+[since, until)の期間をページに分割し、取引所のレート制限内で並行して取得する。
+取得したページは古い順に重複を除いてOHLCVStoreへ書き込む。
+
+実行例:
+    uv run python -m src.ohlcv_downloader --since 2024-01-01 --until 2024-04-01
+    uv run python -m src.ohlcv_downloader --symbol BTCUSDT --timeframe 1m \
+        --since 2024-01-01T00:00:00 --until 2024-01-08T00:00:00 --workers 8
+"""
+
+import argparse
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Optional
+
+from src.ohlcv_store import OHLCVStore
+from src.utils.logger import Logger
+from src.utils.time_utils import timeframe_to_ms
+
+logger = Logger.get_logger()
+
+
+class RateLimiter:
+    """
+    リクエストの開始間隔を一定以上に保つ(スレッドセーフ)
+    """
+
+    def __init__(
+        self,
+        interval_sec: float,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        """
+        Parameters:
+        -----------
+        interval_sec : float
+            リクエストの最小間隔（秒）
+        clock : Callable[[], float]
+            現在時刻（秒）を返す関数
+        sleep : Callable[[float], None]
+            指定秒数待機する関数
+        """
+        self.interval_sec = interval_sec
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._next_allowed = 0.0
+
+    def acquire(self) -> None:
+        """次のリクエストを送ってよい時刻まで待機する"""
+        with self._lock:
+            now = self._clock()
+            start = max(now, self._next_allowed)
+            self._next_allowed = start + self.interval_sec
+        if start > now:
+            self._sleep(start - now)
+
+
+class BulkOHLCVDownloader:
+    """
+    期間を指定してOHLCVをページ単位で並行取得するクラス
+
+    exchangeはccxtの取引所インスタンスなど、
+    fetch_ohlcv(symbol, timeframe=, since=, limit=)を持つオブジェクトであればよい。
+    """
+
+    def __init__(
+        self,
+        exchange: Any,
+        symbol: str,
+        timeframe: str,
+        page_limit: int = 1000,
+        max_workers: int = 4,
+        rate_limit_ms: Optional[float] = None,
+        max_retries: int = 3,
+        retry_interval: float = 1.0,
+    ):
+        """
+        Parameters:
+        -----------
+        exchange : Any
+            fetch_ohlcvを持つ取引所オブジェクト
+        symbol : str
+            取引ペア
+        timeframe : str
+            タイムフレーム
+        page_limit : int, default=1000
+            1ページ(1リクエスト)で取得する最大本数
+        max_workers : int, default=4
+            同時に実行するリクエスト数
+        rate_limit_ms : float, optional
+            リクエストの最小間隔（ミリ秒）。省略時はexchange.rateLimitを使う
+        max_retries : int, default=3
+            1リクエストが失敗した場合のリトライ回数
+        retry_interval : float, default=1.0
+            リトライ間隔（秒）。リトライのたびに倍にする
+        """
+        if rate_limit_ms is None:
+            rate_limit_ms = getattr(exchange, "rateLimit", 100)
+
+        self.exchange = exchange
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.interval = timeframe_to_ms(timeframe)
+        self.page_limit = page_limit
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.retry_interval = retry_interval
+        self.rate_limiter = RateLimiter(rate_limit_ms / 1000)
+
+    def pages(self, since: int, until: int) -> list[tuple[int, int]]:
+        """
+        [since, until)をpage_limit本ずつの期間[start, end)に分割する
+
+        Parameters:
+        -----------
+        since : int
+            開始時刻（ミリ秒）。足の境界に切り上げる
+        until : int
+            終了時刻（ミリ秒、この時刻の足は含まない）
+
+        Returns:
+        --------
+        list[tuple[int, int]]
+            各ページの[start, end)
+        """
+        start = -(-since // self.interval) * self.interval
+        page_span = self.page_limit * self.interval
+        return [
+            (page_start, min(page_start + page_span, until))
+            for page_start in range(start, until, page_span)
+        ]
+
+    def _fetch(self, since: int, limit: int) -> list[list]:
+        """レート制限とリトライを考慮して1リクエスト分を取得する"""
+        for attempt in range(self.max_retries + 1):
+            self.rate_limiter.acquire()
+            try:
+                return self.exchange.fetch_ohlcv(
+                    self.symbol, timeframe=self.timeframe, since=since, limit=limit
+                )
+            except Exception as e:
+                if attempt == self.max_retries:
+                    raise
+                wait = self.retry_interval * 2**attempt
+                logger.warning(
+                    f"OHLCV取得に失敗したため{wait}秒後にリトライします "
+                    f"(since={since}): {str(e)}"
+                )
+                time.sleep(wait)
+        return []
+
+    def fetch_page(self, start: int, end: int) -> list[list]:
+        """
+        1ページ[start, end)の足を取得する
+
+        取引所が1回で返す本数がpage_limitより少ない場合は、
+        ページの終わりまで続きを取得する。
+
+        Returns:
+        --------
+        list[list]
+            [start, end)に含まれる足(古い順、重複なし)
+        """
+        rows: list[list] = []
+        since = start
+        while since < end:
+            limit = min(self.page_limit, (end - since) // self.interval)
+            if limit <= 0:
+                break
+            data = self._fetch(since, limit)
+            last = rows[-1][0] if rows else None
+            new_rows = [
+                row
+                for row in data
+                if since <= row[0] < end and (last is None or row[0] > last)
+            ]
+            if not new_rows:
+                break  # この期間には(これ以上)データがない
+            rows.extend(new_rows)
+            since = rows[-1][0] + self.interval
+        return rows
+
+    def download(
+        self,
+        since: int,
+        until: int,
+        store: Optional[OHLCVStore] = None,
+        on_rows: Optional[Callable[[list[list]], None]] = None,
+    ) -> int:
+        """
+        [since, until)のOHLCVを取得し、古い順にstoreとon_rowsへ渡す
+
+        ページは並行して取得するが、書き込みは完了したページから古い順に行う。
+        同時に保持するページ数は同時実行数の2倍までに抑える。
+        storeに保存済みの足がある場合は、その続きから取得する。
+        storeは末尾への追記のみのため、保存済みの最初の足より前の期間は取得しない(警告を出す)。
+
+        Parameters:
+        -----------
+        since : int
+            開始時刻（ミリ秒）
+        until : int
+            終了時刻（ミリ秒、この時刻の足は含まない）
+        store : OHLCVStore, optional
+            取得した足を追記するストア
+        on_rows : Callable[[list[list]], None], optional
+            取得した足(ページ単位、古い順)を受け取る関数
+
+        Returns:
+        --------
+        int
+            書き込んだ(on_rowsに渡した)本数
+        """
+        if store is not None and store.last_timestamp is not None:
+            if since < store.first_timestamp:
+                logger.warning(
+                    f"保存済みの最初の足より前の期間は追記できないため取得しません "
+                    f"(since={since}, 保存済み: {store.first_timestamp}"
+                    f"〜{store.last_timestamp}, {store.path})"
+                )
+            since = max(since, store.last_timestamp + self.interval)
+            if since >= until:
+                logger.info(f"指定期間は保存済みです ({store.path})")
+
+        pages = self.pages(since, until)
+        logger.info(
+            f"OHLCV一括取得開始 - Symbol: {self.symbol}, Timeframe: {self.timeframe}, "
+            f"Pages: {len(pages)}"
+        )
+
+        written = 0
+        last_written: Optional[int] = None
+        max_in_flight = self.max_workers * 2
+        futures: dict[int, Future] = {}
+        next_submit = 0
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for next_write in range(len(pages)):
+                while next_submit < len(pages) and len(futures) < max_in_flight:
+                    futures[next_submit] = executor.submit(
+                        self.fetch_page, *pages[next_submit]
+                    )
+                    next_submit += 1
+
+                rows = futures.pop(next_write).result()
+                # ページ間の重複を除く
+                rows = [
+                    row for row in rows if last_written is None or row[0] > last_written
+                ]
+                if not rows:
+                    continue
+
+                if store is not None:
+                    store.append(rows)
+                if on_rows is not None:
+                    on_rows(rows)
+                written += len(rows)
+                last_written = rows[-1][0]
+
+        logger.info(f"OHLCV一括取得完了 - {written}本")
+        return written
+
+
+def _parse_datetime(value: str) -> int:
+    """ISO8601形式(タイムゾーン省略時はUTC)の日時をミリ秒に変換する"""
+    dt = datetime.fromisoformat(value)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp() * 1000)
+
+
+def main():
+    import ccxt
+
+    from src.config.config import Config
+
+    config = Config.shared()
+    Logger.configure(config.logging)
+
+    parser = argparse.ArgumentParser(description="過去のOHLCVを一括取得する")
+    parser.add_argument("--since", required=True, help="開始日時(ISO8601, UTC)")
+    parser.add_argument("--until", required=True, help="終了日時(ISO8601, UTC)")
+    parser.add_argument("--symbol", default=config.exchange.symbol)
+    parser.add_argument("--timeframe", default=config.exchange.timeframe)
+    parser.add_argument("--workers", type=int, default=4, help="同時リクエスト数")
+    parser.add_argument("--page-limit", type=int, default=1000)
+    parser.add_argument("--directory", default=config.storage.download_directory)
+    args = parser.parse_args()
+
+    # レート制限はダウンローダー側で行うため、ccxtの制御は無効にする
+    ccxt_config = config.exchange.get_ccxt_config()
+    ccxt_config["enableRateLimit"] = False
+    exchange = getattr(ccxt, config.exchange.name)(ccxt_config)
+    if config.exchange.testnet:
+        exchange.set_sandbox_mode(True)
+
+    store = OHLCVStore.open(
+        args.directory, config.exchange.name, args.symbol, args.timeframe
+    )
+    downloader = BulkOHLCVDownloader(
+        exchange,
+        args.symbol,
+        args.timeframe,
+        page_limit=args.page_limit,
+        max_workers=args.workers,
+    )
+
+    start = time.perf_counter()
+    written = downloader.download(
+        _parse_datetime(args.since), _parse_datetime(args.until), store=store
+    )
+    elapsed = time.perf_counter() - start
+    print(f"{written}本を{elapsed:.1f}秒で保存しました: {store.path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+import os
+from pathlib import Path
+from typing import Optional, Union
+
+import numpy as np
+
+
+class OHLCVStore:
+    """
+    (取引所, シンボル, タイムフレーム)ごとのOHLCVを保存する追記専用のバイナリファイル
+
+    ファイルは16バイトのヘッダ(マジックナンバー + フォーマットバージョン)に続けて、
+    固定長レコード(timestamp: int64, open/high/low/close/volume: float64)を古い順に並べる。
+    読み込みはnumpy.memmapで行うため、必要な末尾部分だけがメモリに載る。
+    追記はタイムスタンプが最新のレコードより新しい足のみを受け付ける。
+    """
+
+    MAGIC = b"CRPTOHLC"
+    FORMAT_VERSION = 1
+    HEADER_SIZE = 16
+    RECORD_DTYPE = np.dtype(
+        [
+            ("timestamp", "<i8"),
+            ("open", "<f8"),
+            ("high", "<f8"),
+            ("low", "<f8"),
+            ("close", "<f8"),
+            ("volume", "<f8"),
+        ]
+    )
+
+    def __init__(self, path: Union[str, Path]):
+        """
+        Parameters:
+        -----------
+        path : str or Path
+            保存先ファイルのパス。存在しない場合は作成する
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        if not self.path.exists() or self.path.stat().st_size == 0:
+            with open(self.path, "wb") as f:
+                f.write(self._header())
+        else:
+            self._validate_header()
+            self._truncate_partial_record()
+
+        self._length = (
+            self.path.stat().st_size - self.HEADER_SIZE
+        ) // self.RECORD_DTYPE.itemsize
+        self._first_timestamp: Optional[int] = None
+        self._last_timestamp: Optional[int] = None
+        if self._length > 0:
+            self._first_timestamp = int(self.read()["timestamp"][0])
+            self._last_timestamp = int(self.read(limit=1)["timestamp"][0])
+
+    @classmethod
+    def open(
+        cls, directory: Union[str, Path], exchange: str, symbol: str, timeframe: str
+    ) -> "OHLCVStore":
+        """
+        (取引所, シンボル, タイムフレーム)に対応するストアを開く
+
+        Parameters:
+        -----------
+        directory : str or Path
+            保存先ディレクトリ
+        exchange : str
+            取引所名（例: "bybit"）
+        symbol : str
+            シンボル（例: "BTCUSDT", "BTC/USDT:USDT"）
+        timeframe : str
+            タイムフレーム（例: "15m"）
+        """
+        safe_symbol = symbol.replace("/", "-").replace(":", "-")
+        return cls(Path(directory) / exchange / f"{safe_symbol}_{timeframe}.ohlcv")
+
+    def _header(self) -> bytes:
+        return self.MAGIC + self.FORMAT_VERSION.to_bytes(4, "little") + bytes(4)
+
+    def _validate_header(self) -> None:
+        with open(self.path, "rb") as f:
+            header = f.read(self.HEADER_SIZE)
+        if header[:8] != self.MAGIC:
+            raise ValueError(f"OHLCVストアのファイルではありません: {self.path}")
+        version = int.from_bytes(header[8:12], "little")
+        if version != self.FORMAT_VERSION:
+            raise ValueError(
+                f"未対応のOHLCVストアのバージョンです: {version} ({self.path})"
+            )
+
+    def _truncate_partial_record(self) -> None:
+        """書き込み途中で停止した場合などに残った末尾の不完全なレコードを切り捨てる"""
+        body_size = self.path.stat().st_size - self.HEADER_SIZE
+        remainder = body_size % self.RECORD_DTYPE.itemsize
+        if remainder:
+            os.truncate(self.path, self.path.stat().st_size - remainder)
+
+    def __len__(self) -> int:
+        return self._length
+
+    @property
+    def first_timestamp(self) -> Optional[int]:
+        """保存済みの最初の足のタイムスタンプ(ミリ秒)。空の場合はNone"""
+        return self._first_timestamp
+
+    @property
+    def last_timestamp(self) -> Optional[int]:
+        """保存済みの最新の足のタイムスタンプ(ミリ秒)。空の場合はNone"""
+        return self._last_timestamp
+
+    def read(self, limit: Optional[int] = None) -> np.ndarray:
+        """
+        保存済みのレコードを読み込む
+
+        Parameters:
+        -----------
+        limit : int, optional
+            末尾から読み込む件数。Noneの場合は全件
+
+        Returns:
+        --------
+        numpy.ndarray
+            RECORD_DTYPEの構造化配列(古い順)。ファイルを参照する読み取り専用のmemmap
+        """
+        if self._length == 0:
+            return np.empty(0, dtype=self.RECORD_DTYPE)
+
+        records = np.memmap(
+            self.path,
+            dtype=self.RECORD_DTYPE,
+            mode="r",
+            offset=self.HEADER_SIZE,
+            shape=(self._length,),
+        )
+        if limit is not None:
+            records = records[-limit:] if limit > 0 else records[:0]
+        return records
+
+    def load(self, limit: Optional[int] = None) -> list[list]:
+        """
+        保存済みのデータをfetch_ohlcvと同じ形式で読み込む
+
+        Parameters:
+        -----------
+        limit : int, optional
+            末尾から読み込む件数。Noneの場合は全件
+
+        Returns:
+        --------
+        list[list]
+            [[timestamp, open, high, low, close, volume], ...] (古い順)
+        """
+        return [list(record) for record in self.read(limit).tolist()]
+
+    def append(self, rows: list[list]) -> int:
+        """
+        足を追記する。保存済みの最新の足以前のタイムスタンプの足は無視する
+
+        Parameters:
+        -----------
+        rows : list[list]
+            [[timestamp, open, high, low, close, volume], ...] (古い順)
+
+        Returns:
+        --------
+        int
+            追記した件数
+        """
+        new_rows = []
+        last_timestamp = self._last_timestamp
+        for row in rows:
+            if last_timestamp is None or row[0] > last_timestamp:
+                new_rows.append(tuple(row[:6]))
+                last_timestamp = row[0]
+        if not new_rows:
+            return 0
+
+        records = np.array(new_rows, dtype=self.RECORD_DTYPE)
+        with open(self.path, "ab") as f:
+            f.write(records.tobytes())
+
+        if self._first_timestamp is None:
+            self._first_timestamp = int(records["timestamp"][0])
+        self._length += len(records)
+        self._last_timestamp = int(last_timestamp)
+        return len(records)
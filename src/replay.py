@@ -0,0 +1,461 @@
+"""
+保存済みのOHLCVでmain()と同じループを動かすリプレイ
+
+Backtesterのようにストラテジーだけを評価するのではなく、TradingBot(main()のループ)を
+そのまま動かし、HistoricalData.updateやポジションの同期、close_all_position/place_orderの
+順序といったライブ時の処理も含めて再現する。時計はSimulatedClockで、待機はせずに
+時刻を進めるだけなのでCPUの速度で進む。
+取引所はccxtの代わりにReplayExchangeをMyExchangeに渡すため、MyExchangeの処理もライブと同じになる。
+
+実行例:
+    uv run python -m src.replay --strategy src.strategy.my_strategy:MyStrategy
+    uv run python -m src.replay --since 2024-01-01 --until 2024-02-01 --compare-journal
+"""
+
+import argparse
+import time
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, replace
+from datetime import datetime, timezone
+from typing import Iterable, Optional, Union
+
+import numpy as np
+
+from src.bot import RetryLimitExceededError, TradingBot
+from src.config.config import Config
+from src.exchanges.my_exchange import MyExchange
+from src.strategy.base_strategy import BaseStrategy
+from src.utils.discord import DiscordNotifier
+from src.utils.pnl_tracker import Trade
+from src.utils.time_utils import SimulatedClock, timeframe_to_ms
+
+# DryRunのエントリーはポジション方向で記録されるため、注文の方向に揃える
+_ORDER_SIDES = {"long": "buy", "short": "sell"}
+
+
+class ReplayExchange:
+    """
+    保存済みのOHLCVを返し、成行注文を約定させるccxt互換の取引所(リプレイ用)
+
+    時刻はSimulatedClockに従い、その時刻までに始まった足だけを返す。
+    未確定の足は始値だけの足として返すため、未来の価格は見えない。
+    ティッカーと成行注文の価格は直近の確定足の終値とする(Backtesterと同じ)。
+    """
+
+    id = "replay"
+    has = {"fetchPosition": True, "fetchBalance": False}
+
+    def __init__(
+        self,
+        ohlcv: list[list],
+        timeframe: str,
+        clock: SimulatedClock,
+        fee_rate: float = 0.0,
+    ):
+        """
+        Parameters:
+        -----------
+        ohlcv : list[list]
+            古い順のOHLCV(fetch_ohlcvと同じ形式)
+        timeframe : str
+            OHLCVのタイムフレーム
+        clock : SimulatedClock
+            リプレイの時計
+        fee_rate : float, default=0.0
+            約定した注文に記録する手数料率
+        """
+        self._rows = ohlcv
+        self._timestamps = [row[0] for row in ohlcv]
+        self._interval = timeframe_to_ms(timeframe)
+        self.timeframe = timeframe
+        self.clock = clock
+        self.fee_rate = fee_rate
+        self.position = 0.0  # ロングを正、ショートを負とした数量
+        self.fills: list[Trade] = []  # 約定した注文
+
+    def _now_ms(self) -> int:
+        return int(self.clock.time() * 1000)
+
+    def fetch_time(self) -> int:
+        return self._now_ms()
+
+    def fetch_ohlcv(
+        self,
+        symbol: str,
+        timeframe: Optional[str] = None,
+        since: Optional[int] = None,
+        limit: Optional[int] = None,
+        params: Optional[dict] = None,
+    ) -> list[list]:
+        if timeframe is not None and timeframe != self.timeframe:
+            raise ValueError(
+                f"リプレイのタイムフレーム({self.timeframe})と異なります: {timeframe}"
+            )
+        now = self._now_ms()
+        end = bisect_right(self._timestamps, now)  # 現在時刻までに始まった足
+        start = 0 if since is None else bisect_left(self._timestamps, since, 0, end)
+        if limit is not None:
+            if since is None:
+                start = max(end - limit, 0)
+            else:
+                end = min(end, start + limit)
+
+        rows = [list(row) for row in self._rows[start:end]]
+        if rows and rows[-1][0] + self._interval > now:
+            # 未確定の足は始値だけにする
+            timestamp, open_ = rows[-1][0], rows[-1][1]
+            rows[-1] = [timestamp, open_, open_, open_, open_, 0.0]
+        return rows
+
+    def fetch_ticker(self, symbol: str, params: Optional[dict] = None) -> dict:
+        now = self._now_ms()
+        index = bisect_right(self._timestamps, now - self._interval) - 1
+        if index < 0:
+            raise ValueError("確定した足がないため価格が分かりません")
+        return {"symbol": symbol, "timestamp": now, "last": self._rows[index][4]}
+
+    def fetch_position(self, symbol: str, params: Optional[dict] = None) -> dict:
+        if self.position > 0:
+            side = "long"
+        elif self.position < 0:
+            side = "short"
+        else:
+            side = None
+        return {"symbol": symbol, "contracts": abs(self.position), "side": side}
+
+    def create_market_buy_order(
+        self, symbol: str, amount: float, params: Optional[dict] = None
+    ) -> dict:
+        return self._fill(symbol, "buy", amount, params or {})
+
+    def create_market_sell_order(
+        self, symbol: str, amount: float, params: Optional[dict] = None
+    ) -> dict:
+        return self._fill(symbol, "sell", amount, params or {})
+
+    def _fill(self, symbol: str, side: str, amount: float, params: dict) -> dict:
+        """成行注文を直近の確定足の終値で全量約定させる"""
+        sign = 1 if side == "buy" else -1
+        if params.get("reduceOnly"):
+            # ポジションを減らす分だけ約定させる
+            amount = min(amount, abs(self.position)) if sign * self.position < 0 else 0
+
+        price = self.fetch_ticker(symbol)["last"]
+        timestamp = self._now_ms()
+        self.position += sign * amount
+        self.fills.append(
+            Trade(
+                timestamp=timestamp,
+                side=side,
+                price=price,
+                amount=amount,
+                fee=price * amount * self.fee_rate,
+            )
+        )
+        return {
+            "id": str(len(self.fills)),
+            "symbol": symbol,
+            "type": "market",
+            "side": side,
+            "amount": amount,
+            "filled": amount,
+            "price": price,
+            "average": price,
+            "status": "closed",
+            "timestamp": timestamp,
+        }
+
+
+def _to_rows(ohlcv: Union[np.ndarray, list[list]]) -> list[list]:
+    """OHLCVStore.readの構造化配列やリストを、fetch_ohlcvと同じ形式のリストにする"""
+    if isinstance(ohlcv, np.ndarray) and ohlcv.dtype.names:
+        return [list(row) for row in ohlcv.tolist()]
+    return [[int(row[0]), *map(float, row[1:6])] for row in ohlcv]
+
+
+@dataclass
+class ReplayResult:
+    """リプレイの結果"""
+
+    exchange: MyExchange  # DryRunの場合はpnl_trackerに取引履歴・集計値がある
+    market: ReplayExchange  # DryRunでない場合はfillsに約定した注文がある
+    dry_run: bool
+    bars: int  # 処理した確定足の本数(エラーになったサイクルを除く)
+    errors: int  # サイクル中に発生したエラーの回数
+    aborted: bool  # エラーの回数がretry_countを超えて途中で終了したか
+    elapsed_sec: float  # 所要時間(初期化を含む)
+
+    @property
+    def trades(self) -> list[Trade]:
+        """約定した取引(古い順)"""
+        if self.dry_run:
+            return list(self.exchange.pnl_tracker.trades)
+        return list(self.market.fills)
+
+    @property
+    def bars_per_second(self) -> float:
+        return self.bars / self.elapsed_sec if self.elapsed_sec > 0 else float("inf")
+
+    def summary(self) -> dict:
+        """取引数と処理速度(DryRunの場合はPnLTracker.get_summaryも含む)"""
+        summary = self.exchange.pnl_tracker.get_summary() if self.dry_run else {}
+        return {
+            **summary,
+            "取引数": len(self.trades),
+            "足の本数": self.bars,
+            "エラー数": self.errors,
+            "途中終了": self.aborted,
+            "処理速度": f"{self.bars_per_second:,.0f}本/秒",
+        }
+
+
+class Replayer:
+    """
+    保存済みのOHLCVでTradingBotを動かすクラス
+
+    先頭のstrategy.required_bars * 2本(main()と同じ保持数)を初期データとし、
+    以降の足を1本ずつ確定させてrun_cycleを実行する。
+    チャートとDiscord通知は行わない。
+    """
+
+    def __init__(self, strategy: BaseStrategy, config: Config):
+        """
+        Parameters:
+        -----------
+        strategy : BaseStrategy
+            動かすストラテジー(main()と同じくshould_exit2で決済判断する)
+        config : Config
+            設定。exchange.dry_runに従い、DryRunまたは注文でのリプレイを行う
+        """
+        self.strategy = strategy
+        self.config = replace(config, chart=replace(config.chart, enabled=False))
+
+    def run(self, ohlcv: Union[np.ndarray, list[list]]) -> ReplayResult:
+        """
+        リプレイを実行する
+
+        Parameters:
+        -----------
+        ohlcv : numpy.ndarray or list[list]
+            古い順のOHLCV(OHLCVStore.readの構造化配列、またはfetch_ohlcvと同じ形式のリスト)
+
+        Returns:
+        --------
+        ReplayResult
+            リプレイの結果(エラーの回数がretry_countを超えた場合はそこまでの結果)
+
+        Raises:
+        -------
+        ValueError
+            初期データと1本以上の足に足りない場合
+        """
+        start_time = time.perf_counter()
+        rows = _to_rows(ohlcv)
+        num_bars = self.strategy.required_bars * 2
+        if len(rows) <= num_bars:
+            raise ValueError(
+                f"足が不足しています: {len(rows)}本 (必要: {num_bars + 1}本以上)"
+            )
+
+        config = self.config
+        # 初期データの最後の足(未確定足)が始まった時刻から開始する
+        clock = SimulatedClock(rows[num_bars - 1][0])
+        market = ReplayExchange(
+            rows, config.exchange.timeframe, clock, fee_rate=config.exchange.fee_rate
+        )
+        discord = DiscordNotifier("", "", enabled=False)
+        exchange = MyExchange(market, config.exchange, discord, clock=clock)
+
+        self.strategy.position = None
+        bot = TradingBot.create(config, exchange, self.strategy, discord, clock=clock)
+        # 最後の足は確定を検知できない(次の足が無い)ので、その足が始まったら終了する
+        last_timestamp = rows[-1][0]
+        aborted = False
+        try:
+            bot.run(should_stop=lambda: clock.time() * 1000 >= last_timestamp)
+        except RetryLimitExceededError as e:
+            # ライブのように異常終了せず、そこまでの結果とエラー数を返す
+            bot.logger.warning(f"リプレイを途中で終了しました: {e}")
+            aborted = True
+
+        return ReplayResult(
+            exchange=exchange,
+            market=market,
+            dry_run=config.exchange.dry_run,
+            bars=bot.cycles,
+            errors=bot.error_count,
+            aborted=aborted,
+            elapsed_sec=time.perf_counter() - start_time,
+        )
+
+
+def decision_bars(
+    trades: Iterable[tuple[int, str]], timeframe: str
+) -> list[tuple[int, str]]:
+    """
+    (約定時刻, 売買方向)の列を、判断に使った確定足の開始時刻と注文の方向の列にする
+
+    ライブ・リプレイでは足の確定後(次の足の途中)に約定するため、約定時刻を含む足の
+    1本前を判断に使った足とする。DryRunのエントリーの"long"/"short"は"buy"/"sell"にする。
+
+    Parameters:
+    -----------
+    trades : Iterable[tuple[int, str]]
+        (約定時刻(ミリ秒), 売買方向)の列
+    timeframe : str
+        タイムフレーム
+
+    Returns:
+    --------
+    list[tuple[int, str]]
+        (判断に使った足の開始時刻(ミリ秒), "buy"または"sell")のリスト
+    """
+    interval = timeframe_to_ms(timeframe)
+    return [
+        (timestamp // interval * interval - interval, _ORDER_SIDES.get(side, side))
+        for timestamp, side in trades
+    ]
+
+
+def compare_trades(
+    expected: list[tuple[int, str]], actual: list[tuple[int, str]]
+) -> Optional[str]:
+    """
+    decision_barsの結果を先頭から比較し、最初の不一致を説明する文字列を返す
+
+    Returns:
+    --------
+    str or None
+        一致した場合はNone
+    """
+
+    def describe(bar: Optional[tuple[int, str]]) -> str:
+        if bar is None:
+            return "なし"
+        dt = datetime.fromtimestamp(bar[0] / 1000, tz=timezone.utc)
+        return f"{dt.isoformat()} {bar[1]}"
+
+    for i in range(max(len(expected), len(actual))):
+        exp = expected[i] if i < len(expected) else None
+        act = actual[i] if i < len(actual) else None
+        if exp != act:
+            return f"{i + 1}件目の取引が一致しません: 期待 {describe(exp)} / リプレイ {describe(act)}"
+    return None
+
+
+def main():
+    from src.backtest import Backtester, _parse_datetime, load_strategy
+    from src.ohlcv_store import OHLCVStore
+    from src.trade_store import TradeStore
+    from src.utils.logger import Logger
+
+    config = Config.shared()
+
+    parser = argparse.ArgumentParser(
+        description="保存済みのOHLCVでメインループをリプレイ"
+    )
+    parser.add_argument(
+        "--strategy",
+        default="src.strategy.my_strategy:MyStrategy",
+        help="ストラテジーのクラス(モジュール:クラス名)",
+    )
+    parser.add_argument(
+        "--since", help="開始日時(ISO8601, UTC)。省略時は保存済みの先頭"
+    )
+    parser.add_argument(
+        "--until", help="終了日時(ISO8601, UTC)。省略時は保存済みの末尾"
+    )
+    parser.add_argument("--symbol", default=config.exchange.symbol)
+    parser.add_argument("--timeframe", default=config.exchange.timeframe)
+    parser.add_argument("--directory", default=config.storage.download_directory)
+    parser.add_argument(
+        "--log-level",
+        default="WARNING",
+        help="リプレイ中のログレベル(INFOにするとサイクルごとのログも出力する)",
+    )
+    parser.add_argument(
+        "--compare-backtest",
+        action="store_true",
+        help="同じ足でBacktesterを実行し、足ごとの取引が一致するか確認する",
+    )
+    parser.add_argument(
+        "--compare-journal",
+        action="store_true",
+        help="DryRunで保存した取引(trade_journal)と足ごとの取引が一致するか確認する",
+    )
+    args = parser.parse_args()
+
+    # リプレイ中はDiscordに通知せず、ログも少なくする(ログの出力は処理速度に影響する)
+    config = replace(
+        config,
+        logging=replace(config.logging, level=args.log_level),
+        discord=replace(config.discord, enabled=False),
+        exchange=replace(config.exchange, symbol=args.symbol, timeframe=args.timeframe),
+    )
+    Logger.configure(config.logging)
+
+    # OHLCVはsrc.ohlcv_downloaderで保存したものを使う
+    store = OHLCVStore.open(
+        args.directory, config.exchange.name, args.symbol, args.timeframe
+    )
+    records = store.read()
+    if args.since:
+        records = records[records["timestamp"] >= _parse_datetime(args.since)]
+    if args.until:
+        records = records[records["timestamp"] < _parse_datetime(args.until)]
+    if len(records) == 0:
+        print(f"OHLCVが保存されていません: {store.path}")
+        return
+
+    strategy_class = load_strategy(args.strategy)
+    strategy = strategy_class(config)
+    result = Replayer(strategy, config).run(records)
+    for key, value in result.summary().items():
+        print(f"{key}: {value:.2f}" if isinstance(value, float) else f"{key}: {value}")
+
+    # 足ごとの取引の比較は、リプレイで判断した足の範囲で行う
+    num_bars = strategy.required_bars * 2
+    first_bar, last_bar = records["timestamp"][num_bars - 1], records["timestamp"][-2]
+    actual = decision_bars(
+        [(trade.timestamp, trade.side) for trade in result.trades], args.timeframe
+    )
+
+    def report(name: str, expected: list[tuple[int, str]]) -> None:
+        expected = [bar for bar in expected if first_bar <= bar[0] <= last_bar]
+        mismatch = compare_trades(expected, actual)
+        print(f"{name}: " + (mismatch or f"{len(expected)}件の取引が一致しました"))
+
+    if args.compare_backtest:
+        backtest = Backtester(
+            strategy_class(config), config.exchange, warmup=num_bars - 1
+        ).run(records)
+        report(
+            "Backtesterとの比較",
+            decision_bars(
+                [(t.timestamp, t.side) for t in backtest.tracker.trades],
+                args.timeframe,
+            ),
+        )
+
+    if args.compare_journal:
+        trade_store = TradeStore.open(
+            config.trade_journal.directory, config.exchange.name, args.symbol
+        )
+        if len(trade_store) == 0:
+            print(f"保存済みの取引がありません: {trade_store.path}")
+            return
+        journal = trade_store.read()
+        report(
+            "保存済みの取引との比較",
+            decision_bars(
+                zip(
+                    journal["timestamp"].tolist(),
+                    np.char.decode(journal["side"]).tolist(),
+                ),
+                args.timeframe,
+            ),
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,12 @@
 from abc import ABC, abstractmethod
+from typing import Optional
 
 import pandas as pd
 
 from src.config.config import Config
+from src.historical_data import HistoricalData
+from src.strategy.indicator_cache import IndicatorCache
+from src.utils.chart_renderer import render_candles
 from src.utils.discord import DiscordNotifier
 from src.utils.logger import Logger
 
@@ -22,18 +26,34 @@ class BaseStrategy(ABC):
         self.position = None  # 'long' or 'short' or None
         self.logger = Logger.get_logger()
 
-        # Discord通知の設定
-        self.discord = DiscordNotifier(
-            config.discord.webhook_url,
-            config.discord.mention_user_id,
-            config.discord.enabled,
-        )
+        # Discord通知の設定(main()などと同じWebhookのクライアントを共有する)
+        self.discord = DiscordNotifier.from_config(config.discord)
+
+        # インジケーター計算結果のキャッシュ(HistoricalData.tokenをキーとする)
+        self._indicator_cache = IndicatorCache()
+
+    # チャートの描画関数(df -> (PNG画像データ, 最新足のタイムスタンプ))。
+    # デフォルトは図と軸を使い回すrender_candles。
+    # chart.mode: processで常駐プロセスに渡すため、上書きする場合も
+    # staticmethod(モジュールレベルの関数)にする(インスタンスのメソッドはpickleできない)
+    create_chart = staticmethod(render_candles)
 
     @abstractmethod
     def calculate_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
         """必要なインジケーターを計算"""
         pass
 
+    def get_indicators(self, historical_data: HistoricalData) -> pd.DataFrame:
+        """
+        インジケーター計算結果を返す。
+        前回と同じデータ(最新足・版数が同じ)であればcalculate_indicatorsを呼ばずに
+        キャッシュした結果を返す。結果はキャッシュと共有されるため変更しないこと
+        """
+        return self._indicator_cache.get_or_compute(
+            historical_data.token,
+            lambda: self.calculate_indicators(historical_data.data),
+        )
+
     @abstractmethod
     def should_entry(self, df: pd.DataFrame) -> tuple[bool, str]:
         """エントリー判断。(エントリーすべきか, ポジション方向)を返す"""
@@ -43,3 +63,46 @@ class BaseStrategy(ABC):
     def should_exit(self, df: pd.DataFrame) -> bool:
         """決済判断"""
         pass
+
+    def should_exit2(self, df: pd.DataFrame) -> bool:
+        """
+        main()・リプレイ・バックテストが使う決済判断。デフォルトはshould_exitと同じ
+        """
+        return self.should_exit(df)
+
+    def entry_signals(self, df: pd.DataFrame) -> Optional[pd.Series]:
+        """
+        全期間のエントリー判断をまとめて返す(バックテスト用。任意で実装する)
+
+        Parameters:
+        -----------
+        df : pandas.DataFrame
+            全期間についてcalculate_indicatorsで計算したインジケーター
+
+        Returns:
+        --------
+        pandas.Series or None
+            各足でエントリーする場合はポジション方向("long"/"short")、しない場合はNone。
+            Noneを返した場合(デフォルト)、バックテストは足ごとにshould_entryを呼ぶ
+        """
+        return None
+
+    def exit_signals(self, df: pd.DataFrame, side: str) -> Optional[pd.Series]:
+        """
+        sideのポジションを保有している場合の全期間の決済判断をまとめて返す
+        (バックテスト用。任意で実装する)
+
+        Parameters:
+        -----------
+        df : pandas.DataFrame
+            全期間についてcalculate_indicatorsで計算したインジケーター
+        side : str
+            保有しているポジションの方向("long"/"short")
+
+        Returns:
+        --------
+        pandas.Series or None
+            各足で決済する場合True(should_exit2と同じ判断にする)。
+            Noneを返した場合(デフォルト)、バックテストは足ごとにshould_exit2を呼ぶ
+        """
+        return None
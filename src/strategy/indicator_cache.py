@@ -0,0 +1,66 @@
+from collections import OrderedDict
+from typing import Callable, Hashable
+
+import pandas as pd
+
+
+class IndicatorCache:
+    """
+    インジケーター計算結果のキャッシュ
+
+    HistoricalData.tokenなどデータの状態を表すキーで計算結果を保持し、
+    同じデータに対する再計算(同一サイクル内での再評価やリトライ時)を省略する。
+    保持件数を超えた場合は最も古く参照されたものから破棄する(LRU)。
+    """
+
+    def __init__(self, maxsize: int = 4):
+        """
+        Parameters:
+        -----------
+        maxsize : int, default=4
+            保持する計算結果の最大件数
+        """
+        if maxsize <= 0:
+            raise ValueError(f"maxsizeは1以上を指定してください: {maxsize}")
+
+        self.maxsize = maxsize
+        self._entries: OrderedDict[Hashable, pd.DataFrame] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_or_compute(
+        self, key: Hashable, compute: Callable[[], pd.DataFrame]
+    ) -> pd.DataFrame:
+        """
+        キーに対応する計算結果を返す。キャッシュにない場合はcomputeで計算して保持する
+
+        Parameters:
+        -----------
+        key : Hashable
+            データの状態を表すキー
+        compute : Callable[[], pandas.DataFrame]
+            計算結果を返す関数
+
+        Returns:
+        --------
+        pandas.DataFrame
+            計算結果。キャッシュと同じオブジェクトのため、呼び出し元では変更しないこと
+        """
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key]
+
+        self.misses += 1
+        result = compute()
+        self._entries[key] = result
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return result
+
+    def clear(self) -> None:
+        """キャッシュを全て破棄する"""
+        self._entries.clear()
@@ -0,0 +1,117 @@
+"""
+移動平均の大小で売買するサンプルストラテジー
+
+テスト・ベンチマークや、バックテスト・リプレイの動作確認に使う。
+(実際に使用しているストラテジーはcrptb2-strategyリポジトリ(private)に格納)
+
+実行例:
+    uv run python -m src.backtest --strategy src.strategy.sma_cross:SmaCross
+"""
+
+from types import SimpleNamespace
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from src.config.config import Config, DiscordConfig
+from src.strategy.base_strategy import BaseStrategy
+
+
+class SmaCross(BaseStrategy):
+    """短期・長期の移動平均の大小でエントリー・決済するストラテジー"""
+
+    def __init__(
+        self,
+        config: Optional[Config] = None,
+        fast: int = 5,
+        slow: int = 20,
+        bulk: bool = True,
+    ):
+        """
+        Parameters:
+        -----------
+        config : Config, optional
+            設定オブジェクト。省略時はDiscord通知を無効にする
+        fast : int
+            短期移動平均の期間
+        slow : int
+            長期移動平均の期間(required_barsにもなる)
+        bulk : bool
+            Trueの場合、バックテストの売買判断をentry_signals/exit_signalsでまとめて計算する
+        """
+        if config is None:
+            config = SimpleNamespace(discord=DiscordConfig("", "", enabled=False))
+        super().__init__(config)
+        self.fast = fast
+        self.slow = slow
+        self.required_bars = slow
+        self.bulk = bulk
+
+    def calculate_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
+        df = df.copy()
+        df["fast"] = df["close"].rolling(self.fast).mean()
+        df["slow"] = df["close"].rolling(self.slow).mean()
+        return df
+
+    def should_entry(self, df: pd.DataFrame) -> tuple[bool, str]:
+        fast, slow = df["fast"].iloc[-1], df["slow"].iloc[-1]
+        if fast > slow:
+            return True, "long"
+        if fast < slow:
+            return True, "short"
+        return False, None
+
+    def should_exit(self, df: pd.DataFrame) -> bool:
+        fast, slow = df["fast"].iloc[-1], df["slow"].iloc[-1]
+        return fast < slow if self.position == "long" else fast > slow
+
+    def entry_signals(self, df: pd.DataFrame) -> Optional[pd.Series]:
+        if not self.bulk:
+            return None
+        sides = np.where(
+            df["fast"] > df["slow"],
+            "long",
+            np.where(df["fast"] < df["slow"], "short", None),
+        )
+        return pd.Series(sides, index=df.index, dtype=object)
+
+    def exit_signals(self, df: pd.DataFrame, side: str) -> Optional[pd.Series]:
+        if not self.bulk:
+            return None
+        if side == "long":
+            return df["fast"] < df["slow"]
+        return df["fast"] > df["slow"]
+
+
+def random_walk_ohlcv(
+    bars: int,
+    seed: int = 0,
+    step: float = 50.0,
+    start: int = 1709692800000,
+) -> list[list]:
+    """
+    ランダムウォークの1分足を作成する
+
+    Parameters:
+    -----------
+    bars : int
+        足の本数
+    seed : int
+        乱数のシード
+    step : float
+        1本あたりの終値の変化の標準偏差
+    start : int
+        最初の足の開始時刻(ミリ秒)
+
+    Returns:
+    --------
+    list[list]
+        古い順のOHLCV(fetch_ohlcvと同じ形式)
+    """
+    rng = np.random.default_rng(seed)
+    close = 60000 + np.cumsum(rng.normal(0, step, bars))
+    return [
+        [start + i * 60000, c - 5, c + 20, c - 20, c, 1.0]
+        for i, c in enumerate(close.tolist())
+    ]
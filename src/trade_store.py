@@ -0,0 +1,254 @@
+import atexit
+import json
+import os
+import time
+from pathlib import Path
+from typing import Optional, Union
+
+import numpy as np
+
+
+class TradeStore:
+    """
+    PnLTrackerの取引を保存する追記専用のバイナリファイル
+
+    ファイルは16バイトのヘッダ(マジックナンバー + フォーマットバージョン)に続けて、
+    PnLTracker.add_tradeの1回ごとに固定長レコードを1件追記する。
+    決済のレコードには決済したポジション(エントリー)のインデックスと損益を含めるため、
+    読み込み時は取引を再計算せずに残高・ポジション・集計値を復元できる。
+
+    PnLTrackerのリスク指標(RiskMetrics)の状態は、足ごとに別ファイル(拡張子.risk)へ
+    上書き保存する(取引と違い追記ではなく最新の状態のみを持つ)。
+
+    書き込みはバッファリングし、fsyncの方針は次のいずれか。
+    - "always": 追記のたびにfsyncする
+    - "interval": 追記のたびにOSへ書き出し、fsyncはfsync_interval秒に1回まで
+    - "never": OSへの書き出しもバッファが一杯になるかclose時のみ
+    """
+
+    MAGIC = b"CRPTTRAD"
+    FORMAT_VERSION = 1
+    HEADER_SIZE = 16
+    RECORD_DTYPE = np.dtype(
+        [
+            ("timestamp", "<i8"),
+            ("side", "S8"),
+            ("kind", "u1"),
+            ("price", "<f8"),
+            ("amount", "<f8"),
+            ("fee", "<f8"),
+            ("closed_index", "<i8"),  # 決済したポジションのインデックス(決済以外は-1)
+            ("closed_pnl", "<f8"),  # 決済したポジションの損益(決済以外はNaN)
+        ]
+    )
+
+    # レコードの種類
+    KIND_ENTRY = 0  # エントリー
+    KIND_EXIT = 1  # 決済
+    KIND_REPLACE = 2  # 同じ方向の取引(ポジションを置き換え)
+
+    FSYNC_POLICIES = ("always", "interval", "never")
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        fsync: str = "interval",
+        fsync_interval: float = 1.0,
+    ):
+        """
+        Parameters:
+        -----------
+        path : str or Path
+            保存先ファイルのパス。存在しない場合は作成する
+        fsync : str, default="interval"
+            fsyncの方針("always", "interval", "never")
+        fsync_interval : float, default=1.0
+            fsync="interval"の場合のfsyncの最小間隔(秒)
+        """
+        if fsync not in self.FSYNC_POLICIES:
+            raise ValueError(f"無効なfsyncの方針: {fsync}")
+
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+
+        if not self.path.exists() or self.path.stat().st_size == 0:
+            with open(self.path, "wb") as f:
+                f.write(self._header())
+        else:
+            self._validate_header()
+            self._truncate_partial_record()
+
+        self._length = (
+            self.path.stat().st_size - self.HEADER_SIZE
+        ) // self.RECORD_DTYPE.itemsize
+        self._file = open(self.path, "ab")
+        self._last_fsync = time.monotonic()
+        # 終了時にバッファに残っているレコードを書き出す
+        atexit.register(self.close)
+
+    @classmethod
+    def open(
+        cls, directory: Union[str, Path], exchange: str, symbol: str, **kwargs
+    ) -> "TradeStore":
+        """
+        (取引所, シンボル)に対応するストアを開く
+
+        Parameters:
+        -----------
+        directory : str or Path
+            保存先ディレクトリ
+        exchange : str
+            取引所名（例: "bybit"）
+        symbol : str
+            シンボル（例: "BTCUSDT", "BTC/USDT:USDT"）
+        **kwargs
+            TradeStoreのその他の引数(fsync, fsync_interval)
+        """
+        safe_symbol = symbol.replace("/", "-").replace(":", "-")
+        return cls(Path(directory) / exchange / f"{safe_symbol}.trades", **kwargs)
+
+    def _header(self) -> bytes:
+        return self.MAGIC + self.FORMAT_VERSION.to_bytes(4, "little") + bytes(4)
+
+    def _validate_header(self) -> None:
+        with open(self.path, "rb") as f:
+            header = f.read(self.HEADER_SIZE)
+        if header[:8] != self.MAGIC:
+            raise ValueError(f"取引ストアのファイルではありません: {self.path}")
+        version = int.from_bytes(header[8:12], "little")
+        if version != self.FORMAT_VERSION:
+            raise ValueError(
+                f"未対応の取引ストアのバージョンです: {version} ({self.path})"
+            )
+
+    def _truncate_partial_record(self) -> None:
+        """書き込み途中で停止した場合などに残った末尾の不完全なレコードを切り捨てる"""
+        body_size = self.path.stat().st_size - self.HEADER_SIZE
+        remainder = body_size % self.RECORD_DTYPE.itemsize
+        if remainder:
+            os.truncate(self.path, self.path.stat().st_size - remainder)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def append(
+        self,
+        timestamp: int,
+        side: str,
+        kind: int,
+        price: float,
+        amount: float,
+        fee: float,
+        closed_index: int = -1,
+        closed_pnl: float = float("nan"),
+    ) -> None:
+        """
+        取引を1件追記する
+
+        Parameters:
+        -----------
+        timestamp : int
+            取引時刻（ミリ秒）
+        side : str
+            取引サイド("long", "short", "buy", "sell")
+        kind : int
+            KIND_ENTRY, KIND_EXIT, KIND_REPLACEのいずれか
+        price, amount, fee : float
+            価格、数量、手数料
+        closed_index : int, default=-1
+            決済の場合、決済したポジションの取引履歴でのインデックス
+        closed_pnl : float, default=NaN
+            決済の場合、決済したポジションの損益
+        """
+        record = np.array(
+            [
+                (
+                    timestamp,
+                    side.encode(),
+                    kind,
+                    price,
+                    amount,
+                    fee,
+                    closed_index,
+                    closed_pnl,
+                )
+            ],
+            dtype=self.RECORD_DTYPE,
+        )
+        self._file.write(record.tobytes())
+        self._length += 1
+
+        if self.fsync == "never":
+            return
+        self._file.flush()
+        now = time.monotonic()
+        if self.fsync == "always" or now - self._last_fsync >= self.fsync_interval:
+            os.fsync(self._file.fileno())
+            self._last_fsync = now
+
+    @property
+    def risk_path(self) -> Path:
+        """リスク指標の状態の保存先"""
+        return self.path.with_suffix(".risk")
+
+    def save_risk_state(self, state: dict) -> None:
+        """
+        リスク指標の状態を上書き保存する(一時ファイルに書いてから置き換える)
+
+        Parameters:
+        -----------
+        state : dict
+            RiskMetrics.stateの戻り値
+        """
+        tmp_path = self.risk_path.with_suffix(".risk.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(state, f)
+            if self.fsync == "always":
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, self.risk_path)
+
+    def load_risk_state(self) -> Optional[dict]:
+        """保存済みのリスク指標の状態。保存されていない場合はNone"""
+        try:
+            with open(self.risk_path) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def read(self) -> np.ndarray:
+        """
+        保存済みのレコードをすべて読み込む
+
+        Returns:
+        --------
+        numpy.ndarray
+            RECORD_DTYPEの構造化配列(古い順)
+        """
+        self._file.flush()
+        if self._length == 0:
+            return np.empty(0, dtype=self.RECORD_DTYPE)
+        return np.fromfile(
+            self.path,
+            dtype=self.RECORD_DTYPE,
+            count=self._length,
+            offset=self.HEADER_SIZE,
+        )
+
+    def flush(self) -> None:
+        """バッファに残っているレコードを書き出してfsyncする"""
+        if self._file.closed:
+            return
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._last_fsync = time.monotonic()
+
+    def close(self) -> None:
+        """バッファに残っているレコードを書き出してファイルを閉じる"""
+        if self._file.closed:
+            return
+        self.flush()
+        self._file.close()
+        atexit.unregister(self.close)
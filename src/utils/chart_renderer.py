@@ -0,0 +1,175 @@
+import io
+import pickle
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Optional
+
+import pandas as pd
+
+from src.utils.logger import Logger
+
+# render_candlesで使い回す(図, 軸)。スレッド・プロセスごとに図のサイズ単位で保持する
+_figures = threading.local()
+
+
+def _init_worker() -> None:
+    """描画用プロセスの初期化。描画のたびにmatplotlibを読み込まないよう先に読み込んでおく"""
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import mplfinance  # noqa: F401
+
+
+def _get_figure(figsize: tuple[float, float]):
+    """figsizeに対応する図と軸を返す。初回のみ作成し、以降は同じものを返す"""
+    import mplfinance as mpf
+
+    cache = getattr(_figures, "cache", None)
+    if cache is None:
+        cache = _figures.cache = {}
+    if figsize not in cache:
+        fig = mpf.figure(figsize=figsize)
+        cache[figsize] = (fig, fig.add_subplot(1, 1, 1))
+    return cache[figsize]
+
+
+def render_candles(
+    df: pd.DataFrame, figsize: tuple[float, float] = (12, 6)
+) -> tuple[io.BytesIO, str]:
+    """
+    ローソク足のチャートを作成する(ストラテジー側にcreate_chartがない場合の標準の描画)
+
+    図と軸は初回に作成して使い回し、描画のたびに軸の内容だけを描き直す。
+
+    Parameters:
+    -----------
+    df : pandas.DataFrame
+        open, high, low, close, volumeのカラムを持つDataFrame
+    figsize : tuple[float, float], default=(12, 6)
+        図のサイズ
+
+    Returns:
+    --------
+    tuple[io.BytesIO, str]
+        (PNG画像データ, 最新足のタイムスタンプ)
+    """
+    import mplfinance as mpf
+
+    fig, ax = _get_figure(figsize)
+    ax.clear()
+    mpf.plot(
+        df,
+        type="candle",
+        ax=ax,
+        columns=("open", "high", "low", "close", "volume"),
+        style="yahoo",
+    )
+
+    image = io.BytesIO()
+    fig.savefig(image, format="png")
+    image.seek(0)
+    return image, str(df.index[-1])
+
+
+def _render_in_process(
+    render: Callable[[pd.DataFrame], tuple[io.BytesIO, str]], df: pd.DataFrame
+) -> tuple[bytes, str]:
+    """描画用プロセスで実行する。プロセス間で受け渡せるよう画像はbytesで返す"""
+    image, timestamp = render(df)
+    return image.getvalue(), timestamp
+
+
+class ChartRenderer:
+    """
+    チャートの作成を行うクラス
+
+    - every_n_bars本ごとにだけ作成する(should_render)
+    - 描画する足の本数をmax_barsに制限する
+    - mode="process"の場合は、matplotlibを読み込み済みの常駐プロセスで描画する
+      (プロセス間で受け渡すため、renderはモジュールレベルの関数などpickle可能である必要がある。
+      pickleできない場合は作成時に警告を出し、呼び出し元のスレッドで描画する)
+
+    ChartWorkerの描画関数として使うことを想定している。
+    """
+
+    def __init__(
+        self,
+        render: Callable[[pd.DataFrame], tuple[io.BytesIO, str]] = render_candles,
+        mode: str = "thread",
+        every_n_bars: int = 1,
+        max_bars: Optional[int] = None,
+    ):
+        """
+        Parameters:
+        -----------
+        render : Callable[[pandas.DataFrame], tuple[io.BytesIO, str]]
+            DataFrameから(画像データ, タイムスタンプ)を作る関数
+        mode : str, default="thread"
+            "thread"(呼び出し元のスレッドで描画)または"process"(常駐プロセスで描画)
+        every_n_bars : int, default=1
+            何本ごとにチャートを作成するか
+        max_bars : int, optional
+            描画する最大の足の本数。Noneの場合は制限しない
+        """
+        if mode not in ("thread", "process"):
+            raise ValueError(f"無効なチャートの描画モード: {mode}")
+        if every_n_bars <= 0:
+            raise ValueError(f"every_n_barsは1以上を指定してください: {every_n_bars}")
+
+        self._render = render
+        self.mode = mode
+        self.every_n_bars = every_n_bars
+        self.max_bars = max_bars
+        self.logger = Logger.get_logger()
+        self._bars = 0
+
+        self._executor: Optional[ProcessPoolExecutor] = None
+        if mode == "process" and self._can_pickle(render):
+            self._executor = ProcessPoolExecutor(
+                max_workers=1, initializer=_init_worker
+            )
+        elif mode == "process":
+            self.mode = "thread"
+
+    def _can_pickle(self, render: Callable) -> bool:
+        """renderを描画用プロセスに渡せるか(pickleできるか)を確認する"""
+        try:
+            pickle.dumps(render)
+        except (pickle.PicklingError, AttributeError, TypeError) as e:
+            # ストラテジーのメソッドなどはストラテジー全体(Discordのセッション等)を含むため渡せない
+            self.logger.warning(
+                f"チャートの描画関数をプロセスに渡せないためスレッドで描画します: {e}"
+            )
+            return False
+        return True
+
+    def should_render(self) -> bool:
+        """足が確定するたびに呼び出し、今回チャートを作成すべきかを返す"""
+        self._bars += 1
+        return (self._bars - 1) % self.every_n_bars == 0
+
+    def __call__(self, df: pd.DataFrame) -> tuple[io.BytesIO, str]:
+        """
+        チャートを作成する
+
+        Returns:
+        --------
+        tuple[io.BytesIO, str]
+            (PNG画像データ, 最新足のタイムスタンプ)
+        """
+        if self.max_bars is not None:
+            df = df.tail(self.max_bars)
+
+        if self._executor is None:
+            return self._render(df)
+
+        image, timestamp = self._executor.submit(
+            _render_in_process, self._render, df
+        ).result()
+        return io.BytesIO(image), timestamp
+
+    def close(self) -> None:
+        """描画用プロセスを停止する"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
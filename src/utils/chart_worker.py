@@ -0,0 +1,123 @@
+import io
+import threading
+from typing import Callable, Optional
+
+import pandas as pd
+
+from src.utils.discord import DiscordNotifier
+from src.utils.latency import latency
+from src.utils.logger import Logger
+
+
+class ChartWorker:
+    """
+    チャートの作成とDiscordへの送信をバックグラウンドスレッドで行うクラス
+
+    メインループはインジケーター計算結果のスナップショットを渡すだけで、待たずに次へ進む。
+    作成中に新しいスナップショットが渡された場合は、未処理のものを捨てて最新だけを作成する。
+    作成・送信に失敗してもログに残すだけでメインループには影響しない。
+    """
+
+    def __init__(
+        self,
+        render: Callable[[pd.DataFrame], tuple[io.BytesIO, str]],
+        discord: DiscordNotifier,
+    ):
+        """
+        Parameters:
+        -----------
+        render : Callable[[pandas.DataFrame], tuple[io.BytesIO, str]]
+            インジケーター計算結果から(画像データ, タイムスタンプ)を作る関数
+            (例: strategy.create_chart)
+        discord : DiscordNotifier
+            画像の送信に使うDiscordクライアント
+        """
+        self._render = render
+        self._discord = discord
+        self.logger = Logger.get_logger()
+
+        self._condition = threading.Condition()
+        # 未処理のスナップショットと依頼元のサイクルID
+        self._pending: Optional[tuple[pd.DataFrame, Optional[str]]] = None
+        self._busy = False
+        self._closed = False
+        self.rendered = 0  # 送信まで完了した数
+        self.dropped = 0  # 新しいスナップショットで置き換えられて捨てた数
+        self.failed = 0  # 作成・送信に失敗した数
+
+        self._thread = threading.Thread(
+            target=self._run, name="chart-worker", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, df: pd.DataFrame) -> None:
+        """
+        チャートの作成を依頼する。呼び出し元はブロックしない
+
+        Parameters:
+        -----------
+        df : pandas.DataFrame
+            インジケーター計算結果。呼び出し後に変更されても影響しないようコピーして保持する
+        """
+        snapshot = df.copy()
+        with self._condition:
+            if self._closed:
+                return
+            if self._pending is not None:
+                self.dropped += 1
+            self._pending = (snapshot, Logger.get_cycle_id())
+            self._condition.notify()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while self._pending is None and not self._closed:
+                    self._condition.wait()
+                if self._pending is None:
+                    return  # 停止要求があり、未処理のものもない
+                (df, cycle_id), self._pending = self._pending, None
+                self._busy = True
+
+            # 作成・送信中のログを依頼元のサイクルに紐付ける
+            Logger.set_cycle_id(cycle_id)
+            try:
+                with latency.timer("chart.render"):
+                    chart_image, timestamp = self._render(df)
+                with latency.timer("chart.send"):
+                    sent = self._discord.send_image(
+                        image_data=chart_image, message=f"チャート更新 ({timestamp})"
+                    )
+                if sent:
+                    self.rendered += 1
+                else:
+                    self.failed += 1
+            except Exception as e:
+                self.failed += 1
+                self.logger.error(
+                    f"チャートの作成・送信に失敗: {type(e).__name__}: {e}"
+                )
+            finally:
+                with self._condition:
+                    self._busy = False
+                    self._condition.notify_all()
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """
+        未処理のチャートがなくなるまで待つ(主にテスト・終了処理用)
+
+        Returns:
+        --------
+        bool
+            timeout内に処理が終わった場合はTrue
+        """
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: self._pending is None and not self._busy, timeout=timeout
+            )
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """未処理のチャートを処理してからワーカーを停止する"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join(timeout)
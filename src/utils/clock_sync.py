@@ -0,0 +1,134 @@
+import math
+import statistics
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from src.utils.logger import Logger
+from src.utils.time_utils import Clock
+
+logger = Logger.get_logger()
+
+
+@dataclass
+class ClockSample:
+    """サーバー時刻の1回分の計測結果"""
+
+    offset_ms: float  # サーバー時刻 - ローカル時刻（ミリ秒）
+    rtt_ms: float  # 往復時間（ミリ秒）
+
+
+class ClockSync:
+    """
+    取引所のサーバー時刻とローカル時刻のずれ(オフセット)を推定するクラス
+
+    サーバー時刻を複数回取得し、それぞれ往復時間(RTT)の中間時点のローカル時刻と比較する
+    (NTPと同様にリクエストと応答の片道時間が等しいとみなす)。
+    RTTが大きいサンプルは片道時間の偏りによる誤差が大きいので除外し、
+    残りのオフセットの中央値を採用する。
+    """
+
+    def __init__(
+        self,
+        fetch_time: Callable[[], int],
+        clock: Optional[Clock] = None,
+        samples: int = 5,
+        refresh_interval: float = 600.0,
+        keep_ratio: float = 0.5,
+    ):
+        """
+        Parameters:
+        -----------
+        fetch_time : Callable[[], int]
+            サーバー時刻（ミリ秒）を返す関数
+        clock : Clock, optional
+            時計。省略時は実際の時刻を使う
+        samples : int, default=5
+            1回の同期で取得するサンプル数
+        refresh_interval : float, default=600.0
+            再同期する間隔（秒）
+        keep_ratio : float, default=0.5
+            RTTが小さい順に採用するサンプルの割合
+        """
+        if samples <= 0:
+            raise ValueError(f"samplesは1以上を指定してください: {samples}")
+
+        self._fetch_time = fetch_time
+        self._clock = clock or Clock()
+        self.samples = samples
+        self.refresh_interval = refresh_interval
+        self.keep_ratio = keep_ratio
+
+        self.offset_ms = 0.0  # サーバー時刻 - ローカル時刻（ミリ秒）
+        self.jitter_ms = 0.0  # 採用したサンプルのオフセットの標準偏差（ミリ秒）
+        self.rtt_ms = 0.0  # 採用したサンプルの最小RTT（ミリ秒）
+        self._last_sync: Optional[float] = None  # 最後に同期したClock.monotonic()
+
+    @property
+    def last_sync_age(self) -> float:
+        """最後に同期してからの経過秒数。未同期の場合はinf"""
+        if self._last_sync is None:
+            return math.inf
+        return self._clock.monotonic() - self._last_sync
+
+    def server_time_ms(self) -> float:
+        """推定したサーバー時刻（ミリ秒）"""
+        return self._clock.time() * 1000 + self.offset_ms
+
+    def _sample(self) -> ClockSample:
+        start_local = self._clock.time() * 1000
+        start = self._clock.monotonic()
+        server_time = self._fetch_time()
+        rtt_ms = (self._clock.monotonic() - start) * 1000
+        # サーバーが時刻を返したのは往復の中間時点とみなす
+        return ClockSample(
+            offset_ms=server_time - (start_local + rtt_ms / 2), rtt_ms=rtt_ms
+        )
+
+    def sync(self) -> float:
+        """
+        サーバー時刻を複数回取得してオフセットを推定し直す
+
+        Returns:
+        --------
+        float
+            推定したオフセット（ミリ秒）
+        """
+        samples = [self._sample() for _ in range(self.samples)]
+
+        # RTTが小さいサンプルほど片道時間の偏りによる誤差が小さいので、それだけを使う
+        keep = max(1, math.ceil(len(samples) * self.keep_ratio))
+        best = sorted(samples, key=lambda sample: sample.rtt_ms)[:keep]
+        offsets = [sample.offset_ms for sample in best]
+
+        self.offset_ms = statistics.median(offsets)
+        self.jitter_ms = statistics.pstdev(offsets)
+        self.rtt_ms = best[0].rtt_ms
+        self._last_sync = self._clock.monotonic()
+
+        logger.debug(
+            f"サーバー時刻を同期: offset={self.offset_ms:.1f}ms, "
+            f"jitter={self.jitter_ms:.1f}ms, rtt={self.rtt_ms:.1f}ms"
+        )
+        return self.offset_ms
+
+    def maybe_refresh(self) -> bool:
+        """
+        前回の同期からrefresh_interval秒以上経過していれば再同期する
+
+        Returns:
+        --------
+        bool
+            再同期した場合はTrue
+        """
+        if self.last_sync_age < self.refresh_interval:
+            return False
+        self.sync()
+        return True
+
+    def __repr__(self) -> str:
+        return (
+            f"ClockSync(offset={self.offset_ms:.1f}ms, "
+            f"jitter={self.jitter_ms:.1f}ms, "
+            f"rtt={self.rtt_ms:.1f}ms, "
+            f"last_sync_age={self.last_sync_age:.1f}s)"
+        )
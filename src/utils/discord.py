@@ -1,14 +1,212 @@
+import atexit
+import heapq
 import io
-from typing import Optional
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, ClassVar, Optional
 
 import requests
+from requests.adapters import HTTPAdapter
 
+from src.config.config import DiscordConfig
+from src.utils.latency import latency
 from src.utils.logger import Logger
 
+# Discordの上限値
+MAX_CONTENT_LENGTH = 2000  # contentの最大文字数
+MAX_DESCRIPTION_LENGTH = 4096  # embedのdescriptionの最大文字数
+MAX_EMBEDS = 10  # 1メッセージのembedの最大数
+MAX_EMBEDS_TOTAL_LENGTH = 6000  # 1メッセージのembedの合計文字数の上限
+
+# 通知の優先度(小さいほど先に送信する)
+PRIORITY_URGENT = 0  # エラー・約定
+PRIORITY_NORMAL = 1
+PRIORITY_DEBUG = 2
+
+
+@dataclass(order=True)
+class _QueuedMessage:
+    """送信待ちの通知。優先度が同じものは追加順に送信する"""
+
+    priority: int
+    seq: int
+    content: Optional[str] = field(default=None, compare=False)
+    embed: Optional[dict] = field(default=None, compare=False)
+
+
+def _embed_length(embed: dict) -> int:
+    return len(embed.get("title") or "") + len(embed.get("description") or "")
+
+
+class DiscordDispatcher:
+    """
+    Discordへの通知をバックグラウンドスレッドで送信するクラス
+
+    - 通知は上限付きの優先度付きキューに入れ、呼び出し元は送信を待たない
+    - 溜まった通知は1回のリクエスト(テキストまたは最大10個のembed)にまとめて送信する
+    - キューが一杯の場合は優先度の最も低い通知を捨てる
+    - close()で残っている通知をすべて送信してから停止する
+    """
+
+    def __init__(self, send: Callable[[dict], bool], maxsize: int = 1000):
+        """
+        Parameters:
+        -----------
+        send : Callable[[dict], bool]
+            Webhookにペイロードを送信し、成功したかを返す関数
+        maxsize : int, default=1000
+            キューに保持する通知の最大数
+        """
+        self._send = send
+        self.maxsize = maxsize
+        self.logger = Logger.get_logger()
+
+        self._condition = threading.Condition()
+        self._heap: list[_QueuedMessage] = []
+        self._seq = 0
+        self._busy = False
+        self._closed = False
+        self.sent = 0  # 送信した通知の数
+        self.requests = 0  # 送信したリクエストの数
+        self.dropped = 0  # キューが一杯で捨てた通知の数
+        self.failed = 0  # 送信に失敗した通知の数
+
+        self._thread = threading.Thread(
+            target=self._run, name="discord-dispatcher", daemon=True
+        )
+        self._thread.start()
+
+    def qsize(self) -> int:
+        """送信待ちの通知の数"""
+        with self._condition:
+            return len(self._heap)
+
+    def put(
+        self,
+        content: Optional[str] = None,
+        embed: Optional[dict] = None,
+        priority: int = PRIORITY_NORMAL,
+    ) -> bool:
+        """
+        通知をキューに追加する。呼び出し元はブロックしない
+
+        Returns:
+        --------
+        bool
+            追加できた場合True、停止済み・キューが一杯で捨てた場合False
+        """
+        with self._condition:
+            if self._closed:
+                return False
+            item = _QueuedMessage(priority, self._seq, content, embed)
+            self._seq += 1
+
+            if len(self._heap) >= self.maxsize:
+                # 優先度が最も低い(同じ優先度なら最も新しい)通知と比べて捨てる方を決める
+                worst = max(self._heap)
+                if worst < item:
+                    self.dropped += 1
+                    return False
+                self._heap.remove(worst)
+                heapq.heapify(self._heap)
+                self.dropped += 1
+
+            heapq.heappush(self._heap, item)
+            self._condition.notify_all()
+            return True
+
+    def _next_payload(self) -> tuple[dict, int]:
+        """
+        キューの先頭から1リクエスト分の通知を取り出してペイロードにまとめる
+
+        テキストはテキストどうし、embedはembedどうしを上限の範囲でまとめる。
+        メンションの直後の通知のように、テキストの後に続くembedは同じメッセージに含める。
+        """
+        first = heapq.heappop(self._heap)
+        content = first.content
+        embeds = [first.embed] if first.embed else []
+        count = 1
+
+        while self._heap and len(embeds) < MAX_EMBEDS:
+            item = self._heap[0]
+            if item.content is not None:
+                # テキストはembedより前にしか置けないため、embedを含む前のみ連結する
+                if embeds or content is None:
+                    break
+                joined = f"{content}\n{item.content}"
+                if len(joined) > MAX_CONTENT_LENGTH:
+                    break
+                content = joined
+            if item.embed is not None:
+                total = sum(_embed_length(embed) for embed in embeds)
+                if total + _embed_length(item.embed) > MAX_EMBEDS_TOTAL_LENGTH:
+                    break
+                embeds.append(item.embed)
+            heapq.heappop(self._heap)
+            count += 1
+
+        return {"content": content, "embeds": embeds or None}, count
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._heap and not self._closed:
+                    self._condition.wait()
+                if not self._heap:
+                    return  # 停止済みで送信待ちもない
+                payload, count = self._next_payload()
+                self._busy = True
+
+            try:
+                ok = self._send(payload)
+            except Exception as e:
+                self.logger.error(f"Discord通知送信エラー: {str(e)}")
+                ok = False
+
+            with self._condition:
+                self._busy = False
+                self.requests += 1
+                if ok:
+                    self.sent += count
+                else:
+                    self.failed += count
+                self._condition.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        送信待ちの通知がなくなるまで待つ
+
+        Returns:
+        --------
+        bool
+            すべて送信し終えた場合True、タイムアウトした場合False
+        """
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: not self._heap and not self._busy, timeout=timeout
+            )
+
+    def close(self, timeout: Optional[float] = 10.0) -> None:
+        """残っている通知を送信してから停止する"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join(timeout=timeout)
+        if self._heap:
+            self.logger.warning(f"未送信のDiscord通知を{len(self._heap)}件破棄しました")
+
 
 class DiscordNotifier:
     """
     Discord通知を送信するクラス
+
+    asynchronous=Trueの場合、send_message/print_and_notifyは通知をキューに入れて
+    すぐに戻り、DiscordDispatcherがバックグラウンドでまとめて送信する。
+
+    Webhookへの接続はセッションで使い回す(keep-alive)。
+    同じWebhookに送信するインスタンスはfrom_configで共有する。
     """
 
     # Discordのメッセージカラー定数
@@ -19,7 +217,21 @@ class DiscordNotifier:
         "error": 0xFF0000,  # 赤色
     }
 
-    def __init__(self, webhook_url: str, mention_user_id: str, enabled: bool = True):
+    # from_configで作成したインスタンス(Webhook URLごと)
+    _shared: ClassVar[dict[str, "DiscordNotifier"]] = {}
+    _shared_lock: ClassVar[threading.Lock] = threading.Lock()
+
+    def __init__(
+        self,
+        webhook_url: str,
+        mention_user_id: str,
+        enabled: bool = True,
+        asynchronous: bool = False,
+        queue_size: int = 1000,
+        max_retries: int = 3,
+        connect_timeout: float = 3.0,
+        read_timeout: float = 10.0,
+    ):
         """
         Parameters:
         -----------
@@ -29,14 +241,188 @@ class DiscordNotifier:
             DiscordのメンションするユーザーID
         enabled : bool, default=True
             Discord通知の有効/無効
+        asynchronous : bool, default=False
+            Trueの場合はバックグラウンドで送信する
+        queue_size : int, default=1000
+            バックグラウンド送信時に保持する通知の最大数
+        max_retries : int, default=3
+            レート制限(429)を受けた場合のリトライ回数
+        connect_timeout : float, default=3.0
+            Webhookへの接続のタイムアウト（秒）
+        read_timeout : float, default=10.0
+            Webhookからの応答のタイムアウト（秒）
         """
         self.webhook_url = webhook_url
         self.logger = Logger.get_logger()
         self.mention_user_id = mention_user_id
         self.enabled = enabled
+        self.max_retries = max_retries
+        self.timeout = (connect_timeout, read_timeout)
+
+        # 接続を使い回すセッション(通知の送信とチャートの送信が並行するため2接続まで保持)
+        self._session = requests.Session()
+        self._session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=2))
+
+        # 直近のリクエストのレイテンシ（ミリ秒）
+        self._latencies_ms: deque[float] = deque(maxlen=100)
+
+        # レート制限が解除される時刻(time.monotonic()基準)
+        self._rate_limit_lock = threading.Lock()
+        self._rate_limited_until = 0.0
+
+        self._dispatcher: Optional[DiscordDispatcher] = None
+        if enabled and asynchronous:
+            self._dispatcher = DiscordDispatcher(
+                lambda payload: self._send_payload(payload), maxsize=queue_size
+            )
+            # 終了時に残っている通知を送信する
+            atexit.register(self.close)
+
+    @classmethod
+    def from_config(cls, config: DiscordConfig) -> "DiscordNotifier":
+        """
+        設定からDiscordNotifierを取得する
+
+        同じWebhook URLに対しては最初に作成したインスタンスを返すため、
+        main()とストラテジーなどで同じセッション・送信キューを共有する。
+
+        Parameters:
+        -----------
+        config : DiscordConfig
+            Discordの設定
+
+        Returns:
+        --------
+        DiscordNotifier
+            Webhook URLごとに共有されるインスタンス
+        """
+        with cls._shared_lock:
+            notifier = cls._shared.get(config.webhook_url)
+            if notifier is None:
+                notifier = cls(
+                    config.webhook_url,
+                    config.mention_user_id,
+                    config.enabled,
+                    asynchronous=config.async_dispatch,
+                    queue_size=config.queue_size,
+                    connect_timeout=config.connect_timeout,
+                    read_timeout=config.read_timeout,
+                )
+                cls._shared[config.webhook_url] = notifier
+            return notifier
+
+    @property
+    def dispatcher(self) -> Optional[DiscordDispatcher]:
+        """バックグラウンド送信を行うDiscordDispatcher。同期送信の場合はNone"""
+        return self._dispatcher
+
+    def _wait_rate_limit(self) -> None:
+        """レート制限中であれば解除されるまで待機する"""
+        with self._rate_limit_lock:
+            wait = self._rate_limited_until - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+
+    def _update_rate_limit(self, response: requests.Response) -> Optional[float]:
+        """
+        レスポンスヘッダーからレート制限の解除までの秒数を読み取って記録する
+
+        Returns:
+        --------
+        float or None
+            429の場合は再送までの待機秒数、それ以外はNone
+        """
+        wait = None
+        if response.status_code == 429:
+            retry_after = response.headers.get("Retry-After")
+            if retry_after is None:
+                try:
+                    retry_after = response.json().get("retry_after")
+                except ValueError:
+                    retry_after = None
+            wait = float(retry_after) if retry_after is not None else 1.0
+        elif response.headers.get("X-RateLimit-Remaining") == "0":
+            # このリクエストで上限に達したので、次のリクエストはリセットまで待つ
+            wait = float(response.headers.get("X-RateLimit-Reset-After", 0))
+
+        if wait:
+            with self._rate_limit_lock:
+                self._rate_limited_until = max(
+                    self._rate_limited_until, time.monotonic() + wait
+                )
+        return wait if response.status_code == 429 else None
+
+    def _post(self, **kwargs) -> requests.Response:
+        """
+        Webhookにリクエストを送信する。429の場合はRetry-Afterだけ待って再送する
+        """
+        for attempt in range(self.max_retries + 1):
+            self._wait_rate_limit()
+            start = time.perf_counter()
+            response = self._session.post(
+                self.webhook_url, timeout=self.timeout, **kwargs
+            )
+            latency_ms = (time.perf_counter() - start) * 1000
+            self._latencies_ms.append(latency_ms)
+            latency.record("discord.post", latency_ms)
+            self.logger.debug(
+                f"Discord送信 - ステータスコード: {response.status_code}, "
+                f"レイテンシ: {latency_ms:.1f}ms"
+            )
+
+            retry_after = self._update_rate_limit(response)
+            if retry_after is None or attempt == self.max_retries:
+                return response
+            self.logger.warning(
+                f"Discordのレート制限のため{retry_after}秒後に再送します"
+            )
+            # 画像などのファイルは再送前に先頭へ戻す
+            for _, file, *_ in (kwargs.get("files") or {}).values():
+                file.seek(0)
+        return response
+
+    def latency_summary(self) -> dict:
+        """
+        直近(最大100件)のWebhookへのリクエストのレイテンシを集計する
+
+        Returns:
+        --------
+        dict
+            count, last_ms, avg_ms, max_ms。リクエストがない場合はcountのみ0
+        """
+        latencies = list(self._latencies_ms)
+        if not latencies:
+            return {"count": 0}
+        return {
+            "count": len(latencies),
+            "last_ms": latencies[-1],
+            "avg_ms": sum(latencies) / len(latencies),
+            "max_ms": max(latencies),
+        }
+
+    def _send_payload(self, payload: dict) -> bool:
+        """メッセージのペイロードを送信する"""
+        try:
+            response = self._post(json=payload)
+
+            if response.status_code in (200, 204):
+                return True
+            else:
+                self.logger.error(
+                    f"Discord通知送信失敗 - ステータスコード: {response.status_code}"
+                )
+                return False
+
+        except Exception as e:
+            self.logger.error(f"Discord通知送信エラー: {str(e)}")
+            return False
 
     def send_message(
-        self, message: str, title: Optional[str] = None, level: str = "info"
+        self,
+        message: str,
+        title: Optional[str] = None,
+        level: str = "info",
+        urgent: bool = False,
     ) -> bool:
         """
         Discordにメッセージを送信する
@@ -49,11 +435,15 @@ class DiscordNotifier:
             メッセージのタイトル
         level : str, default="info"
             メッセージレベル ("debug", "info", "warning", "error")
+        urgent : bool, default=False
+            バックグラウンド送信時に優先して送信するか(約定など)。
+            level="error"の場合は常に優先する
 
         Returns:
         --------
         bool
             送信成功ならTrue、失敗ならFalse
+            (バックグラウンド送信時はキューに追加できればTrue)
 
         Examples:
         --------
@@ -66,39 +456,39 @@ class DiscordNotifier:
         if not self.enabled:
             return True  # 無効の場合は成功扱い
 
-        try:
-            payload = {
-                "content": message if not title else None,
-                "embeds": [
-                    {
-                        "title": title,
-                        "description": message,
-                        "color": self.COLORS.get(level, self.COLORS["info"]),
-                    }
-                ]
-                if title
-                else None,
+        content, embed = None, None
+        if title:
+            embed = {
+                "title": title,
+                "description": message[:MAX_DESCRIPTION_LENGTH],
+                "color": self.COLORS.get(level, self.COLORS["info"]),
             }
+        else:
+            content = message[:MAX_CONTENT_LENGTH]
 
-            response = requests.post(self.webhook_url, json=payload)
-
-            if response.status_code == 204:
-                return True
+        if self._dispatcher is not None:
+            if urgent or level == "error":
+                priority = PRIORITY_URGENT
+            elif level == "debug":
+                priority = PRIORITY_DEBUG
             else:
-                self.logger.error(
-                    f"Discord通知送信失敗 - ステータスコード: {response.status_code}"
-                )
-                return False
+                priority = PRIORITY_NORMAL
+            return self._dispatcher.put(content, embed, priority)
 
-        except Exception as e:
-            self.logger.error(f"Discord通知送信エラー: {str(e)}")
-            return False
+        return self._send_payload(
+            {"content": content, "embeds": [embed] if embed else None}
+        )
 
     def send_only_mention(self) -> bool:
-        return self.send_message(f"<@{self.mention_user_id}>")
+        # メンションは約定などの重要な通知の直前に送るため優先する
+        return self.send_message(f"<@{self.mention_user_id}>", urgent=True)
 
     def print_and_notify(
-        self, message: str, title: Optional[str] = None, level: str = "info"
+        self,
+        message: str,
+        title: Optional[str] = None,
+        level: str = "info",
+        urgent: bool = False,
     ) -> bool:
         """
         ログ出力とDiscord通知を同時に行う
@@ -111,6 +501,8 @@ class DiscordNotifier:
             メッセージのタイトル
         level : str, default="info"
             メッセージレベル ("debug", "info", "warning", "error")
+        urgent : bool, default=False
+            バックグラウンド送信時に優先して送信するか(約定など)
 
         Returns:
         --------
@@ -123,12 +515,12 @@ class DiscordNotifier:
 
         # Discord通知が有効な場合のみ送信
         if self.enabled:
-            return self.send_message(message, title, level)
+            return self.send_message(message, title, level, urgent=urgent)
         return True
 
     def send_image(self, image_data: io.BytesIO, message: str = "") -> bool:
         """
-        画像データをDiscordに送信する
+        画像データをDiscordに送信する(バックグラウンド送信時も呼び出したスレッドで送信する)
 
         Parameters:
         -----------
@@ -149,9 +541,9 @@ class DiscordNotifier:
             files = {"file": ("chart.png", image_data, "image/png")}
             payload = {"content": message}
 
-            response = requests.post(self.webhook_url, data=payload, files=files)
+            response = self._post(data=payload, files=files)
 
-            if response.status_code == 204:
+            if response.status_code in (200, 204):
                 return True
             else:
                 self.logger.error(
@@ -162,3 +554,15 @@ class DiscordNotifier:
         except Exception as e:
             self.logger.error(f"Discord画像送信エラー: {str(e)}")
             return False
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """バックグラウンド送信時に、送信待ちの通知がなくなるまで待つ"""
+        if self._dispatcher is None:
+            return True
+        return self._dispatcher.flush(timeout)
+
+    def close(self, timeout: Optional[float] = 10.0) -> None:
+        """送信待ちの通知を送信してバックグラウンド送信を停止する。以降は同期送信になる"""
+        if self._dispatcher is not None:
+            dispatcher, self._dispatcher = self._dispatcher, None
+            dispatcher.close(timeout)
@@ -0,0 +1,173 @@
+"""
+処理時間(レイテンシ)の計測
+
+各処理の所要時間を名前ごとに直近のサンプルとして保持し、
+p50/p95/p99/最大値を集計する。メインループの各段階やAPI呼び出しの計測に使う。
+
+使用例:
+    from src.utils.latency import latency
+
+    with latency.timer("indicators"):
+        df = strategy.get_indicators(historical_data)
+
+    latency.record("candle_close_to_order", elapsed_ms)
+    latency.summary()["indicators"]["p95"]
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+
+class LatencyHistogram:
+    """直近window件の所要時間（ミリ秒）を保持し、パーセンタイルを集計する"""
+
+    __slots__ = ("_samples", "count", "total_ms")
+
+    def __init__(self, window: int = 1000):
+        self._samples: deque[float] = deque(maxlen=window)
+        self.count = 0  # 記録した総数(windowを超えた分も含む)
+        self.total_ms = 0.0  # 記録した所要時間の合計(windowを超えた分も含む)
+
+    def record(self, elapsed_ms: float) -> None:
+        self._samples.append(elapsed_ms)
+        self.count += 1
+        self.total_ms += elapsed_ms
+
+    def summary(self) -> dict:
+        """
+        直近のサンプルを集計する
+
+        Returns:
+        --------
+        dict
+            count(総数), sum(総所要時間、ミリ秒),
+            p50, p95, p99, max(いずれも直近window件、ミリ秒)
+        """
+        samples = sorted(self._samples)
+        if not samples:
+            return {"count": self.count}
+
+        def percentile(q: float) -> float:
+            # 最近傍法(サンプル数が少なくても実際の値を返す)
+            index = min(len(samples) - 1, max(0, round(q * len(samples)) - 1))
+            return samples[index]
+
+        return {
+            "count": self.count,
+            "sum": self.total_ms,
+            "p50": percentile(0.50),
+            "p95": percentile(0.95),
+            "p99": percentile(0.99),
+            "max": samples[-1],
+        }
+
+
+class _Timer:
+    """LatencyRecorder.timerが返すコンテキストマネージャー"""
+
+    __slots__ = ("_recorder", "_name", "_start")
+
+    def __init__(self, recorder: "LatencyRecorder", name: str):
+        self._recorder = recorder
+        self._name = name
+
+    def __enter__(self) -> "_Timer":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._recorder.record(self._name, (time.perf_counter() - self._start) * 1000)
+
+
+class LatencyRecorder:
+    """
+    処理の名前ごとにLatencyHistogramを管理するクラス(スレッドセーフ)
+    """
+
+    def __init__(self, window: int = 1000):
+        """
+        Parameters:
+        -----------
+        window : int, default=1000
+            集計に使う直近のサンプル数
+        """
+        self.window = window
+        self._histograms: dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+        self._last_logged = time.monotonic()
+
+    def record(self, name: str, elapsed_ms: float) -> None:
+        """所要時間（ミリ秒）を記録する"""
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = LatencyHistogram(self.window)
+            histogram.record(elapsed_ms)
+
+    def timer(self, name: str) -> _Timer:
+        """withブロックの所要時間をnameとして記録するコンテキストマネージャーを返す"""
+        return _Timer(self, name)
+
+    def summary(self, name: Optional[str] = None) -> dict:
+        """
+        記録した所要時間を集計する
+
+        Parameters:
+        -----------
+        name : str, optional
+            指定した場合はその処理の集計のみを返す
+
+        Returns:
+        --------
+        dict
+            {名前: {count, sum, p50, p95, p99, max}}。nameを指定した場合は{count, sum, ...}
+        """
+        with self._lock:
+            if name is not None:
+                histogram = self._histograms.get(name)
+                return histogram.summary() if histogram else {"count": 0}
+            return {
+                key: histogram.summary()
+                for key, histogram in sorted(self._histograms.items())
+            }
+
+    def format_summary(self) -> str:
+        """集計結果を1処理1行の文字列にする"""
+        lines = []
+        for name, stats in self.summary().items():
+            if "max" not in stats:
+                continue
+            lines.append(
+                f"{name}: n={stats['count']} p50={stats['p50']:.1f}ms "
+                f"p95={stats['p95']:.1f}ms p99={stats['p99']:.1f}ms "
+                f"max={stats['max']:.1f}ms"
+            )
+        return "\n".join(lines)
+
+    def maybe_log(self, logger: logging.Logger, interval: float) -> bool:
+        """
+        前回の出力からinterval秒以上経過していれば集計結果をログに出力する
+
+        Returns:
+        --------
+        bool
+            出力した場合True
+        """
+        now = time.monotonic()
+        if now - self._last_logged < interval:
+            return False
+        self._last_logged = now
+        logger.info(f"レイテンシ集計:\n{self.format_summary()}")
+        return True
+
+    def reset(self) -> None:
+        """記録をすべて破棄する"""
+        with self._lock:
+            self._histograms.clear()
+
+
+# プロセス全体で共有するレコーダー
+latency = LatencyRecorder()
@@ -0,0 +1,70 @@
+"""
+重いモジュールを初めて使うときに読み込むための仕組み
+
+matplotlib・mplfinance・TA-Libなどは読み込みに時間がかかり、起動直後には使わない。
+モジュールの先頭でlazy_importしておけば、属性に初めてアクセスした時点で読み込まれる。
+
+使用例(ストラテジーなど):
+    from src.utils.lazy_import import lazy_import
+
+    talib = lazy_import("talib")
+
+    def calculate_indicators(self, df):
+        df["rsi"] = talib.RSI(df["close"])  # ここで初めてtalibを読み込む
+"""
+
+import importlib
+import sys
+import threading
+import types
+from typing import Optional
+
+
+class LazyModule(types.ModuleType):
+    """属性に初めてアクセスしたときに本来のモジュールを読み込むモジュールの代理"""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__["_lazy_module"] = None
+        self.__dict__["_lazy_lock"] = threading.Lock()
+
+    def _load(self) -> types.ModuleType:
+        module: Optional[types.ModuleType] = self.__dict__["_lazy_module"]
+        if module is None:
+            with self.__dict__["_lazy_lock"]:
+                module = self.__dict__["_lazy_module"]
+                if module is None:
+                    module = importlib.import_module(self.__name__)
+                    self.__dict__["_lazy_module"] = module
+        return module
+
+    @property
+    def is_loaded(self) -> bool:
+        """本来のモジュールを読み込み済みか"""
+        return self.__dict__["_lazy_module"] is not None
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+
+def lazy_import(name: str) -> types.ModuleType:
+    """
+    モジュールnameを初めて使うときに読み込む代理を返す
+
+    Parameters:
+    -----------
+    name : str
+        モジュール名(例: "talib", "matplotlib.pyplot")
+
+    Returns:
+    --------
+    types.ModuleType
+        属性アクセス時にモジュールを読み込む代理。読み込み済みの場合は本来のモジュール
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    return LazyModule(name)
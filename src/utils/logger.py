@@ -1,33 +1,125 @@
+import atexit
+import json
 import logging
+import logging.handlers
+import queue
+import threading
+from contextvars import ContextVar
+from datetime import datetime, timezone
 from typing import Optional
 
-from src.config.config import Config, LoggingConfig
+from src.config.config import LoggingConfig
 
-config_logging = Config.load().logging
+LOGGER_NAME = "trading_bot"
+
+# メインループの1サイクルを識別するID(同じサイクルのログを紐付ける)
+_cycle_id: ContextVar[Optional[str]] = ContextVar("cycle_id", default=None)
+
+
+class _CycleIdFilter(logging.Filter):
+    """ログを出力したスレッド(コンテキスト)のサイクルIDをrecord.cycle_idに設定する"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not hasattr(record, "cycle_id"):
+            record.cycle_id = _cycle_id.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """1行1JSONの形式でログを出力するフォーマッター"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(
+                timespec="milliseconds"
+            ),
+            "level": record.levelname,
+            "message": record.getMessage(),
+            "cycle_id": getattr(record, "cycle_id", None),
+            "thread": record.threadName,
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
 
 
 class Logger:
     _instance: Optional[logging.Logger] = None
+    _configured = False
+    _listener: Optional[logging.handlers.QueueListener] = None
+    _lock = threading.Lock()
 
     @classmethod
     def get_logger(cls) -> logging.Logger:
-        """ロガーのインスタンスを取得"""
+        """
+        ロガーのインスタンスを取得
+
+        取得時には設定ファイルを読み込まない。ファイルへの出力はmain()などの
+        エントリーポイントがLogger.configureで初期化してから行う。
+        初期化前のログはloggingの既定の動作(WARNING以上を標準エラーに出力)になる。
+        """
         if cls._instance is None:
-            cls._instance = cls._setup(config_logging)
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = logging.getLogger(LOGGER_NAME)
         return cls._instance
 
     @classmethod
-    def _setup(cls, config: LoggingConfig) -> logging.Logger:
-        """ロガーの初期化"""
-        if cls._instance is not None:
-            return cls._instance
+    def configure(cls, config: LoggingConfig) -> logging.Logger:
+        """ロガーを設定に従って初期化する(2回目以降は何もしない)"""
+        logger = cls.get_logger()
+        with cls._lock:
+            if not cls._configured:
+                cls._setup(logger, config)
+                cls._configured = True
+        return logger
+
+    @staticmethod
+    def set_cycle_id(cycle_id: Optional[str]) -> None:
+        """以降のログ(同じスレッド・コンテキスト)に付けるサイクルIDを設定する"""
+        _cycle_id.set(cycle_id)
 
-        logger = logging.getLogger("trading_bot")
+    @staticmethod
+    def get_cycle_id() -> Optional[str]:
+        """現在のサイクルID"""
+        return _cycle_id.get()
+
+    @classmethod
+    def shutdown(cls) -> None:
+        """バックグラウンドでの書き込みを停止する。キューに残っているログはすべて書き込む"""
+        if cls._listener is not None:
+            listener, cls._listener = cls._listener, None
+            listener.stop()
+
+    @staticmethod
+    def _file_handler(config: LoggingConfig) -> logging.Handler:
+        """設定のローテーション方式に応じたファイルハンドラを作成する"""
+        if config.rotation == "size":
+            return logging.handlers.RotatingFileHandler(
+                config.file,
+                maxBytes=config.max_bytes,
+                backupCount=config.backup_count,
+                encoding="utf-8",
+            )
+        if config.rotation == "time":
+            return logging.handlers.TimedRotatingFileHandler(
+                config.file,
+                when=config.when,
+                backupCount=config.backup_count,
+                encoding="utf-8",
+            )
+        if config.rotation == "none":
+            return logging.FileHandler(config.file, encoding="utf-8")
+        raise ValueError(f"無効なログのローテーション方式: {config.rotation}")
+
+    @classmethod
+    def _setup(cls, logger: logging.Logger, config: LoggingConfig) -> None:
+        """ロガーの初期化"""
         level = getattr(logging, config.level.upper())
         logger.setLevel(level)
 
         # ファイルハンドラの設定
-        fh = logging.FileHandler(config.file)
+        fh = cls._file_handler(config)
         fh.setLevel(level)
 
         # コンソールハンドラの設定
@@ -35,16 +127,35 @@ class Logger:
         ch.setLevel(level)
 
         # フォーマッターの設定
-        formatter = logging.Formatter(
-            # "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-            "%(asctime)s - %(levelname)s - %(message)s"
-        )
+        if config.format == "json":
+            formatter = JsonFormatter()
+        elif config.format == "text":
+            formatter = logging.Formatter(
+                # "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+                "%(asctime)s - %(levelname)s - %(message)s"
+            )
+        else:
+            raise ValueError(f"無効なログの形式: {config.format}")
         fh.setFormatter(formatter)
         ch.setFormatter(formatter)
 
-        # ハンドラの追加
-        logger.addHandler(fh)
-        logger.addHandler(ch)
+        # サイクルIDは出力したスレッドで付ける(書き込みスレッドでは参照できないため)
+        if not any(isinstance(f, _CycleIdFilter) for f in logger.filters):
+            logger.addFilter(_CycleIdFilter())
 
-        cls._instance = logger
-        return logger
+        if config.use_queue:
+            # 呼び出し元はキューに入れるだけで、書き込みはバックグラウンドスレッドで行う
+            log_queue: queue.SimpleQueue = queue.SimpleQueue()
+            handlers = [logging.handlers.QueueHandler(log_queue)]
+            cls._listener = logging.handlers.QueueListener(
+                log_queue, fh, ch, respect_handler_level=True
+            )
+            cls._listener.start()
+            # 終了時にキューに残っているログを書き込む
+            atexit.register(cls.shutdown)
+        else:
+            handlers = [fh, ch]
+
+        # ハンドラの追加
+        for handler in handlers:
+            logger.addHandler(handler)
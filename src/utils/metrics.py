@@ -0,0 +1,218 @@
+"""
+稼働状況のメトリクスをPrometheusのテキスト形式で公開する
+
+- LatencyRecorderに記録した処理時間(メインループの各段階、取引所APIのメソッドごとなど)
+- inc()で加算するカウンター(取引所APIのエラー数など)
+- gauge()で登録した関数の値(Discordの送信待ち数、HistoricalDataの本数など)
+- プロセスのRSS
+
+MetricsServerを起動すると、http://<host>:<port>/metrics で参照できる。
+"""
+
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Optional
+
+from src.utils.latency import LatencyRecorder, latency
+from src.utils.logger import Logger
+
+PREFIX = "crptb2_"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def process_rss_bytes() -> Optional[int]:
+    """プロセスの現在のRSS（バイト）。取得できない場合はNone"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+
+    try:
+        import resource
+    except ImportError:
+        return None
+    # /procがない環境ではピークRSSで代用する(macOSはバイト単位)
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(f'{key}="{_escape(str(value))}"' for key, value in labels.items())
+    return "{" + pairs + "}"
+
+
+class MetricsRegistry:
+    """
+    メトリクスを集めてPrometheusのテキスト形式にするクラス(スレッドセーフ)
+    """
+
+    def __init__(self, recorder: LatencyRecorder = latency):
+        """
+        Parameters:
+        -----------
+        recorder : LatencyRecorder
+            処理時間を集計するレコーダー
+        """
+        self._recorder = recorder
+        self._lock = threading.Lock()
+        # {名前: (説明, {ラベルの組: 値})}
+        self._counters: dict[str, tuple[str, dict[tuple, float]]] = {}
+        # {名前: (説明, 値を返す関数)}
+        self._gauges: dict[str, tuple[str, Callable[[], Optional[float]]]] = {}
+
+    def inc(self, name: str, value: float = 1, help: str = "", **labels) -> None:
+        """カウンターnameにvalueを加算する"""
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            _, values = self._counters.setdefault(name, (help, {}))
+            values[key] = values.get(key, 0) + value
+
+    def gauge(
+        self, name: str, func: Callable[[], Optional[float]], help: str = ""
+    ) -> None:
+        """
+        参照時にfuncを呼び出して値を得るゲージを登録する(同じ名前は上書き)
+
+        funcがNoneを返した場合や例外を送出した場合、そのゲージは出力しない。
+        """
+        with self._lock:
+            self._gauges[name] = (help, func)
+
+    def render(self) -> str:
+        """すべてのメトリクスをPrometheusのテキスト形式にする"""
+        lines: list[str] = []
+
+        with self._lock:
+            counters = {
+                name: (help, dict(values))
+                for name, (help, values) in self._counters.items()
+            }
+            gauges = dict(self._gauges)
+
+        for name, (help, values) in sorted(counters.items()):
+            metric = PREFIX + name
+            if help:
+                lines.append(f"# HELP {metric} {help}")
+            lines.append(f"# TYPE {metric} counter")
+            for key, value in sorted(values.items()):
+                lines.append(f"{metric}{_labels(dict(key))} {value}")
+
+        gauges.setdefault(
+            "process_resident_memory_bytes", ("プロセスのRSS", process_rss_bytes)
+        )
+        for name, (help, func) in sorted(gauges.items()):
+            try:
+                value = func()
+            except Exception:
+                continue
+            if value is None:
+                continue
+            metric = PREFIX + name
+            if help:
+                lines.append(f"# HELP {metric} {help}")
+            lines.append(f"# TYPE {metric} gauge")
+            lines.append(f"{metric} {float(value)}")
+
+        summaries = self._recorder.summary()
+        if summaries:
+            metric = PREFIX + "latency_milliseconds"
+            lines.append(f"# HELP {metric} 処理時間(直近のサンプルの分位数)")
+            lines.append(f"# TYPE {metric} summary")
+            for stage, stats in summaries.items():
+                if "max" in stats:
+                    for quantile in ("p50", "p95", "p99"):
+                        labels = {"stage": stage, "quantile": f"0.{quantile[1:]}"}
+                        lines.append(f"{metric}{_labels(labels)} {stats[quantile]}")
+                lines.append(
+                    f"{metric}_count{_labels({'stage': stage})} {stats['count']}"
+                )
+                lines.append(
+                    f"{metric}_sum{_labels({'stage': stage})} {stats.get('sum', 0.0)}"
+                )
+
+        return "\n".join(lines) + "\n"
+
+
+class LogCountHandler(logging.Handler):
+    """ログの出力数をレベルごとにカウンター"log_messages_total"へ加算するハンドラー"""
+
+    def __init__(self, registry: MetricsRegistry):
+        super().__init__()
+        self._registry = registry
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self._registry.inc(
+            "log_messages_total",
+            help="レベルごとのログ出力数",
+            level=record.levelname.lower(),
+        )
+
+
+class MetricsServer:
+    """
+    /metricsでMetricsRegistryの内容を返すHTTPサーバー(バックグラウンドスレッドで動作)
+    """
+
+    def __init__(
+        self, registry: MetricsRegistry, host: str = "127.0.0.1", port: int = 9108
+    ):
+        """
+        Parameters:
+        -----------
+        registry : MetricsRegistry
+            公開するメトリクス
+        host : str, default="127.0.0.1"
+            待ち受けるアドレス(外部に公開しないためlocalhostを推奨)
+        port : int, default=9108
+            待ち受けるポート。0の場合は空いているポートを使う
+        """
+        self.logger = Logger.get_logger()
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = registry.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # アクセスログは出力しない
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="metrics-server", daemon=True
+        )
+
+    @property
+    def address(self) -> tuple[str, int]:
+        """待ち受けている(アドレス, ポート)"""
+        return self._server.server_address[:2]
+
+    def start(self) -> "MetricsServer":
+        self._thread.start()
+        host, port = self.address
+        self.logger.info(f"メトリクスを公開しました: http://{host}:{port}/metrics")
+        return self
+
+    def close(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+# プロセス全体で共有するレジストリ
+metrics = MetricsRegistry()
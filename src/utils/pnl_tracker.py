@@ -1,12 +1,18 @@
-import time
+import math
+from array import array
 from dataclasses import dataclass
-from datetime import datetime
-from typing import List, Optional
+from datetime import datetime, timedelta
+from typing import Iterator, Optional, Union, overload
 
+import numpy as np
+
+from src.trade_store import TradeStore
 from src.utils.discord import DiscordNotifier
+from src.utils.risk_metrics import RiskMetrics
+from src.utils.time_utils import Clock
 
 
-@dataclass
+@dataclass(slots=True)
 class Trade:
     timestamp: int
     side: str  # "buy" or "sell"
@@ -16,6 +22,115 @@ class Trade:
     fee: float = 0.0
 
 
+class TradeJournal:
+    """
+    取引履歴を列ごとのarrayで保持するクラス
+
+    Tradeオブジェクトを保持し続けるのではなく、1件あたり41バイトの固定長で保持する。
+    インデックス・スライスでアクセスした場合はその都度Tradeを作成して返す。
+    """
+
+    def __init__(self):
+        self._timestamps = array("q")
+        self._sides = array("B")  # _side_namesのインデックス
+        self._prices = array("d")
+        self._amounts = array("d")
+        self._pnls = array("d")  # 決済前はNaN
+        self._fees = array("d")
+        self._side_names: list[str] = []
+
+    def __len__(self) -> int:
+        return len(self._timestamps)
+
+    @classmethod
+    def from_arrays(
+        cls,
+        timestamps: np.ndarray,
+        side_codes: np.ndarray,
+        side_names: list[str],
+        prices: np.ndarray,
+        amounts: np.ndarray,
+        pnls: np.ndarray,
+        fees: np.ndarray,
+    ) -> "TradeJournal":
+        """
+        列ごとのnumpy配列から取引履歴を作成する(1件ずつappendせずにまとめてコピーする)
+
+        Parameters:
+        -----------
+        timestamps, prices, amounts, pnls, fees : numpy.ndarray
+            各取引の値(pnlsは決済前の取引をNaNとする)
+        side_codes : numpy.ndarray
+            各取引のside_namesでのインデックス
+        side_names : list[str]
+            取引サイドの名前
+        """
+
+        def column(typecode: str, values: np.ndarray, dtype: str) -> array:
+            return array(typecode, np.asarray(values, dtype).tobytes())
+
+        journal = cls()
+        journal._timestamps = column("q", timestamps, "=i8")
+        journal._sides = column("B", side_codes, "u1")
+        journal._prices = column("d", prices, "=f8")
+        journal._amounts = column("d", amounts, "=f8")
+        journal._pnls = column("d", pnls, "=f8")
+        journal._fees = column("d", fees, "=f8")
+        journal._side_names = list(side_names)
+        return journal
+
+    def _side_code(self, side: str) -> int:
+        try:
+            return self._side_names.index(side)
+        except ValueError:
+            self._side_names.append(side)
+            return len(self._side_names) - 1
+
+    def append(self, trade: Trade) -> int:
+        """取引を追加し、そのインデックスを返す"""
+        self._timestamps.append(trade.timestamp)
+        self._sides.append(self._side_code(trade.side))
+        self._prices.append(trade.price)
+        self._amounts.append(trade.amount)
+        self._pnls.append(math.nan if trade.pnl is None else trade.pnl)
+        self._fees.append(trade.fee)
+        return len(self._timestamps) - 1
+
+    def set_pnl(self, index: int, pnl: Optional[float]) -> None:
+        """index番目の取引の損益を設定する"""
+        self._pnls[index] = math.nan if pnl is None else pnl
+
+    def _trade(self, index: int) -> Trade:
+        pnl = self._pnls[index]
+        return Trade(
+            timestamp=self._timestamps[index],
+            side=self._side_names[self._sides[index]],
+            price=self._prices[index],
+            amount=self._amounts[index],
+            pnl=None if math.isnan(pnl) else pnl,
+            fee=self._fees[index],
+        )
+
+    @overload
+    def __getitem__(self, index: int) -> Trade: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[Trade]: ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Trade, list[Trade]]:
+        if isinstance(index, slice):
+            return [self._trade(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("取引履歴のインデックスが範囲外です")
+        return self._trade(index)
+
+    def __iter__(self) -> Iterator[Trade]:
+        for i in range(len(self)):
+            yield self._trade(i)
+
+
 class PnLTracker:
     def __init__(
         self,
@@ -23,16 +138,128 @@ class PnLTracker:
         fee_rate: float,
         leverage: float,
         discord: DiscordNotifier,
+        store: Optional[TradeStore] = None,
+        risk_window: int = 100,
+        periods_per_year: Optional[float] = None,
+        quiet: bool = False,
+        clock: Optional[Clock] = None,
     ):
+        """
+        Parameters:
+        -----------
+        simulation_initial_balance : float
+            シミュレーション用初期残高
+        fee_rate : float
+            取引手数料率
+        leverage : float
+            レバレッジ
+        discord : DiscordNotifier
+            通知クライアント
+        store : TradeStore, optional
+            取引を追記するストア。保存済みの取引・リスク指標があれば、そこから状態を復元する
+        risk_window : int, default=100
+            シャープレシオ・ソルティノレシオの計算に使う直近の足の本数
+        periods_per_year : float, optional
+            1年あたりの足の本数(シャープレシオ・ソルティノレシオの年率換算に使う)
+        quiet : bool, default=False
+            Trueの場合は決済ごとのPnL計算の詳細を出力しない(バックテスト用)
+        clock : Clock, optional
+            simulate_tradeで取引時刻に使う時計。省略時は実際の時刻を使う
+        """
         self.simulation_initial_balance = (
             simulation_initial_balance  # シミュレーション用初期残高
         )
         self.current_balance = simulation_initial_balance  # 現在の残高
         self.fee_rate = fee_rate  # 取引手数料率
-        self.trades: List[Trade] = []  # 取引履歴
+        self.trades = TradeJournal()  # 取引履歴
         self.position: Optional[Trade] = None  # 今持っているポジション
+        self._position_index: Optional[int] = None  # positionのtradesでのインデックス
         self.leverage = leverage
         self.discord = discord
+        self.quiet = quiet
+        self.clock = clock or Clock()
+
+        # 取引ごとに更新する集計値(get_summaryで取引履歴を走査しないため)
+        self.total_pnl = 0.0  # 総損益
+        self.total_fee = 0.0  # 総手数料
+        self.win_trades = 0  # 損益がプラスで決済した回数
+        self.closed_trades = 0  # 決済回数
+        self.total_hold_ms = 0  # 決済したポジションの保有時間の合計(ミリ秒)
+
+        # mark_to_marketで足ごとに更新するリスク指標
+        self.risk = RiskMetrics(window=risk_window, periods_per_year=periods_per_year)
+
+        self.store = store
+        if store is not None and len(store):
+            self._restore(store)
+        if store is not None:
+            # 再起動前のドローダウンや保有率を引き継ぐ
+            risk_state = store.load_risk_state()
+            if risk_state is not None:
+                self.risk.restore(risk_state)
+
+    def _restore(self, store: TradeStore) -> None:
+        """
+        ストアに保存済みの取引から取引履歴・ポジション・残高・集計値を復元する
+
+        決済のレコードは決済したポジションのインデックスと損益を持つため、
+        取引を再計算せずに配列演算のみで復元できる。
+        """
+        records = store.read()
+        kinds = records["kind"]
+        exits = kinds == TradeStore.KIND_EXIT
+        closed_pnls = records["closed_pnl"][exits]
+
+        pnls = np.full(len(records), np.nan)
+        pnls[records["closed_index"][exits]] = closed_pnls
+        side_names, side_codes = np.unique(records["side"], return_inverse=True)
+        self.trades = TradeJournal.from_arrays(
+            records["timestamp"],
+            side_codes,
+            [name.decode() for name in side_names],
+            records["price"],
+            records["amount"],
+            pnls,
+            records["fee"],
+        )
+
+        # add_tradeで1件ずつ加算した場合と同じ値にするため、合計は先頭から順に加算する
+        balances = np.cumsum(np.concatenate(([self.current_balance], closed_pnls)))
+        self.current_balance = float(balances[-1])
+        self.total_pnl = float(np.cumsum(np.concatenate(([0.0], closed_pnls)))[-1])
+        self.total_fee = float(np.cumsum(np.concatenate(([0.0], records["fee"])))[-1])
+        self.closed_trades = int(exits.sum())
+        self.win_trades = int((closed_pnls > 0).sum())
+        timestamps = records["timestamp"]
+        self.total_hold_ms = int(
+            (timestamps[exits] - timestamps[records["closed_index"][exits]]).sum()
+        )
+
+        # 最後の取引が決済でなければ、そのポジションを保有中
+        if kinds[-1] != TradeStore.KIND_EXIT:
+            self._position_index = len(records) - 1
+            self.position = self.trades[self._position_index]
+
+    def _journal(
+        self,
+        trade: Trade,
+        kind: int,
+        closed_index: int = -1,
+        closed_pnl: float = math.nan,
+    ) -> None:
+        """ストアが指定されていれば取引を追記する"""
+        if self.store is None:
+            return
+        self.store.append(
+            trade.timestamp,
+            trade.side,
+            kind,
+            trade.price,
+            trade.amount,
+            trade.fee,
+            closed_index,
+            closed_pnl,
+        )
 
     def add_trade(
         self, timestamp: int, side: str, price: float, amount: float
@@ -44,10 +271,13 @@ class PnLTracker:
             timestamp=timestamp, side=side, price=price, amount=amount, fee=fee
         )
 
+        self.total_fee += fee
+
         # エントリー(エントリー時はポジションは持っていない想定)
         if self.position is None:
             self.position = trade
-            self.trades.append(trade)
+            self._position_index = self.trades.append(trade)
+            self._journal(trade, TradeStore.KIND_ENTRY)
             return trade
 
         # 決済の場合
@@ -75,26 +305,37 @@ class PnLTracker:
                     - self.position.fee
                 )
 
-            # デバッグ用のログ出力
-            debug_msg = (
-                f"PnL計算詳細:\n"
-                f"side: {side}\n"
-                f"エントリー価格: {self.position.price}\n"
-                f"決済価格: {price}\n"
-                f"価格変化率: {price_change_rate:.2%}\n"
-                f"エントリー時の手数料: {self.position.fee}\n"
-                f"決済時の手数料: {fee}\n"
-                f"取引額: {trade_value}\n"
-                f"レバレッジ: {self.leverage}\n"
-                f"計算されたPnL: {pnl}"
-            )
-            self.discord.print_and_notify(debug_msg, title="PnL Debug", level="debug")
+            # デバッグ用のログ出力(バックテストでは出力しない)
+            if not self.quiet:
+                debug_msg = (
+                    f"PnL計算詳細:\n"
+                    f"side: {side}\n"
+                    f"エントリー価格: {self.position.price}\n"
+                    f"決済価格: {price}\n"
+                    f"価格変化率: {price_change_rate:.2%}\n"
+                    f"エントリー時の手数料: {self.position.fee}\n"
+                    f"決済時の手数料: {fee}\n"
+                    f"取引額: {trade_value}\n"
+                    f"レバレッジ: {self.leverage}\n"
+                    f"計算されたPnL: {pnl}"
+                )
+                self.discord.print_and_notify(
+                    debug_msg, title="PnL Debug", level="debug"
+                )
 
             self.position.pnl = pnl
+            self.trades.set_pnl(self._position_index, pnl)
+            self._journal(trade, TradeStore.KIND_EXIT, self._position_index, pnl)
             self.current_balance += pnl
+            self.total_pnl += pnl
+            self.closed_trades += 1
+            self.total_hold_ms += timestamp - self.position.timestamp
+            if pnl > 0:
+                self.win_trades += 1
             self.position = (
                 None  # 全決済しているのでNoneにする # TODO: None代入で良いか
             )
+            self._position_index = None
         else:
             # 以下の処理だと同じ方向の取引の場合は上書きされてしまうが、
             # そもそも同じ方向に複数回エントリーすることを想定した作りになっていないので
@@ -105,29 +346,78 @@ class PnLTracker:
                 level="warn",
             )
             self.position = trade
+            self._position_index = len(self.trades)
+            self._journal(trade, TradeStore.KIND_REPLACE)
 
         self.trades.append(trade)
         return trade
 
+    def unrealized_pnl(self, price: float) -> float:
+        """
+        保有ポジションをpriceで評価した含み損益(ポジションがない場合は0)
+
+        add_tradeの決済時と同じ計算で、決済時の手数料は含めない
+        """
+        if self.position is None:
+            return 0.0
+        entry_price = self.position.price
+        if self.position.side in ("long", "buy"):
+            price_change_rate = (price - entry_price) / entry_price
+        else:
+            price_change_rate = (entry_price - price) / entry_price
+        trade_value = price * self.position.amount
+        return price_change_rate * self.leverage * trade_value - self.position.fee
+
+    def mark_to_market(self, price: float) -> float:
+        """
+        足の終値で評価額(残高 + 含み損益)を計算し、リスク指標を更新する(足ごとに呼ぶ)
+
+        ストアが指定されていれば、再起動時に復元できるようリスク指標の状態を保存する
+
+        Parameters:
+        -----------
+        price : float
+            確定足の終値
+
+        Returns:
+        --------
+        float
+            評価額
+        """
+        equity = self.current_balance + self.unrealized_pnl(price)
+        self.risk.update(equity, in_market=self.position is not None)
+        if self.store is not None:
+            self.store.save_risk_state(self.risk.state())
+        return equity
+
     def get_summary(self) -> dict:
-        """取引サマリーを取得"""
-        total_pnl = sum(trade.pnl for trade in self.trades if trade.pnl is not None)
-        total_fee = sum(trade.fee for trade in self.trades)
-        win_trades = sum(
-            1 for trade in self.trades if trade.pnl is not None and trade.pnl > 0
+        """取引サマリーを取得(取引ごと・足ごとに更新している集計値を使うためO(1))"""
+        win_rate = (
+            (self.win_trades / self.closed_trades * 100)
+            if self.closed_trades > 0
+            else 0
         )
-        total_trades = sum(1 for trade in self.trades if trade.pnl is not None)
-
-        win_rate = (win_trades / total_trades * 100) if total_trades > 0 else 0
+        average_hold = (
+            timedelta(seconds=round(self.total_hold_ms / self.closed_trades / 1000))
+            if self.closed_trades > 0
+            else timedelta(0)
+        )
+        sharpe = self.risk.sharpe()
+        sortino = self.risk.sortino()
 
         return {
             "初期残高": self.simulation_initial_balance,
             "現在残高": self.current_balance,
-            "総損益": total_pnl,
-            "総手数料": total_fee,
-            "決済回数": total_trades,
+            "総損益": self.total_pnl,
+            "総手数料": self.total_fee,
+            "決済回数": self.closed_trades,
             "勝率": f"{win_rate:.2f}%",
             "レバレッジ": f"{self.leverage}倍",
+            "最大ドローダウン": f"{self.risk.max_drawdown:.2%}",
+            "シャープレシオ": sharpe if sharpe is not None else "-",
+            "ソルティノレシオ": sortino if sortino is not None else "-",
+            "ポジション保有率": f"{self.risk.time_in_market:.2%}",
+            "平均保有時間": str(average_hold),
         }
 
     def get_trade_history(self, limit: int = 10) -> str:
@@ -169,7 +459,7 @@ class PnLTracker:
         Returns:
             tuple[dict, str]: (注文情報, 通知メッセージ)
         """
-        timestamp = int(time.time() * 1000)  # タイムスタンプ(ミリ秒)
+        timestamp = int(self.clock.time() * 1000)  # タイムスタンプ(ミリ秒)
 
         # トレードを記録
         trade = self.add_trade(
@@ -195,6 +485,7 @@ class PnLTracker:
             message,
             title="PnLTracker.simulate_trade",
             level="warning",  # 目立たせるため一旦Warningレベルにしとく
+            urgent=True,
         )
 
         order_info = {"dry_run": True, "symbol": symbol, "side": side, "amount": amount}
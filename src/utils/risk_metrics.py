@@ -0,0 +1,190 @@
+"""
+損益曲線(エクイティカーブ)のリスク指標
+
+足ごとに評価額(残高 + 保有ポジションの含み損益)を受け取り、
+最大ドローダウン・直近window本のシャープレシオ/ソルティノレシオ・ポジション保有率を
+全履歴を走査せずに逐次更新する。毎サイクル参照しても計算量はO(1)。
+
+使用例:
+    risk = RiskMetrics(window=100, periods_per_year=365 * 24 * 4)  # 15分足
+    risk.update(equity, in_market=True)
+    risk.max_drawdown, risk.sharpe(), risk.sortino(), risk.time_in_market
+"""
+
+import math
+from collections import deque
+from typing import Optional
+
+
+class RiskMetrics:
+    """評価額の推移からリスク指標を逐次計算するクラス"""
+
+    __slots__ = (
+        "window",
+        "periods_per_year",
+        "equity",
+        "peak",
+        "max_drawdown",
+        "bars",
+        "bars_in_market",
+        "_returns",
+        "_sum",
+        "_sum_sq",
+        "_downside_sq",
+        "_updates",
+    )
+
+    def __init__(self, window: int = 100, periods_per_year: Optional[float] = None):
+        """
+        Parameters:
+        -----------
+        window : int, default=100
+            シャープレシオ・ソルティノレシオの計算に使う直近の足の本数
+        periods_per_year : float, optional
+            1年あたりの足の本数。指定した場合はシャープレシオ・ソルティノレシオを年率換算する
+        """
+        self.window = window
+        self.periods_per_year = periods_per_year
+        self.equity: Optional[float] = None  # 直近の評価額
+        self.peak: Optional[float] = None  # 評価額の最大値
+        self.max_drawdown = 0.0  # 最大ドローダウン(ピークからの下落率)
+        self.bars = 0  # 評価した足の本数
+        self.bars_in_market = 0  # そのうちポジションを保有していた足の本数
+
+        # 直近window本のリターンと、その合計・二乗和・下方リターンの二乗和
+        self._returns: deque[float] = deque()
+        self._sum = 0.0
+        self._sum_sq = 0.0
+        self._downside_sq = 0.0
+        self._updates = 0  # 合計を計算し直してからの更新回数
+
+    def state(self) -> dict:
+        """
+        再起動後に復元するための状態(JSONに変換できる値のみ)
+
+        Returns:
+        --------
+        dict
+            評価額・ピーク・最大ドローダウン・足の本数・直近window本のリターン
+        """
+        return {
+            "equity": self.equity,
+            "peak": self.peak,
+            "max_drawdown": self.max_drawdown,
+            "bars": self.bars,
+            "bars_in_market": self.bars_in_market,
+            "returns": list(self._returns),
+        }
+
+    def restore(self, state: dict) -> None:
+        """
+        stateで保存した状態を復元する
+
+        Parameters:
+        -----------
+        state : dict
+            RiskMetrics.stateの戻り値
+        """
+        self.equity = state["equity"]
+        self.peak = state["peak"]
+        self.max_drawdown = state["max_drawdown"]
+        self.bars = state["bars"]
+        self.bars_in_market = state["bars_in_market"]
+        self._returns = deque(state["returns"][-self.window :])
+        self._sum = math.fsum(self._returns)
+        self._sum_sq = math.fsum(value * value for value in self._returns)
+        self._downside_sq = math.fsum(min(value, 0.0) ** 2 for value in self._returns)
+        self._updates = 0
+
+    def update(self, equity: float, in_market: bool) -> None:
+        """
+        1本分の評価額を追加する
+
+        Parameters:
+        -----------
+        equity : float
+            足の終値で評価した評価額(残高 + 含み損益)
+        in_market : bool
+            この足でポジションを保有しているか
+        """
+        if self.equity is not None and self.equity > 0:
+            self._push_return(equity / self.equity - 1)
+        self.equity = equity
+
+        if self.peak is None or equity > self.peak:
+            self.peak = equity
+        elif self.peak > 0:
+            self.max_drawdown = max(self.max_drawdown, 1 - equity / self.peak)
+
+        self.bars += 1
+        if in_market:
+            self.bars_in_market += 1
+
+    def _push_return(self, value: float) -> None:
+        self._returns.append(value)
+        self._sum += value
+        self._sum_sq += value * value
+        self._downside_sq += min(value, 0.0) ** 2
+        if len(self._returns) > self.window:
+            old = self._returns.popleft()
+            self._sum -= old
+            self._sum_sq -= old * old
+            self._downside_sq -= min(old, 0.0) ** 2
+
+        # 加算と減算を繰り返した誤差が溜まらないよう、window回ごとに計算し直す
+        self._updates += 1
+        if self._updates >= self.window:
+            self._sum = math.fsum(self._returns)
+            self._sum_sq = math.fsum(value * value for value in self._returns)
+            self._downside_sq = math.fsum(
+                min(value, 0.0) ** 2 for value in self._returns
+            )
+            self._updates = 0
+
+    @property
+    def drawdown(self) -> float:
+        """現在のドローダウン(ピークからの下落率)"""
+        if self.equity is None or not self.peak or self.peak <= 0:
+            return 0.0
+        return max(0.0, 1 - self.equity / self.peak)
+
+    @property
+    def time_in_market(self) -> float:
+        """ポジションを保有していた足の割合(0〜1)"""
+        return self.bars_in_market / self.bars if self.bars else 0.0
+
+    def _annualize(self) -> float:
+        return math.sqrt(self.periods_per_year) if self.periods_per_year else 1.0
+
+    def sharpe(self) -> Optional[float]:
+        """
+        直近window本のリターンのシャープレシオ(無リスク金利は0とする)
+
+        Returns:
+        --------
+        float or None
+            リターンが2本未満、または標準偏差が0の場合はNone
+        """
+        n = len(self._returns)
+        if n < 2:
+            return None
+        mean = self._sum / n
+        variance = (self._sum_sq - n * mean * mean) / (n - 1)
+        if variance <= 0:
+            return None
+        return mean / math.sqrt(variance) * self._annualize()
+
+    def sortino(self) -> Optional[float]:
+        """
+        直近window本のリターンのソルティノレシオ(目標リターンは0とする)
+
+        Returns:
+        --------
+        float or None
+            リターンが2本未満、または下方リターンがない場合はNone
+        """
+        n = len(self._returns)
+        if n < 2 or self._downside_sq <= 0:
+            return None
+        downside_deviation = math.sqrt(self._downside_sq / n)
+        return self._sum / n / downside_deviation * self._annualize()
@@ -0,0 +1,174 @@
+import heapq
+import itertools
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional
+
+from src.utils.logger import Logger
+from src.utils.time_utils import Clock, timeframe_to_ms
+
+logger = Logger.get_logger()
+
+
+@dataclass
+class CandleEvent:
+    """足の確定を検知した結果"""
+
+    symbol: str
+    timeframe: str
+    bar: list  # 確定した足 [timestamp, open, high, low, close, volume]
+    ohlcv: List[List]  # 確定を検知したときのfetch_ohlcvの結果
+    close_time: int  # 足が確定した時刻(サーバー時刻、ミリ秒)
+    closed_at: float  # 足が確定した時刻に相当するClock.monotonic()の値
+    polls: int  # 確定を検知するまでのfetch_ohlcvの呼び出し回数
+
+
+@dataclass(order=True)
+class _Entry:
+    due: float  # 起床するClock.monotonic()の値
+    seq: int  # 同時刻の場合の順序
+    symbol: str = field(compare=False)
+    timeframe: str = field(compare=False)
+    # 次に確定する足の確定時刻(サーバー時刻、ミリ秒)
+    close_time: int = field(compare=False)
+
+
+class CandleTimeoutError(TimeoutError):
+    """確定足が一定時間内に取得できなかった場合の例外"""
+
+
+class CandleCloseScheduler:
+    """
+    足の確定を検知するスケジューラー
+
+    (シンボル, タイムフレーム)ごとの次の足の確定時刻を1つのタイマーヒープで管理し、
+    最も早いものの確定時刻まで単調時計で待機する。
+    起床後は新しい足が現れる(=直前の足が確定する)までfetch_ohlcvを短い間隔でポーリングし、
+    間隔は徐々に伸ばす。取引所側で足の確定が遅れても未確定の足を使うことはない。
+    """
+
+    def __init__(
+        self,
+        fetch_ohlcv: Callable[[str, str], List[List]],
+        clock: Optional[Clock] = None,
+        offset_ms: Callable[[], float] = lambda: 0,
+        poll_interval: float = 0.2,
+        max_poll_interval: float = 2.0,
+        timeout: float = 60.0,
+    ):
+        """
+        Parameters:
+        -----------
+        fetch_ohlcv : Callable[[str, str], List[List]]
+            (シンボル, タイムフレーム)を受け取り、直近数本のOHLCV(古い順)を返す関数
+        clock : Clock, optional
+            時計。省略時は実際の時刻を使う
+        offset_ms : Callable[[], float]
+            サーバー時刻 - ローカル時刻（ミリ秒）を返す関数
+        poll_interval : float, default=0.2
+            最初のポーリング間隔（秒）。以降は倍にしていく
+        max_poll_interval : float, default=2.0
+            ポーリング間隔の上限（秒）
+        timeout : float, default=60.0
+            確定時刻からこの秒数が経過しても確定足が取得できない場合はCandleTimeoutError
+        """
+        self._fetch_ohlcv = fetch_ohlcv
+        self._clock = clock or Clock()
+        self._offset_ms = offset_ms
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.timeout = timeout
+        self._heap: list[_Entry] = []
+        self._seq = itertools.count()
+
+    def _server_time_ms(self) -> float:
+        return self._clock.time() * 1000 + self._offset_ms()
+
+    def _schedule(self, symbol: str, timeframe: str, close_time: int) -> None:
+        """サーバー時刻close_timeに確定する足を単調時計上の起床時刻に変換して登録する"""
+        wait = (close_time - self._server_time_ms()) / 1000
+        due = self._clock.monotonic() + max(wait, 0)
+        heapq.heappush(
+            self._heap, _Entry(due, next(self._seq), symbol, timeframe, close_time)
+        )
+
+    def add(self, symbol: str, timeframe: str) -> None:
+        """
+        監視する(シンボル, タイムフレーム)を追加する。次の足の確定から検知対象になる
+        """
+        interval = timeframe_to_ms(timeframe)
+        close_time = (int(self._server_time_ms()) // interval + 1) * interval
+        self._schedule(symbol, timeframe, close_time)
+
+    def seconds_until_next(self) -> float:
+        """次の足の確定までの秒数。監視対象が無い場合はinf"""
+        if not self._heap:
+            return float("inf")
+        return max(self._heap[0].due - self._clock.monotonic(), 0)
+
+    def wait_next(self) -> CandleEvent:
+        """
+        次に確定する足を待ち、確定を検知したら返す
+
+        Returns:
+        --------
+        CandleEvent
+            確定した足の情報
+
+        Raises:
+        -------
+        CandleTimeoutError
+            timeout秒以内に確定足が取得できなかった場合。
+            この足の検知は諦め、次の足の確定を待つよう登録し直す
+        """
+        if not self._heap:
+            raise RuntimeError("監視対象が登録されていません")
+
+        entry = heapq.heappop(self._heap)
+        self._clock.sleep(entry.due - self._clock.monotonic())
+
+        interval = timeframe_to_ms(entry.timeframe)
+        bar_time = entry.close_time - interval  # 確定を待つ足の開始時刻
+        poll_interval = self.poll_interval
+        polls = 0
+
+        try:
+            while True:
+                ohlcv = self._fetch_ohlcv(entry.symbol, entry.timeframe)
+                polls += 1
+
+                # 確定を待つ足より新しい足が現れていれば、待っている足は確定済み
+                if ohlcv and ohlcv[-1][0] > bar_time:
+                    bar = next((row for row in ohlcv if row[0] == bar_time), None)
+                    if bar is None:
+                        # 待っている足が応答に含まれない場合は最新の確定足を使う
+                        bar = ohlcv[-2] if len(ohlcv) >= 2 else None
+                    if bar is not None:
+                        return CandleEvent(
+                            symbol=entry.symbol,
+                            timeframe=entry.timeframe,
+                            bar=bar,
+                            ohlcv=ohlcv,
+                            close_time=entry.close_time,
+                            closed_at=entry.due,
+                            polls=polls,
+                        )
+
+                if self._clock.monotonic() - entry.due >= self.timeout:
+                    raise CandleTimeoutError(
+                        f"確定足を取得できませんでした: {entry.symbol} {entry.timeframe} "
+                        f"(足の確定時刻: {entry.close_time}, ポーリング回数: {polls})"
+                    )
+
+                logger.debug(
+                    f"足がまだ確定していないため{poll_interval}秒後に再取得します: "
+                    f"{entry.symbol} {entry.timeframe}"
+                )
+                self._clock.sleep(poll_interval)
+                poll_interval = min(poll_interval * 2, self.max_poll_interval)
+        finally:
+            # 成否に関わらず、次の足の確定を登録する(確定時刻を過ぎている足は飛ばす)
+            next_close = entry.close_time + interval
+            server_now = self._server_time_ms()
+            if next_close <= server_now:
+                next_close = (int(server_now) // interval + 1) * interval
+            self._schedule(entry.symbol, entry.timeframe, next_close)
@@ -1,7 +1,99 @@
+import time
 from typing import Union
 
 import pandas as pd
 
+# タイムフレームごとの足の長さ(ミリ秒)
+TIMEFRAME_MS = {
+    "1m": 60000,
+    "5m": 300000,
+    "15m": 900000,
+    "1h": 3600000,
+    "4h": 14400000,
+    "6h": 21600000,
+    "1d": 86400000,
+}
+
+# 1年(365日)の長さ(ミリ秒)
+YEAR_MS = 365 * 86400000
+
+
+class Clock:
+    """
+    現在時刻の取得と待機を行うクラス
+
+    時刻に依存する処理(スケジューラーなど)はこのクラス経由で時刻を扱い、
+    テストやリプレイでは偽の時計に差し替える。
+    """
+
+    def time(self) -> float:
+        """現在のUNIX時刻（秒）"""
+        return time.time()
+
+    def monotonic(self) -> float:
+        """単調増加する時刻（秒）。経過時間や待機の計算に使う"""
+        return time.monotonic()
+
+    def sleep(self, seconds: float) -> None:
+        """指定秒数待機する"""
+        if seconds > 0:
+            time.sleep(seconds)
+
+
+class SimulatedClock(Clock):
+    """
+    シミュレーション上の時刻を返す時計(リプレイ用)
+
+    sleepは待機せずに時刻を進めるだけなので、待機を含む処理もCPUの速度で進む。
+    time()とmonotonic()は同じ値を返す。
+    """
+
+    def __init__(self, now_ms: int):
+        """
+        Parameters:
+        -----------
+        now_ms : int
+            開始時刻(UNIX時刻、ミリ秒)
+        """
+        self._now = now_ms / 1000
+
+    def time(self) -> float:
+        return self._now
+
+    def monotonic(self) -> float:
+        return self._now
+
+    def sleep(self, seconds: float) -> None:
+        if seconds > 0:
+            self._now += seconds
+
+
+def timeframe_to_ms(timeframe: str) -> int:
+    """
+    タイムフレームを足の長さ(ミリ秒)に変換する
+
+    Parameters:
+    -----------
+    timeframe : str
+        タイムフレーム（"1m", "5m", "15m", "1h", "4h", "6h", "1d"）
+
+    Returns:
+    --------
+    int
+        足の長さ（ミリ秒）
+
+    Raises:
+    -------
+    ValueError
+        無効なタイムフレームが指定された場合
+    """
+    interval = TIMEFRAME_MS.get(timeframe)
+    if interval is None:
+        raise ValueError(
+            f"無効なタイムフレーム: {timeframe}。有効な値: {list(TIMEFRAME_MS.keys())}"
+        )
+    return interval
+
 
 def convert_to_jst(
     df_or_index: Union[pd.DataFrame, pd.Index], from_unit: str = "ms"
@@ -0,0 +1,144 @@
+import asyncio
+import inspect
+import time
+import unittest
+from unittest.mock import MagicMock
+
+import src.exchanges.async_my_exchange as sut
+from src.config.config import ExchangeConfig
+from src.exchanges.my_exchange import MyExchange
+
+LATENCY_SEC = 0.05
+
+
+class FakeAsyncExchange:
+    """各リクエストに一定の遅延を入れる偽取引所"""
+
+    id = "fake"
+    has = {"fetchPosition": True, "fetchBalance": True}
+
+    def __init__(self):
+        self.calls = []
+
+    async def _request(self, name):
+        self.calls.append(name)
+        await asyncio.sleep(LATENCY_SEC)
+
+    async def fetch_ohlcv(self, symbol, timeframe="1m", since=None, limit=None):
+        await self._request("fetch_ohlcv")
+        return [[0, 100.0, 101.0, 99.0, 100.5, 1.0]] * limit
+
+    async def fetch_position(self, symbol):
+        await self._request("fetch_position")
+        return {"contracts": 0.001, "side": "long"}
+
+    async def fetch_ticker(self, symbol):
+        await self._request("fetch_ticker")
+        return {"last": 100.5}
+
+    async def create_market_buy_order(self, symbol, amount, params=None):
+        await self._request("create_market_buy_order")
+        return {"side": "buy", "amount": amount}
+
+    async def create_market_sell_order(self, symbol, amount, params=None):
+        await self._request("create_market_sell_order")
+        return {"side": "sell", "amount": amount, "filled": amount, "status": "closed"}
+
+
+class TestAsyncMyExchange(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        config = ExchangeConfig(
+            name="fake",
+            api_key="",
+            api_secret="",
+            symbol="BTCUSDT",
+            position_size=0.001,
+            leverage=1,
+            buy_leverage=1,
+            sell_leverage=1,
+            margin_type="cross",
+            timeframe="1m",
+            max_position=1,
+            retry_count=0,
+            retry_interval=0,
+            testnet=False,
+            dry_run=False,
+            simulation_initial_balance=0,
+            fee_rate=0,
+        )
+        self.fake = FakeAsyncExchange()
+        self.exchange = sut.AsyncMyExchange(self.fake, config, MagicMock())
+
+    async def test_fetch_cycle_snapshot(self):
+        """OHLCV・ポジション・ティッカーが同時に取得されること"""
+        start = time.perf_counter()
+        snapshot = await self.exchange.fetch_cycle_snapshot("BTCUSDT", "1m")
+        elapsed = time.perf_counter() - start
+
+        self.assertLess(elapsed, LATENCY_SEC * 2)
+        self.assertEqual(len(snapshot.ohlcv), 2)
+        self.assertEqual(snapshot.position_size, 0.001)
+        self.assertEqual(snapshot.position_side, "long")
+        self.assertEqual(snapshot.last_price, 100.5)
+
+    async def test_place_order_with_snapshot(self):
+        """取得済みの情報を渡した場合はポジションを取得し直さずに注文すること"""
+        snapshot = await self.exchange.fetch_cycle_snapshot("BTCUSDT", "1m")
+        self.fake.calls.clear()
+
+        order = await self.exchange.place_order(
+            "BTCUSDT", "long", 0.001, snapshot=snapshot
+        )
+
+        self.assertEqual(order["side"], "buy")
+        self.assertEqual(self.fake.calls, ["create_market_buy_order"])
+
+    async def test_place_order_after_close_with_snapshot(self):
+        """決済後は同じsnapshotでも決済後のポジションで数量を制限すること(ドテン)"""
+        snapshot = await self.exchange.fetch_cycle_snapshot("BTCUSDT", "1m")
+        await self.exchange.close_all_position("BTCUSDT", snapshot=snapshot)
+        self.fake.calls.clear()
+
+        # 決済前のポジション(0.001)に加えるとmax_position(1)を超える数量
+        order = await self.exchange.place_order(
+            "BTCUSDT", "short", 1.0, snapshot=snapshot
+        )
+
+        self.assertEqual(order["side"], "sell")
+        self.assertEqual(self.fake.calls, ["create_market_sell_order"])
+
+    async def test_get_position_info_cached(self):
+        """2回目以降はMyExchangeと同じくキャッシュを返すこと"""
+        await self.exchange.get_position_info("BTCUSDT")
+        actual = await self.exchange.get_position_info("BTCUSDT")
+
+        self.assertEqual(actual, (0.001, "long"))
+        self.assertEqual(self.fake.calls, ["fetch_position"])
+
+
+class TestExchangeInterface(unittest.TestCase):
+    # 非同期版のみにあるメソッド
+    ASYNC_ONLY = {"close", "fetch_cycle_snapshot"}
+
+    @staticmethod
+    def _public_methods(cls) -> dict:
+        return {
+            name: inspect.signature(member)
+            for name, member in inspect.getmembers(cls, callable)
+            if not name.startswith("_")
+        }
+
+    def test_same_public_methods(self):
+        """AsyncMyExchangeがMyExchangeと同じ公開メソッドと引数を持つこと"""
+        sync_methods = self._public_methods(MyExchange)
+        async_methods = self._public_methods(sut.AsyncMyExchange)
+
+        self.assertEqual(set(async_methods) - set(sync_methods), self.ASYNC_ONLY)
+        for name, signature in sync_methods.items():
+            with self.subTest(name=name):
+                self.assertIn(name, async_methods)
+                # 非同期版は取得済みの情報(snapshot)を受け取る引数を追加できる
+                params = list(async_methods[name].parameters)
+                self.assertEqual(
+                    params[: len(signature.parameters)], list(signature.parameters)
+                )
@@ -0,0 +1,81 @@
+import unittest
+from unittest.mock import MagicMock
+
+import src.exchanges.my_exchange as sut
+from src.config.config import ExchangeConfig
+
+
+class TestExchangePositionCache(unittest.TestCase):
+    """ポジションのキャッシュのテスト(ccxtの取引所はモック)"""
+
+    def setUp(self):
+        self.config = ExchangeConfig(
+            name="bybit",
+            api_key="",
+            api_secret="",
+            symbol="BTCUSDT",
+            position_size=0.001,
+            leverage=2,
+            buy_leverage=2,
+            sell_leverage=2,
+            margin_type="isolated",
+            timeframe="1m",
+            max_position=1,
+            retry_count=3,
+            retry_interval=5,
+            testnet=False,
+            dry_run=False,
+            simulation_initial_balance=0,
+            fee_rate=0,
+        )
+        self.ccxt_exchange = MagicMock()
+        self.ccxt_exchange.has = {"fetchPosition": True}
+        self.ccxt_exchange.fetch_position.return_value = {
+            "contracts": 0,
+            "side": None,
+        }
+        self.exchange = sut.MyExchange(self.ccxt_exchange, self.config, MagicMock())
+
+    def test_get_position_info_cached(self):
+        """2回目以降はキャッシュを返し、取引所に問い合わせないこと"""
+        self.exchange.get_position_info("BTCUSDT")
+        actual = self.exchange.get_position_info("BTCUSDT")
+
+        self.assertEqual(actual, (0.0, None))
+        self.ccxt_exchange.fetch_position.assert_called_once()
+
+    def test_place_order_updates_cache(self):
+        """約定済みの注文結果でキャッシュが更新されること"""
+        self.ccxt_exchange.create_market_buy_order.return_value = {
+            "status": "closed",
+            "filled": 0.5,
+        }
+        self.exchange.place_order("BTCUSDT", "long", 0.5)
+
+        self.assertEqual(self.exchange.get_position_info("BTCUSDT"), (0.5, "long"))
+        self.ccxt_exchange.fetch_position.assert_called_once()
+
+    def test_place_order_unknown_fill_invalidates_cache(self):
+        """約定数量が不明な注文結果の場合はキャッシュが破棄されること"""
+        self.ccxt_exchange.create_market_sell_order.return_value = {"id": "1"}
+        self.exchange.place_order("BTCUSDT", "short", 0.5)
+        self.ccxt_exchange.fetch_position.return_value = {
+            "contracts": 0.5,
+            "side": "short",
+        }
+
+        self.assertEqual(self.exchange.get_position_info("BTCUSDT"), (0.5, "short"))
+        self.assertEqual(self.ccxt_exchange.fetch_position.call_count, 2)
+
+    def test_reconcile_position(self):
+        """同期間隔を過ぎている場合のみ取引所から取得し直すこと"""
+        self.exchange.get_position_info("BTCUSDT")
+        self.assertFalse(self.exchange.reconcile_position("BTCUSDT"))
+
+        self.config.position_sync_interval = 0
+        self.assertTrue(self.exchange.reconcile_position("BTCUSDT"))
+        self.assertEqual(self.ccxt_exchange.fetch_position.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
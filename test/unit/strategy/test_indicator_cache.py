@@ -0,0 +1,29 @@
+import unittest
+
+import pandas as pd
+
+from src.strategy.indicator_cache import IndicatorCache
+
+
+class TestIndicatorCache(unittest.TestCase):
+    def test_hit_and_eviction(self):
+        """同じキーでは再計算せず、上限を超えると最も古いものから破棄されること"""
+        cache = IndicatorCache(maxsize=2)
+        calls = []
+
+        def compute(key):
+            def _compute():
+                calls.append(key)
+                return pd.DataFrame({"value": [key]})
+
+            return _compute
+
+        first = cache.get_or_compute(1, compute(1))
+        self.assertIs(cache.get_or_compute(1, compute(1)), first)
+        cache.get_or_compute(2, compute(2))
+        cache.get_or_compute(3, compute(3))  # キー1が破棄される
+        cache.get_or_compute(1, compute(1))
+
+        self.assertEqual(calls, [1, 2, 3, 1])
+        self.assertEqual(len(cache), 2)
+        self.assertEqual((cache.hits, cache.misses), (1, 4))
@@ -0,0 +1,97 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from src.backtest import Backtester, ohlcv_to_frame
+from src.config.config import ExchangeConfig
+from src.ohlcv_store import OHLCVStore
+from src.strategy.sma_cross import SmaCross, random_walk_ohlcv
+
+
+def _exchange_config() -> ExchangeConfig:
+    return ExchangeConfig(
+        name="bybit",
+        api_key="",
+        api_secret="",
+        symbol="BTCUSDT",
+        position_size=0.01,
+        leverage=10,
+        buy_leverage=10,
+        sell_leverage=10,
+        margin_type="isolated",
+        timeframe="1m",
+        max_position=0.01,
+        retry_count=3,
+        retry_interval=1,
+        testnet=False,
+        dry_run=True,
+        simulation_initial_balance=500,
+        fee_rate=0.00055,
+    )
+
+
+class TestBacktester(unittest.TestCase):
+    def test_bulk_signals_match_per_bar_calls(self):
+        """まとめて判断した場合と、足ごとにshould_entry/should_exitを呼んだ場合が一致すること"""
+        ohlcv = random_walk_ohlcv(600)
+        bulk = Backtester(SmaCross(bulk=True), _exchange_config()).run(ohlcv)
+        per_bar = Backtester(SmaCross(bulk=False), _exchange_config()).run(ohlcv)
+
+        self.assertGreater(len(bulk.tracker.trades), 10)
+        self.assertEqual(list(bulk.tracker.trades), list(per_bar.tracker.trades))
+        self.assertEqual(bulk.tracker.get_summary(), per_bar.tracker.get_summary())
+        np.testing.assert_array_equal(bulk.equity, per_bar.equity)
+
+    def test_exit_uses_should_exit2(self):
+        """足ごとの決済判断はmain()と同じくshould_exitではなくshould_exit2を使うこと"""
+
+        class LiveExitOnly(SmaCross):
+            def should_exit(self, df):
+                return False
+
+            def should_exit2(self, df):
+                return SmaCross.should_exit(self, df)
+
+        ohlcv = random_walk_ohlcv(600)
+        expected = Backtester(SmaCross(bulk=False), _exchange_config()).run(ohlcv)
+        actual = Backtester(LiveExitOnly(bulk=False), _exchange_config()).run(ohlcv)
+
+        self.assertGreater(len(actual.tracker.trades), 10)
+        self.assertEqual(list(actual.tracker.trades), list(expected.tracker.trades))
+
+    def test_trades_and_equity(self):
+        """判断した足の終値で約定し、判断を始める前の足は評価しないこと"""
+        ohlcv = random_walk_ohlcv(300)
+        result = Backtester(SmaCross(bulk=True), _exchange_config()).run(ohlcv)
+        tracker = result.tracker
+        # 取引は判断した足の確定時刻(次の足の開始時刻)で記録される
+        closes = {row[0] + 60_000: row[4] for row in ohlcv}
+
+        self.assertEqual(result.bars, 280)
+        self.assertTrue(np.isnan(result.equity[:20]).all())
+        self.assertFalse(np.isnan(result.equity[20:]).any())
+        self.assertEqual(tracker.risk.bars, 280)
+        for trade in tracker.trades:
+            self.assertGreaterEqual(trade.timestamp, ohlcv[21][0])
+            self.assertEqual(trade.price, closes[trade.timestamp])
+            self.assertAlmostEqual(trade.fee, trade.price * 0.01 * 0.00055)
+        self.assertAlmostEqual(
+            result.equity[-1],
+            tracker.current_balance + tracker.unrealized_pnl(ohlcv[-1][4]),
+        )
+
+    def test_ohlcv_to_frame(self):
+        """OHLCVStoreの構造化配列とリストから同じDataFrameを作成すること"""
+        ohlcv = random_walk_ohlcv(5)
+        records = np.array([tuple(row) for row in ohlcv], dtype=OHLCVStore.RECORD_DTYPE)
+        df = ohlcv_to_frame(ohlcv)
+
+        pd.testing.assert_frame_equal(ohlcv_to_frame(records), df)
+        self.assertEqual(df.index.name, "timestamp")
+        self.assertEqual(list(df.columns), ["open", "high", "low", "close", "volume"])
+        self.assertEqual(df["close"].tolist(), [row[4] for row in ohlcv])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import io
+import unittest
+
+import pandas as pd
+
+from src.strategy.base_strategy import BaseStrategy
+from src.utils.chart_renderer import ChartRenderer, render_candles
+
+
+def _render_last_close(df):
+    """プロセスへ渡せるようモジュールレベルで定義した描画関数"""
+    return io.BytesIO(str(len(df)).encode()), str(df["close"].iloc[-1])
+
+
+def _render_type_error(df):
+    """描画中にエラーになる描画関数"""
+    raise TypeError("描画エラー")
+
+
+class TestChartRenderer(unittest.TestCase):
+    def setUp(self):
+        self.df = pd.DataFrame({"close": list(range(10))})
+
+    def test_should_render_every_n_bars(self):
+        """every_n_bars本ごとに(初回を含めて)作成すること"""
+        renderer = ChartRenderer(_render_last_close, every_n_bars=3)
+        results = [renderer.should_render() for _ in range(7)]
+        self.assertEqual(results, [True, False, False, True, False, False, True])
+
+    def test_max_bars(self):
+        """描画する足の本数がmax_barsに制限されること"""
+        renderer = ChartRenderer(_render_last_close, max_bars=4)
+        image, timestamp = renderer(self.df)
+        self.assertEqual(image.getvalue(), b"4")
+        self.assertEqual(timestamp, "9")
+
+        image, _ = ChartRenderer(_render_last_close)(self.df)
+        self.assertEqual(image.getvalue(), b"10")
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            ChartRenderer(_render_last_close, mode="gpu")
+        with self.assertRaises(ValueError):
+            ChartRenderer(_render_last_close, every_n_bars=0)
+
+    def test_process_mode(self):
+        """常駐プロセスで描画した結果が呼び出し元と同じ形式で返ること"""
+        renderer = ChartRenderer(_render_last_close, mode="process", max_bars=5)
+        try:
+            image, timestamp = renderer(self.df)
+        finally:
+            renderer.close()
+        self.assertIsInstance(image, io.BytesIO)
+        self.assertEqual((image.getvalue(), timestamp), (b"5", "9"))
+
+    def test_process_mode_falls_back_to_thread(self):
+        """描画関数をプロセスへ渡せない場合は作成時から呼び出し元で描画すること"""
+        renderer = ChartRenderer(lambda df: _render_last_close(df), mode="process")
+        self.assertEqual(renderer.mode, "thread")
+        self.assertIsNone(renderer._executor)
+        image, _ = renderer(self.df)
+        self.assertEqual(image.getvalue(), b"10")
+
+    def test_process_mode_render_error(self):
+        """描画関数内のエラーはそのまま送出し、描画用プロセスは止めないこと"""
+        renderer = ChartRenderer(_render_type_error, mode="process")
+        try:
+            with self.assertRaises(TypeError):
+                renderer(self.df)
+            self.assertIsNotNone(renderer._executor)
+        finally:
+            renderer.close()
+
+    def test_strategy_default_chart_is_picklable(self):
+        """ストラテジーの標準の描画(render_candles)は常駐プロセスに渡せること"""
+        self.assertIs(BaseStrategy.create_chart, render_candles)
+        renderer = ChartRenderer(BaseStrategy.create_chart, mode="process")
+        try:
+            self.assertEqual(renderer.mode, "process")
+            self.assertIsNotNone(renderer._executor)
+        finally:
+            renderer.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
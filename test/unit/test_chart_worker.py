@@ -0,0 +1,60 @@
+import io
+import threading
+import unittest
+from unittest.mock import MagicMock
+
+import pandas as pd
+
+from src.utils.chart_worker import ChartWorker
+
+
+class TestChartWorker(unittest.TestCase):
+    def test_submit_does_not_block_and_keeps_latest(self):
+        """作成中に渡されたスナップショットは最新のものだけが作成されること"""
+        release = threading.Event()
+        rendered = []
+
+        def render(df):
+            release.wait(timeout=5)
+            rendered.append(df["close"].iloc[-1])
+            return io.BytesIO(b"png"), str(df["close"].iloc[-1])
+
+        discord = MagicMock()
+        discord.send_image.return_value = True
+        worker = ChartWorker(render, discord)
+
+        worker.submit(pd.DataFrame({"close": [1]}))
+        # 1つ目の作成が始まるのを待ってから続けて依頼する
+        while not worker._busy:
+            pass
+        worker.submit(pd.DataFrame({"close": [2]}))
+        worker.submit(pd.DataFrame({"close": [3]}))
+        release.set()
+
+        self.assertTrue(worker.wait_idle(timeout=5))
+        worker.close(timeout=5)
+        self.assertEqual(rendered, [1, 3])
+        self.assertEqual((worker.rendered, worker.dropped), (2, 1))
+
+    def test_render_failure(self):
+        """作成に失敗しても例外が呼び出し元に伝わらず、次の依頼を処理できること"""
+        calls = []
+
+        def render(df):
+            calls.append(len(df))
+            if len(calls) == 1:
+                raise RuntimeError("render failed")
+            return io.BytesIO(b"png"), "ts"
+
+        discord = MagicMock()
+        discord.send_image.return_value = True
+        worker = ChartWorker(render, discord)
+
+        worker.submit(pd.DataFrame({"close": [1]}))
+        self.assertTrue(worker.wait_idle(timeout=5))
+        worker.submit(pd.DataFrame({"close": [1, 2]}))
+        self.assertTrue(worker.wait_idle(timeout=5))
+        worker.close(timeout=5)
+
+        self.assertEqual(calls, [1, 2])
+        self.assertEqual((worker.rendered, worker.failed), (1, 1))
@@ -0,0 +1,78 @@
+import math
+import unittest
+
+from src.utils.clock_sync import ClockSync
+from src.utils.time_utils import Clock
+
+TRUE_OFFSET_MS = 1500.0
+
+
+class FakeClock(Clock):
+    """sleepや呼び出し側の操作で時刻が進むだけの偽の時計"""
+
+    def __init__(self, now: float = 1709683200.0):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += max(seconds, 0)
+
+
+class FakeServer:
+    """
+    (行き, 帰り)の片道時間(秒)のリストに従って時間を進め、サーバー時刻を返す偽のfetch_time
+    """
+
+    def __init__(self, clock: FakeClock, legs: list[tuple[float, float]]):
+        self.clock = clock
+        self.legs = list(legs)
+
+    def __call__(self) -> int:
+        up, down = self.legs.pop(0)
+        self.clock.now += up
+        server_time = self.clock.now * 1000 + TRUE_OFFSET_MS
+        self.clock.now += down
+        return server_time
+
+
+class TestClockSync(unittest.TestCase):
+    def test_sync_filters_outliers(self):
+        """RTTが大きく片道時間が偏ったサンプルを除外してオフセットを推定すること"""
+        clock = FakeClock()
+        legs = [
+            (0.010, 0.010),
+            (0.300, 0.020),  # 行きだけ遅い外れ値
+            (0.011, 0.011),
+            (0.020, 0.400),  # 帰りだけ遅い外れ値
+            (0.012, 0.012),
+        ]
+        clock_sync = ClockSync(FakeServer(clock, legs), clock=clock, samples=5)
+
+        offset = clock_sync.sync()
+
+        self.assertAlmostEqual(offset, TRUE_OFFSET_MS, places=3)
+        self.assertAlmostEqual(clock_sync.rtt_ms, 20.0, places=3)
+        self.assertAlmostEqual(clock_sync.jitter_ms, 0.0, places=3)
+        self.assertEqual(clock_sync.last_sync_age, 0.0)
+        self.assertAlmostEqual(
+            clock_sync.server_time_ms(), clock.now * 1000 + TRUE_OFFSET_MS, places=3
+        )
+
+    def test_maybe_refresh(self):
+        """前回の同期からrefresh_interval秒以上経過した場合のみ再同期すること"""
+        clock = FakeClock()
+        server = FakeServer(clock, [(0.01, 0.01)] * 2)
+        clock_sync = ClockSync(server, clock=clock, samples=1, refresh_interval=60)
+        self.assertEqual(clock_sync.last_sync_age, math.inf)
+
+        self.assertTrue(clock_sync.maybe_refresh())
+        clock.sleep(30)
+        self.assertFalse(clock_sync.maybe_refresh())
+        clock.sleep(30)
+        self.assertTrue(clock_sync.maybe_refresh())
+        self.assertEqual(server.legs, [])
@@ -0,0 +1,186 @@
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+
+from src.config.config import DiscordConfig
+from src.utils.discord import (
+    PRIORITY_DEBUG,
+    PRIORITY_NORMAL,
+    PRIORITY_URGENT,
+    DiscordDispatcher,
+    DiscordNotifier,
+)
+
+
+class BlockingSender:
+    """最初の送信をreleaseまで止め、受け取ったペイロードを記録する"""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.started = threading.Event()
+        self.payloads = []
+
+    def __call__(self, payload):
+        self.started.set()
+        self.release.wait(timeout=5)
+        self.payloads.append(payload)
+        return True
+
+
+def _embed(title):
+    return {"title": title, "description": title, "color": 0}
+
+
+class TestDiscordDispatcher(unittest.TestCase):
+    def test_coalesce_and_priority(self):
+        """送信中に溜まった通知が優先度順に1つのペイロードにまとめられること"""
+        sender = BlockingSender()
+        dispatcher = DiscordDispatcher(sender)
+
+        dispatcher.put(embed=_embed("first"))
+        sender.started.wait(timeout=5)
+        dispatcher.put(embed=_embed("debug"), priority=PRIORITY_DEBUG)
+        dispatcher.put(embed=_embed("info"), priority=PRIORITY_NORMAL)
+        dispatcher.put(embed=_embed("fill"), priority=PRIORITY_URGENT)
+        sender.release.set()
+
+        self.assertTrue(dispatcher.flush(timeout=5))
+        dispatcher.close()
+        self.assertEqual(len(sender.payloads), 2)
+        self.assertEqual(
+            [embed["title"] for embed in sender.payloads[1]["embeds"]],
+            ["fill", "info", "debug"],
+        )
+        self.assertEqual((dispatcher.sent, dispatcher.requests), (4, 2))
+
+    def test_mention_followed_by_embed(self):
+        """テキストの後に続くembedは同じメッセージにまとめ、その後のテキストは分けること"""
+        sender = BlockingSender()
+        dispatcher = DiscordDispatcher(sender)
+
+        dispatcher.put(content="start")
+        sender.started.wait(timeout=5)
+        dispatcher.put(content="<@1>", priority=PRIORITY_URGENT)
+        dispatcher.put(embed=_embed("fill"), priority=PRIORITY_URGENT)
+        dispatcher.put(content="next")
+        sender.release.set()
+
+        dispatcher.close()
+        self.assertEqual(
+            sender.payloads[1:],
+            [
+                {"content": "<@1>", "embeds": [_embed("fill")]},
+                {"content": "next", "embeds": None},
+            ],
+        )
+
+    def test_max_embeds(self):
+        """1つのペイロードのembedは10個までであること"""
+        sender = BlockingSender()
+        dispatcher = DiscordDispatcher(sender)
+
+        dispatcher.put(content="start")
+        sender.started.wait(timeout=5)
+        for i in range(12):
+            dispatcher.put(embed=_embed(str(i)))
+        sender.release.set()
+
+        dispatcher.close()
+        self.assertEqual(
+            [len(payload["embeds"] or []) for payload in sender.payloads], [0, 10, 2]
+        )
+
+    def test_bounded_queue_drops_lowest_priority(self):
+        """キューが一杯の場合は優先度の低い通知から捨てること"""
+        sender = BlockingSender()
+        dispatcher = DiscordDispatcher(sender, maxsize=2)
+
+        dispatcher.put(content="start")
+        sender.started.wait(timeout=5)
+        self.assertTrue(dispatcher.put(embed=_embed("a")))
+        self.assertTrue(dispatcher.put(embed=_embed("b")))
+        # 緊急の通知は通常の通知を押し出して追加される
+        self.assertTrue(dispatcher.put(embed=_embed("error"), priority=PRIORITY_URGENT))
+        # デバッグの通知は追加されない
+        self.assertFalse(dispatcher.put(embed=_embed("debug"), priority=PRIORITY_DEBUG))
+        self.assertEqual(dispatcher.dropped, 2)
+        sender.release.set()
+
+        dispatcher.close()
+        self.assertEqual(
+            [embed["title"] for embed in sender.payloads[1]["embeds"]], ["error", "a"]
+        )
+
+    def test_close_flushes_pending(self):
+        """close()で送信待ちの通知がすべて送信され、以降は追加できないこと"""
+        sender = BlockingSender()
+        sender.release.set()
+        dispatcher = DiscordDispatcher(sender)
+        for i in range(3):
+            dispatcher.put(content=str(i))
+
+        dispatcher.close()
+        self.assertEqual(dispatcher.sent, 3)
+        self.assertEqual(dispatcher.qsize(), 0)
+        self.assertFalse(dispatcher.put(content="after close"))
+
+
+class TestDiscordNotifier(unittest.TestCase):
+    @staticmethod
+    def _response(status_code, headers=None):
+        response = MagicMock()
+        response.status_code = status_code
+        response.headers = headers or {}
+        return response
+
+    def test_retry_after_429(self):
+        """429の場合はRetry-Afterだけ待って再送すること"""
+        notifier = DiscordNotifier("https://example.com/webhook", "1")
+        with patch.object(notifier._session, "post") as mock_post:
+            mock_post.side_effect = [
+                self._response(429, {"Retry-After": "0.01"}),
+                self._response(204),
+            ]
+            self.assertTrue(notifier.send_message("message", title="title"))
+
+        self.assertEqual(mock_post.call_count, 2)
+        # タイムアウトを指定して送信すること
+        self.assertEqual(mock_post.call_args.kwargs["timeout"], (3.0, 10.0))
+        self.assertEqual(notifier.latency_summary()["count"], 2)
+
+    def test_asynchronous_send(self):
+        """バックグラウンド送信時はキューに入れてすぐに戻り、flushで送信されること"""
+        notifier = DiscordNotifier(
+            "https://example.com/webhook", "1", asynchronous=True
+        )
+        with patch.object(notifier._session, "post") as mock_post:
+            mock_post.return_value = self._response(204)
+            self.assertTrue(notifier.send_message("message", title="title"))
+            self.assertTrue(notifier.flush(timeout=5))
+            notifier.close()
+
+        self.assertEqual(mock_post.call_count, 1)
+        self.assertIsNone(notifier.dispatcher)
+
+    def test_from_config_shares_instance(self):
+        """同じWebhookに対してはfrom_configが同じインスタンスを返すこと"""
+        config = DiscordConfig(
+            webhook_url="https://example.com/shared",
+            mention_user_id="1",
+            async_dispatch=False,
+        )
+        other = DiscordConfig(
+            webhook_url="https://example.com/other",
+            mention_user_id="1",
+            async_dispatch=False,
+        )
+        try:
+            notifier = DiscordNotifier.from_config(config)
+            self.assertIs(DiscordNotifier.from_config(config), notifier)
+            self.assertIsNot(DiscordNotifier.from_config(other), notifier)
+        finally:
+            DiscordNotifier._shared.clear()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+from src.historical_data import HistoricalData
+from src.ohlcv_store import OHLCVStore
+
+
+def _bar(i: int, close: float = None) -> list:
+    """テスト用の1本分のデータ"""
+    close = 100.5 + i if close is None else close
+    return [1709692800000 + i * 60000, 100 + i, 101 + i, 99 + i, close, 10 * i]
+
+
+class TestHistoricalData(unittest.TestCase):
+    def setUp(self):
+        self.historical_data = HistoricalData(
+            3, [_bar(i) for i in range(3)], MagicMock()
+        )
+
+    def test_update_append(self):
+        """新しい足は追加され、保持数を超えた古い足は捨てられること"""
+        self.historical_data.update(_bar(3))
+
+        df = self.historical_data.data
+        self.assertEqual(len(df), 3)
+        self.assertEqual(df["close"].tolist(), [_bar(i)[4] for i in range(1, 4)])
+
+    def test_update_same_timestamp(self):
+        """同じ時刻の足は置き換えられること"""
+        self.historical_data.update(_bar(2, close=999.0))
+
+        df = self.historical_data.data
+        self.assertEqual(len(df), 3)
+        self.assertEqual(df["close"].iloc[-1], 999.0)
+
+    def test_token(self):
+        """データが変わった場合のみトークンとDataFrameが変わること"""
+        token = self.historical_data.token
+        df = self.historical_data.data
+
+        # 同じ足の再取得ではトークンもDataFrameも変わらない
+        self.historical_data.update(_bar(2))
+        self.assertEqual(self.historical_data.token, token)
+        self.assertIs(self.historical_data.data, df)
+
+        self.historical_data.update(_bar(3))
+        self.assertNotEqual(self.historical_data.token, token)
+        self.assertEqual(self.historical_data.token[0], _bar(3)[0])
+        self.assertIsNot(self.historical_data.data, df)
+
+    def test_update_backfill_gap(self):
+        """欠損した足を1回のリクエストでまとめて補完すること"""
+        exchange = MagicMock()
+        exchange.fetch_ohlcv.return_value = [_bar(i) for i in range(3, 6)]
+        historical_data = HistoricalData(
+            10,
+            [_bar(i) for i in range(3)],
+            MagicMock(),
+            exchange=exchange,
+            symbol="BTCUSDT",
+            timeframe="1m",
+        )
+
+        repaired = historical_data.update(_bar(6))
+
+        self.assertEqual(repaired, 3)
+        exchange.fetch_ohlcv.assert_called_once_with(
+            "BTCUSDT", timeframe="1m", since=_bar(3)[0], limit=3
+        )
+        self.assertEqual(
+            historical_data.data["close"].tolist(), [_bar(i)[4] for i in range(7)]
+        )
+
+    def test_update_no_gap(self):
+        """欠損がない場合は取引所に問い合わせないこと"""
+        exchange = MagicMock()
+        historical_data = HistoricalData(
+            10,
+            [_bar(i) for i in range(3)],
+            MagicMock(),
+            exchange=exchange,
+            symbol="BTCUSDT",
+            timeframe="1m",
+        )
+
+        self.assertEqual(historical_data.update(_bar(3)), 0)
+        exchange.fetch_ohlcv.assert_not_called()
+
+    def test_update_backfill_gap_longer_than_num_bars(self):
+        """保持数を超える欠損でも、ストアには欠損分をすべて補完すること"""
+
+        def fetch_ohlcv(symbol, timeframe=None, since=None, limit=None):
+            first = (since - _bar(0)[0]) // 60000
+            return [_bar(i) for i in range(first, min(first + limit, 10))]
+
+        exchange = MagicMock()
+        exchange.rateLimit = 0
+        exchange.fetch_ohlcv.side_effect = fetch_ohlcv
+        with tempfile.TemporaryDirectory() as directory:
+            store = OHLCVStore.open(directory, "bybit", "BTCUSDT", "1m")
+            store.append([_bar(i) for i in range(3)])
+            historical_data = HistoricalData(
+                3,
+                [_bar(i) for i in range(3)],
+                MagicMock(),
+                store=store,
+                exchange=exchange,
+                symbol="BTCUSDT",
+                timeframe="1m",
+            )
+
+            repaired = historical_data.update(_bar(10))
+
+            self.assertEqual(repaired, 7)
+            self.assertEqual(store.load(), [_bar(i) for i in range(11)])
+            self.assertEqual(
+                historical_data.data["close"].tolist(),
+                [_bar(i)[4] for i in range(8, 11)],
+            )
@@ -1,8 +1,14 @@
 import unittest
 
+import numpy as np
 import pandas as pd
 
-from src.indicators import calculate_rci
+from src.indicators import (
+    StreamingRCI,
+    _calculate_rci_loop,
+    calculate_rci,
+    calculate_rci_multi,
+)
 
 
 class TestIndicators(unittest.TestCase):
@@ -33,3 +39,86 @@ class TestIndicators(unittest.TestCase):
 
         actual = calculate_rci(test_data, period)
         self.assertEqual(actual, expected)
+
+    def test_calculate_rci_matches_loop(self):
+        """ベクトル化したRCIが従来のループ実装と一致すること(同値を含む)"""
+        rng = np.random.default_rng(0)
+        # 丸めて同値を多く発生させる
+        close = np.round(rng.normal(100, 1, 500), 1)
+        test_data = pd.DataFrame({"close": close})
+
+        for period in (2, 5, 9, 26):
+            expected = _calculate_rci_loop(test_data, period)
+            actual = calculate_rci(test_data, period)
+            pd.testing.assert_series_equal(actual, expected)
+
+    def test_calculate_rci_matches_loop_with_nan(self):
+        """窓にNaNを含む場合もループ実装と一致すること(calculate_rci_multiも同じ)"""
+        test_data = pd.DataFrame({"close": [1, 2, np.nan, 4, 5, 3, 3, 2]})
+        np.testing.assert_array_equal(
+            calculate_rci(test_data, 3).iloc[3:5], [75.0, 50.0]
+        )
+
+        rng = np.random.default_rng(1)
+        close = np.round(rng.normal(100, 1, 300), 1)
+        close[rng.choice(300, 30, replace=False)] = np.nan
+        close[100:110] = np.nan  # 全てNaNの窓
+        test_data = pd.DataFrame({"close": close})
+
+        periods = [3, 5, 9]
+        multi = calculate_rci_multi(test_data, periods)
+        for period in periods:
+            expected = _calculate_rci_loop(test_data, period)
+            pd.testing.assert_series_equal(calculate_rci(test_data, period), expected)
+            np.testing.assert_allclose(multi[period], expected)
+
+    def test_calculate_rci_short_data(self):
+        """データ数が期間未満の場合は全てNaNになること"""
+        test_data = pd.DataFrame({"close": [500, 510, 515]})
+
+        actual = calculate_rci(test_data, 5)
+        self.assertEqual(len(actual), 3)
+        self.assertTrue(actual.isna().all())
+
+    def test_calculate_rci_multi(self):
+        """複数期間の一括計算が期間ごとのcalculate_rciと一致すること"""
+        rng = np.random.default_rng(1)
+        close = np.round(rng.normal(100, 1, 300), 1)
+        test_data = pd.DataFrame({"close": close})
+        periods = [9, 26, 52]
+
+        actual = calculate_rci_multi(test_data, periods)
+
+        self.assertEqual(list(actual.columns), periods)
+        for period in periods:
+            pd.testing.assert_series_equal(
+                actual[period],
+                calculate_rci(test_data, period),
+                check_names=False,
+            )
+
+    def test_streaming_rci_matches_calculate_rci(self):
+        """逐次計算したRCIがcalculate_rciと一致すること(同値を含む)"""
+        rng = np.random.default_rng(2)
+        close = np.round(rng.normal(100, 1, 500), 0)
+        test_data = pd.DataFrame({"close": close})
+
+        for period in (2, 9, 26):
+            streaming = StreamingRCI(period)
+            actual = [streaming.update(value) for value in close]
+            expected = calculate_rci(test_data, period)
+            np.testing.assert_array_equal(np.array(actual), expected.to_numpy())
+
+    def test_streaming_rci_replace_last(self):
+        """最新足の置き換え後もcalculate_rciと一致すること"""
+        close = [500, 510, 515, 520, 530, 525]
+        streaming = StreamingRCI(5)
+        for value in close:
+            streaming.update(value)
+
+        # 最新足を更新
+        close[-1] = 505
+        actual = streaming.replace_last(505)
+
+        expected = calculate_rci(pd.DataFrame({"close": close}), 5).iloc[-1]
+        self.assertEqual(actual, expected)
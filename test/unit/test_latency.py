@@ -0,0 +1,87 @@
+import logging
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+
+from src.utils.latency import LatencyHistogram, LatencyRecorder
+
+
+class TestLatencyHistogram(unittest.TestCase):
+    def test_percentiles(self):
+        histogram = LatencyHistogram()
+        for value in range(1, 101):
+            histogram.record(float(value))
+
+        self.assertEqual(
+            histogram.summary(),
+            {
+                "count": 100,
+                "sum": 5050.0,
+                "p50": 50.0,
+                "p95": 95.0,
+                "p99": 99.0,
+                "max": 100.0,
+            },
+        )
+
+    def test_window(self):
+        """集計は直近window件で行い、countは総数であること"""
+        histogram = LatencyHistogram(window=3)
+        for value in [100.0, 1.0, 2.0, 3.0]:
+            histogram.record(value)
+
+        summary = histogram.summary()
+        self.assertEqual(summary["count"], 4)
+        self.assertEqual(summary["max"], 3.0)
+        self.assertEqual(summary["p50"], 2.0)
+
+    def test_empty(self):
+        self.assertEqual(LatencyHistogram().summary(), {"count": 0})
+
+
+class TestLatencyRecorder(unittest.TestCase):
+    def test_timer(self):
+        recorder = LatencyRecorder()
+        with patch("src.utils.latency.time.perf_counter", side_effect=[1.0, 1.25]):
+            with recorder.timer("stage"):
+                pass
+
+        self.assertEqual(recorder.summary("stage")["max"], 250.0)
+        self.assertEqual(recorder.summary("unknown"), {"count": 0})
+
+    def test_timer_records_on_exception(self):
+        """例外が発生しても所要時間を記録すること"""
+        recorder = LatencyRecorder()
+        with self.assertRaises(ValueError):
+            with recorder.timer("stage"):
+                raise ValueError
+
+        self.assertEqual(recorder.summary()["stage"]["count"], 1)
+
+    def test_concurrent_record(self):
+        recorder = LatencyRecorder()
+
+        def worker():
+            for _ in range(1000):
+                recorder.record("stage", 1.0)
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(recorder.summary("stage")["count"], 4000)
+
+    def test_maybe_log(self):
+        recorder = LatencyRecorder()
+        recorder.record("stage", 12.5)
+        logger = MagicMock(spec=logging.Logger)
+
+        self.assertFalse(recorder.maybe_log(logger, interval=3600))
+        self.assertTrue(recorder.maybe_log(logger, interval=0))
+        self.assertIn("stage: n=1 p50=12.5ms", logger.info.call_args.args[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
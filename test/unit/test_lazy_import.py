@@ -0,0 +1,35 @@
+import sys
+import unittest
+
+from src.utils.lazy_import import LazyModule, lazy_import
+
+
+class TestLazyImport(unittest.TestCase):
+    def test_import_on_first_access(self):
+        """属性に初めてアクセスした時点でモジュールを読み込むこと"""
+        sys.modules.pop("colorsys", None)
+        module = lazy_import("colorsys")
+
+        self.assertIsInstance(module, LazyModule)
+        self.assertFalse(module.is_loaded)
+        self.assertNotIn("colorsys", sys.modules)
+
+        self.assertEqual(module.rgb_to_hsv(1.0, 0.0, 0.0), (0.0, 1.0, 1.0))
+        self.assertTrue(module.is_loaded)
+        self.assertIn("colorsys", sys.modules)
+
+    def test_already_loaded(self):
+        """読み込み済みのモジュールはそのまま返すこと"""
+        import json
+
+        self.assertIs(lazy_import("json"), json)
+
+    def test_missing_module(self):
+        """存在しないモジュールは使うときにImportErrorになること"""
+        module = lazy_import("no_such_module_for_test")
+        with self.assertRaises(ImportError):
+            module.anything
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+import io
+import json
+import logging
+import logging.handlers
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from src.config.config import Config, LoggingConfig
+from src.utils import logger as sut
+
+
+class TestLogger(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.log_file = os.path.join(self.tmpdir.name, "test.log")
+        # 他のテストと共有しないよう、別名のロガーと初期化前の状態で検証する
+        patches = [
+            patch.object(sut, "LOGGER_NAME", f"test_logger_{id(self)}"),
+            patch.object(sut.Logger, "_instance", None),
+            patch.object(sut.Logger, "_configured", False),
+            patch.object(sut.Logger, "_listener", None),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    def tearDown(self):
+        sut.Logger.shutdown()
+        sut.Logger.set_cycle_id(None)
+        logger = logging.getLogger(sut.LOGGER_NAME)
+        for handler in logger.handlers:
+            handler.close()
+        logger.handlers = []
+        self.tmpdir.cleanup()
+
+    def test_get_logger_does_not_load_config(self):
+        """取得しただけでは設定ファイルを読み込まないこと"""
+        with patch.object(Config, "shared") as mock_shared:
+            sut.Logger.get_logger()
+        mock_shared.assert_not_called()
+
+    def test_log_before_configure(self):
+        """初期化前のログは設定を読み込まず、ファイルも作成しないこと(WARNING以上は標準エラー)"""
+        logger = sut.Logger.get_logger()
+        with (
+            patch.object(Config, "shared") as mock_shared,
+            patch("sys.stderr", new_callable=io.StringIO) as stderr,
+        ):
+            mock_shared.return_value.logging = LoggingConfig(
+                level="INFO", file=self.log_file, use_queue=False
+            )
+            logger.info("info")
+            logger.warning("warning")
+
+        mock_shared.assert_not_called()
+        self.assertFalse(os.path.exists(self.log_file))
+        self.assertEqual(stderr.getvalue(), "warning\n")
+
+    def test_configure(self):
+        """configureで初期化した場合は共有の設定を読み込まないこと"""
+        config = LoggingConfig(level="DEBUG", file=self.log_file, use_queue=False)
+        with patch.object(Config, "shared") as mock_shared:
+            logger = sut.Logger.configure(config)
+            logger.debug("message")
+            # 2回目以降は何もしない
+            sut.Logger.configure(LoggingConfig(level="ERROR", file=self.log_file))
+
+        mock_shared.assert_not_called()
+        self.assertEqual(logger.level, logging.DEBUG)
+        self.assertEqual(len(logger.handlers), 2)
+
+    def test_queue_json_with_cycle_id(self):
+        """キュー経由でJSON形式のログがサイクルID付きで書き込まれること"""
+        config = LoggingConfig(level="INFO", file=self.log_file, format="json")
+        logger = sut.Logger.configure(config)
+        self.assertIsInstance(logger.handlers[0], logging.handlers.QueueHandler)
+
+        sut.Logger.set_cycle_id("abc123")
+        logger.info("注文")
+        sut.Logger.set_cycle_id(None)
+        logger.warning("待機")
+        sut.Logger.shutdown()  # キューに残っているログを書き込む
+
+        with open(self.log_file, encoding="utf-8") as f:
+            entries = [json.loads(line) for line in f]
+        self.assertEqual(
+            [(e["level"], e["message"], e["cycle_id"]) for e in entries],
+            [("INFO", "注文", "abc123"), ("WARNING", "待機", None)],
+        )
+
+    def test_size_rotation(self):
+        """rotation="size"の場合はmax_bytesを超えるとファイルを切り替えること"""
+        config = LoggingConfig(
+            level="INFO",
+            file=self.log_file,
+            use_queue=False,
+            max_bytes=200,
+            backup_count=2,
+        )
+        logger = sut.Logger.configure(config)
+        for i in range(20):
+            logger.info(f"message {i}")
+
+        self.assertTrue(os.path.exists(self.log_file + ".1"))
+        self.assertTrue(os.path.exists(self.log_file + ".2"))
+        self.assertFalse(os.path.exists(self.log_file + ".3"))
+        self.assertLessEqual(os.path.getsize(self.log_file), 200)
+
+    def test_invalid_rotation(self):
+        config = LoggingConfig(level="INFO", file=self.log_file, rotation="weekly")
+        with self.assertRaises(ValueError):
+            sut.Logger.configure(config)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import logging
+import unittest
+import urllib.request
+
+from src.utils.latency import LatencyRecorder
+from src.utils.metrics import LogCountHandler, MetricsRegistry, MetricsServer
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    def setUp(self):
+        self.recorder = LatencyRecorder()
+        self.registry = MetricsRegistry(self.recorder)
+
+    def test_counter(self):
+        self.registry.inc("exchange_errors_total", method="fetch_ohlcv")
+        self.registry.inc("exchange_errors_total", method="fetch_ohlcv")
+        self.registry.inc("exchange_errors_total", help="エラー数", method="fetch_time")
+
+        lines = self.registry.render().splitlines()
+        self.assertIn("# TYPE crptb2_exchange_errors_total counter", lines)
+        self.assertIn('crptb2_exchange_errors_total{method="fetch_ohlcv"} 2', lines)
+        self.assertIn('crptb2_exchange_errors_total{method="fetch_time"} 1', lines)
+
+    def test_gauge(self):
+        values = {"bars": 10}
+        self.registry.gauge("historical_data_bars", lambda: values["bars"])
+        self.registry.gauge("missing", lambda: None)
+        self.registry.gauge("broken", lambda: 1 / 0)
+
+        values["bars"] = 11  # 参照時の値を出力すること
+        output = self.registry.render()
+        self.assertIn("crptb2_historical_data_bars 11.0", output)
+        self.assertIn("crptb2_process_resident_memory_bytes", output)
+        self.assertNotIn("crptb2_missing", output)
+        self.assertNotIn("crptb2_broken", output)
+
+    def test_latency_summary(self):
+        for value in (1.0, 2.0, 3.0):
+            self.recorder.record("exchange.fetch_ohlcv", value)
+
+        lines = self.registry.render().splitlines()
+        self.assertIn("# TYPE crptb2_latency_milliseconds summary", lines)
+        self.assertIn(
+            'crptb2_latency_milliseconds{stage="exchange.fetch_ohlcv",quantile="0.50"} 2.0',
+            lines,
+        )
+        self.assertIn(
+            'crptb2_latency_milliseconds_count{stage="exchange.fetch_ohlcv"} 3', lines
+        )
+        self.assertIn(
+            'crptb2_latency_milliseconds_sum{stage="exchange.fetch_ohlcv"} 6.0', lines
+        )
+
+    def test_log_count_handler(self):
+        logger = logging.getLogger("test_metrics")
+        logger.propagate = False
+        handler = LogCountHandler(self.registry)
+        logger.addHandler(handler)
+        try:
+            logger.error("error")
+            logger.warning("warning")
+            logger.error("error")
+        finally:
+            logger.removeHandler(handler)
+
+        output = self.registry.render()
+        self.assertIn('crptb2_log_messages_total{level="error"} 2', output)
+        self.assertIn('crptb2_log_messages_total{level="warning"} 1', output)
+
+
+class TestMetricsServer(unittest.TestCase):
+    def test_serve_metrics(self):
+        registry = MetricsRegistry(LatencyRecorder())
+        registry.gauge("trades", lambda: 3)
+        server = MetricsServer(registry, port=0).start()
+        try:
+            host, port = server.address
+            with urllib.request.urlopen(f"http://{host}:{port}/metrics") as response:
+                body = response.read().decode()
+                content_type = response.headers["Content-Type"]
+        finally:
+            server.close()
+
+        self.assertIn("crptb2_trades 3.0", body)
+        self.assertTrue(content_type.startswith("text/plain; version=0.0.4"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+
+import numpy as np
+
+from src.ohlcv_buffer import OHLCVRingBuffer
+
+
+def _bar(i: int) -> list:
+    """テスト用の1本分のデータ"""
+    return [1709692800000 + i * 60000, 100 + i, 101 + i, 99 + i, 100.5 + i, 10 * i]
+
+
+class TestOHLCVRingBuffer(unittest.TestCase):
+    def test_append_wraparound(self):
+        """容量を超えて追加すると古い足から捨てられ、古い順に取り出せること"""
+        buffer = OHLCVRingBuffer(3)
+        for i in range(5):
+            buffer.append(_bar(i))
+
+        self.assertEqual(len(buffer), 3)
+        self.assertEqual(buffer.last_timestamp, _bar(4)[0])
+        np.testing.assert_array_equal(
+            buffer.timestamps(), [_bar(i)[0] for i in range(2, 5)]
+        )
+        np.testing.assert_array_equal(
+            buffer.column("close"), [_bar(i)[4] for i in range(2, 5)]
+        )
+
+    def test_replace_last(self):
+        """最新足の置き換えで件数が変わらず、値だけ更新されること"""
+        buffer = OHLCVRingBuffer(3)
+        buffer.extend([_bar(i) for i in range(4)])
+
+        updated = _bar(3)
+        updated[4] = 999.0
+        buffer.replace_last(updated)
+
+        self.assertEqual(len(buffer), 3)
+        self.assertEqual(buffer.column("close")[-1], 999.0)
+
+    def test_to_frame(self):
+        """DataFrameの内容とインデックス(日本時間)が正しいこと"""
+        buffer = OHLCVRingBuffer(2)
+        buffer.extend([_bar(i) for i in range(3)])
+
+        df = buffer.to_frame()
+
+        self.assertEqual(list(df.columns), OHLCVRingBuffer.VALUE_COLUMNS)
+        self.assertEqual(str(df.index.tz), "Asia/Tokyo")
+        self.assertEqual(df.index.name, "timestamp")
+        self.assertEqual(df["close"].tolist(), [_bar(1)[4], _bar(2)[4]])
+
+    def test_to_frame_view_and_copy(self):
+        """copy=Falseはバッファと値を共有し、copy=Trueは独立していること"""
+        buffer = OHLCVRingBuffer(3)
+        buffer.extend([_bar(i) for i in range(2)])
+
+        view = buffer.to_frame()
+        copied = buffer.to_frame(copy=True)
+        updated = _bar(1)
+        updated[4] = 999.0
+        buffer.replace_last(updated)
+
+        self.assertEqual(view["close"].iloc[-1], 999.0)
+        self.assertEqual(copied["close"].iloc[-1], _bar(1)[4])
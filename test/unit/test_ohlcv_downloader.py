@@ -0,0 +1,115 @@
+import tempfile
+import threading
+import unittest
+
+from src.ohlcv_downloader import BulkOHLCVDownloader
+from src.ohlcv_store import OHLCVStore
+from src.utils.logger import LOGGER_NAME
+
+INTERVAL = 60000  # 1m
+START = 1709683200000  # 2024-03-06 00:00:00 UTC
+
+
+class FakeExchange:
+    """
+    合成したローソク足を返すccxt取引所の代わり
+
+    - 1回の応答は最大max_per_request本(要求より少ない場合がある)
+    - 要求した時刻の1本前の足も含めて返す(ページ間の重複の確認用)
+    - missingに含まれる時刻の足は返さない
+    """
+
+    rateLimit = 0
+
+    def __init__(self, max_per_request: int = 200, missing: set = frozenset()):
+        self.max_per_request = max_per_request
+        self.missing = missing
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def fetch_ohlcv(self, symbol, timeframe="1m", since=None, limit=None):
+        with self._lock:
+            self.calls.append((since, limit))
+        count = min(limit, self.max_per_request)
+        first = since - INTERVAL
+        return [
+            [ts, 100.0, 101.0, 99.0, float(ts // INTERVAL % 1000), 1.0]
+            for ts in range(first, since + count * INTERVAL, INTERVAL)
+            if ts not in self.missing
+        ]
+
+
+class TestBulkOHLCVDownloader(unittest.TestCase):
+    def test_download_on_rows(self):
+        """ページ分割して並行取得した足が、古い順・重複なしで渡されること"""
+        exchange = FakeExchange(max_per_request=70)
+        downloader = BulkOHLCVDownloader(
+            exchange, "BTCUSDT", "1m", page_limit=100, max_workers=4
+        )
+        until = START + 1050 * INTERVAL
+        received = []
+
+        written = downloader.download(START, until, on_rows=received.extend)
+
+        self.assertEqual(written, 1050)
+        self.assertEqual(
+            [row[0] for row in received],
+            list(range(START, until, INTERVAL)),
+        )
+        # 11ページ、各ページは取引所の上限(70本)により2回に分けて取得される
+        self.assertEqual(len(downloader.pages(START, until)), 11)
+        self.assertEqual(len(exchange.calls), 21)
+
+    def test_download_missing_bars(self):
+        """取引所にない足は飛ばして続きを取得すること"""
+        missing = {START + 10 * INTERVAL, START + 11 * INTERVAL}
+        exchange = FakeExchange(missing=missing)
+        downloader = BulkOHLCVDownloader(exchange, "BTCUSDT", "1m", page_limit=50)
+        until = START + 100 * INTERVAL
+        received = []
+
+        written = downloader.download(START, until, on_rows=received.extend)
+
+        self.assertEqual(written, 98)
+        self.assertEqual(
+            [row[0] for row in received],
+            [ts for ts in range(START, until, INTERVAL) if ts not in missing],
+        )
+
+    def test_download_to_store(self):
+        """ストアに書き込まれ、再実行時は保存済みの続きから取得すること"""
+        with tempfile.TemporaryDirectory() as directory:
+            store = OHLCVStore.open(directory, "fake", "BTCUSDT", "1m")
+            downloader = BulkOHLCVDownloader(
+                FakeExchange(), "BTCUSDT", "1m", page_limit=100
+            )
+
+            downloader.download(START, START + 250 * INTERVAL, store=store)
+            written = downloader.download(START, START + 300 * INTERVAL, store=store)
+
+            self.assertEqual(written, 50)
+            self.assertEqual(
+                [row[0] for row in store.load()],
+                list(range(START, START + 300 * INTERVAL, INTERVAL)),
+            )
+
+    def test_download_before_store_warns(self):
+        """保存済みの最初の足より前の期間は取得せず、警告を出すこと"""
+        with tempfile.TemporaryDirectory() as directory:
+            store = OHLCVStore.open(directory, "fake", "BTCUSDT", "1m")
+            exchange = FakeExchange()
+            downloader = BulkOHLCVDownloader(exchange, "BTCUSDT", "1m", page_limit=100)
+            downloader.download(
+                START + 100 * INTERVAL, START + 200 * INTERVAL, store=store
+            )
+            exchange.calls.clear()
+
+            with self.assertLogs(LOGGER_NAME, level="WARNING") as logs:
+                written = downloader.download(
+                    START, START + 100 * INTERVAL, store=store
+                )
+
+            self.assertEqual(written, 0)
+            self.assertEqual(exchange.calls, [])
+            self.assertIn("保存済みの最初の足より前", logs.output[0])
+            self.assertEqual(store.first_timestamp, START + 100 * INTERVAL)
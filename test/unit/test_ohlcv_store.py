@@ -0,0 +1,57 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.ohlcv_store import OHLCVStore
+
+
+def _bar(i: int) -> list:
+    """テスト用の1本分のデータ"""
+    return [1709692800000 + i * 60000, 100.0 + i, 101.0 + i, 99.0 + i, 100.5 + i, 1.0]
+
+
+class TestOHLCVStore(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.directory = Path(self._tmpdir.name)
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def test_append_and_load(self):
+        """追記した足を古い順に読み込めること。保存済み以前の足は無視されること"""
+        store = OHLCVStore.open(self.directory, "bybit", "BTC/USDT:USDT", "1m")
+
+        self.assertEqual(store.append([_bar(0), _bar(1)]), 2)
+        self.assertEqual(store.append([_bar(1), _bar(2)]), 1)  # _bar(1)は重複
+
+        self.assertEqual(len(store), 3)
+        self.assertEqual(store.first_timestamp, _bar(0)[0])
+        self.assertEqual(store.last_timestamp, _bar(2)[0])
+        self.assertEqual(store.load(), [_bar(i) for i in range(3)])
+        self.assertEqual(store.load(limit=2), [_bar(1), _bar(2)])
+
+    def test_reopen(self):
+        """再度開いても保存済みの足を読み込めること"""
+        store = OHLCVStore.open(self.directory, "bybit", "BTCUSDT", "1m")
+        store.append([_bar(i) for i in range(5)])
+
+        reopened = OHLCVStore.open(self.directory, "bybit", "BTCUSDT", "1m")
+
+        self.assertEqual(len(reopened), 5)
+        self.assertEqual(reopened.first_timestamp, _bar(0)[0])
+        self.assertEqual(reopened.last_timestamp, _bar(4)[0])
+        self.assertEqual(reopened.load(limit=1), [_bar(4)])
+
+    def test_truncate_partial_record(self):
+        """末尾の不完全なレコードは開く際に切り捨てられること"""
+        store = OHLCVStore.open(self.directory, "bybit", "BTCUSDT", "1m")
+        store.append([_bar(0), _bar(1)])
+        with open(store.path, "ab") as f:
+            f.write(b"\x00" * 10)
+
+        reopened = OHLCVStore(store.path)
+
+        self.assertEqual(reopened.load(), [_bar(0), _bar(1)])
+        self.assertEqual(reopened.append([_bar(2)]), 1)
+        self.assertEqual(OHLCVStore(store.path).load(), [_bar(i) for i in range(3)])
@@ -0,0 +1,119 @@
+import random
+import unittest
+from unittest.mock import MagicMock
+
+from src.utils.pnl_tracker import PnLTracker, Trade, TradeJournal
+
+
+def _naive_summary(trades):
+    """従来の実装と同じく取引履歴を走査して集計する"""
+    closed = [trade for trade in trades if trade.pnl is not None]
+    return {
+        "総損益": sum(trade.pnl for trade in closed),
+        "総手数料": sum(trade.fee for trade in trades),
+        "決済回数": len(closed),
+        "勝ち": sum(1 for trade in closed if trade.pnl > 0),
+    }
+
+
+class TestTradeJournal(unittest.TestCase):
+    def test_append_and_access(self):
+        journal = TradeJournal()
+        trades = [
+            Trade(timestamp=1, side="long", price=100.0, amount=0.1, fee=0.5),
+            Trade(timestamp=2, side="sell", price=110.0, amount=0.1, fee=0.6),
+            Trade(timestamp=3, side="short", price=105.0, amount=0.2, pnl=1.5),
+        ]
+        for trade in trades:
+            journal.append(trade)
+
+        self.assertEqual(len(journal), 3)
+        self.assertEqual(journal[0], trades[0])
+        self.assertEqual(journal[-1], trades[2])
+        self.assertEqual(journal[-2:], trades[1:])
+        self.assertEqual(list(journal), trades)
+        with self.assertRaises(IndexError):
+            journal[3]
+
+    def test_set_pnl(self):
+        journal = TradeJournal()
+        index = journal.append(Trade(timestamp=1, side="long", price=100.0, amount=1))
+        self.assertIsNone(journal[index].pnl)
+
+        journal.set_pnl(index, -2.5)
+        self.assertEqual(journal[index].pnl, -2.5)
+
+
+class TestPnLTracker(unittest.TestCase):
+    def setUp(self):
+        self.tracker = PnLTracker(
+            simulation_initial_balance=500,
+            fee_rate=0.00055,
+            leverage=10,
+            discord=MagicMock(),
+        )
+
+    def test_long_round_trip(self):
+        entry = self.tracker.add_trade(1, "long", 100.0, 1.0)
+        self.assertIs(self.tracker.position, entry)
+
+        self.tracker.add_trade(2, "sell", 110.0, 1.0)
+        expected_pnl = 0.1 * 10 * 110.0 - 110.0 * 0.00055 - 100.0 * 0.00055
+
+        self.assertIsNone(self.tracker.position)
+        self.assertAlmostEqual(self.tracker.trades[0].pnl, expected_pnl)
+        self.assertIsNone(self.tracker.trades[1].pnl)
+        summary = self.tracker.get_summary()
+        self.assertAlmostEqual(summary["総損益"], expected_pnl)
+        self.assertAlmostEqual(summary["現在残高"], 500 + expected_pnl)
+        self.assertEqual(summary["決済回数"], 1)
+        self.assertEqual(summary["勝率"], "100.00%")
+
+    def test_running_aggregates_match_full_scan(self):
+        """取引ごとに更新する集計値が、取引履歴を走査した結果と一致すること"""
+        rng = random.Random(0)
+        for i in range(500):
+            price = rng.uniform(90, 110)
+            if self.tracker.position is None:
+                self.tracker.add_trade(i, rng.choice(["long", "short"]), price, 0.01)
+            else:
+                side = "sell" if self.tracker.position.side == "long" else "buy"
+                self.tracker.add_trade(i, side, price, 0.01)
+
+        expected = _naive_summary(list(self.tracker.trades))
+        summary = self.tracker.get_summary()
+        self.assertAlmostEqual(summary["総損益"], expected["総損益"])
+        self.assertAlmostEqual(summary["総手数料"], expected["総手数料"])
+        self.assertEqual(summary["決済回数"], expected["決済回数"])
+        self.assertEqual(
+            summary["勝率"],
+            f"{expected['勝ち'] / expected['決済回数'] * 100:.2f}%",
+        )
+
+    def test_mark_to_market(self):
+        """含み損益を含めた評価額でドローダウン・保有率を更新すること"""
+        self.tracker.mark_to_market(100.0)
+        self.tracker.add_trade(0, "long", 100.0, 1.0)
+        entry_fee = 100.0 * 0.00055
+
+        equity = self.tracker.mark_to_market(90.0)
+        self.assertAlmostEqual(equity, 500 + (-0.1 * 10 * 90.0) - entry_fee)
+        self.assertAlmostEqual(self.tracker.risk.max_drawdown, 1 - equity / 500)
+
+        self.tracker.add_trade(3_600_000, "sell", 90.0, 1.0)
+        self.tracker.mark_to_market(90.0)
+        self.assertAlmostEqual(self.tracker.risk.equity, self.tracker.current_balance)
+        self.assertAlmostEqual(self.tracker.risk.time_in_market, 1 / 3)
+
+        summary = self.tracker.get_summary()
+        self.assertEqual(summary["平均保有時間"], "1:00:00")
+        self.assertEqual(summary["ポジション保有率"], "33.33%")
+
+    def test_empty_summary(self):
+        summary = self.tracker.get_summary()
+        self.assertEqual(summary["決済回数"], 0)
+        self.assertEqual(summary["勝率"], "0.00%")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,166 @@
+import os
+import unittest
+
+import numpy as np
+
+from src.backtest import Backtester
+from src.config.config import Config, DiscordConfig, ExchangeConfig, LoggingConfig
+from src.ohlcv_store import OHLCVStore
+from src.replay import ReplayExchange, Replayer, compare_trades, decision_bars
+from src.strategy.sma_cross import SmaCross, random_walk_ohlcv
+from src.utils.time_utils import SimulatedClock
+
+MINUTE_MS = 60000
+
+
+def _config(dry_run: bool = True) -> Config:
+    return Config(
+        # ログファイルを作成しない
+        logging=LoggingConfig(level="WARNING", file=os.devnull, rotation="none"),
+        exchange=ExchangeConfig(
+            name="bybit",
+            api_key="",
+            api_secret="",
+            symbol="BTCUSDT",
+            position_size=0.01,
+            leverage=10,
+            buy_leverage=10,
+            sell_leverage=10,
+            margin_type="isolated",
+            timeframe="1m",
+            max_position=0.01,
+            retry_count=3,
+            retry_interval=1,
+            testnet=False,
+            dry_run=dry_run,
+            simulation_initial_balance=500,
+            fee_rate=0.00055,
+        ),
+        discord=DiscordConfig("", "", enabled=False),
+    )
+
+
+class TestReplayExchange(unittest.TestCase):
+    def setUp(self):
+        self.ohlcv = random_walk_ohlcv(10)
+        self.base = self.ohlcv[0][0]
+        self.clock = SimulatedClock(self.base + 3 * MINUTE_MS + 30000)
+        self.market = ReplayExchange(self.ohlcv, "1m", self.clock, fee_rate=0.001)
+
+    def test_fetch_ohlcv_hides_future(self):
+        """現在時刻までに始まった足だけを返し、未確定の足は始値だけにすること"""
+        rows = self.market.fetch_ohlcv("BTCUSDT", timeframe="1m", limit=2)
+        forming = self.ohlcv[3]
+
+        self.assertEqual(rows[0], self.ohlcv[2])
+        self.assertEqual(rows[1], [forming[0], *[forming[1]] * 4, 0.0])
+        self.assertEqual(
+            self.market.fetch_ohlcv(
+                "BTCUSDT", timeframe="1m", since=self.base + MINUTE_MS, limit=2
+            ),
+            self.ohlcv[1:3],
+        )
+        self.assertEqual(self.market.fetch_ticker("BTCUSDT")["last"], self.ohlcv[2][4])
+
+        # sleepで時刻が進み、足が確定する
+        self.clock.sleep(30)
+        self.assertEqual(
+            self.market.fetch_ohlcv("BTCUSDT", timeframe="1m", limit=2)[0], forming
+        )
+
+    def test_market_orders(self):
+        """成行注文を直近の確定足の終値で約定させ、reduceOnlyはポジション分だけ約定すること"""
+        order = self.market.create_market_buy_order("BTCUSDT", 0.02)
+        self.assertEqual(order["status"], "closed")
+        self.assertEqual(order["filled"], 0.02)
+        self.assertEqual(order["average"], self.ohlcv[2][4])
+        self.assertEqual(
+            self.market.fetch_position("BTCUSDT"),
+            {"symbol": "BTCUSDT", "contracts": 0.02, "side": "long"},
+        )
+
+        order = self.market.create_market_sell_order(
+            "BTCUSDT", 0.05, params={"reduceOnly": True}
+        )
+        self.assertEqual(order["filled"], 0.02)
+        self.assertEqual(self.market.fetch_position("BTCUSDT")["side"], None)
+        self.assertEqual([fill.side for fill in self.market.fills], ["buy", "sell"])
+
+
+class TestReplayer(unittest.TestCase):
+    def test_dry_run_matches_backtest(self):
+        """DryRunのリプレイで、足ごとの取引がBacktesterと一致すること"""
+        ohlcv = random_walk_ohlcv(300)
+        records = np.array([tuple(row) for row in ohlcv], dtype=OHLCVStore.RECORD_DTYPE)
+        strategy = SmaCross(_config())
+        num_bars = strategy.required_bars * 2
+        result = Replayer(strategy, _config()).run(records)
+
+        # 初期データの最後の足から、最後の1本の前までを確定させる
+        self.assertEqual(result.bars, len(ohlcv) - num_bars)
+        self.assertEqual(result.errors, 0)
+        self.assertFalse(result.aborted)
+        self.assertGreater(len(result.trades), 5)
+
+        config = _config()
+        backtest = Backtester(
+            SmaCross(config), config.exchange, warmup=num_bars - 1
+        ).run(ohlcv[:-1])
+        expected = decision_bars(
+            [(t.timestamp, t.side) for t in backtest.tracker.trades], "1m"
+        )
+        actual = decision_bars([(t.timestamp, t.side) for t in result.trades], "1m")
+        self.assertIsNone(compare_trades(expected, actual))
+        self.assertEqual(
+            [t.price for t in result.trades],
+            [t.price for t in backtest.tracker.trades],
+        )
+        self.assertAlmostEqual(
+            result.exchange.pnl_tracker.total_pnl, backtest.tracker.total_pnl
+        )
+
+    def test_retry_limit_stops_replay(self):
+        """エラーの回数がretry_countを超えたら、プロセスを終了せずに結果を返すこと"""
+
+        class Failing(SmaCross):
+            def should_entry(self, df):
+                raise RuntimeError("テスト用のエラー")
+
+        result = Replayer(Failing(_config()), _config()).run(random_walk_ohlcv(100))
+
+        self.assertTrue(result.aborted)
+        self.assertEqual(result.errors, 4)  # retry_count(3)を超えた回数
+        self.assertEqual(result.bars, 0)
+        self.assertEqual(result.trades, [])
+
+    def test_orders_match_dry_run(self):
+        """注文でのリプレイ(ポジションのキャッシュ・決済注文を使う)がDryRunと一致すること"""
+        ohlcv = random_walk_ohlcv(200, seed=1)
+        dry_run = Replayer(SmaCross(_config()), _config()).run(ohlcv)
+        orders = Replayer(SmaCross(_config()), _config(dry_run=False)).run(ohlcv)
+
+        self.assertEqual(orders.errors, 0)
+        self.assertEqual(
+            decision_bars([(t.timestamp, t.side) for t in orders.trades], "1m"),
+            decision_bars([(t.timestamp, t.side) for t in dry_run.trades], "1m"),
+        )
+        position = dry_run.exchange.pnl_tracker.position
+        self.assertEqual(
+            orders.market.fetch_position("BTCUSDT")["side"],
+            position.side if position else None,
+        )
+
+    def test_compare_trades(self):
+        """最初の不一致の取引を説明すること"""
+        self.assertEqual(
+            decision_bars(
+                [(MINUTE_MS * 3 + 500, "long"), (MINUTE_MS * 5, "sell")], "1m"
+            ),
+            [(MINUTE_MS * 2, "buy"), (MINUTE_MS * 4, "sell")],
+        )
+        self.assertIsNone(compare_trades([(0, "buy")], [(0, "buy")]))
+        self.assertIn("2件目", compare_trades([(0, "buy")], [(0, "buy"), (60, "sell")]))
+
+
+if __name__ == "__main__":
+    unittest.main()
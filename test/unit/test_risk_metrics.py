@@ -0,0 +1,81 @@
+import json
+import math
+import random
+import unittest
+
+import numpy as np
+
+from src.utils.risk_metrics import RiskMetrics
+
+
+def _equity_curve(count: int, seed: int = 0) -> list[float]:
+    rng = random.Random(seed)
+    equity = [1000.0]
+    for _ in range(count - 1):
+        equity.append(equity[-1] * (1 + rng.gauss(0.0005, 0.01)))
+    return equity
+
+
+class TestRiskMetrics(unittest.TestCase):
+    def test_matches_full_history(self):
+        """逐次計算した指標が、全履歴から計算した値と一致すること"""
+        window = 50
+        equity = _equity_curve(1000)
+        risk = RiskMetrics(window=window, periods_per_year=365)
+        for i, value in enumerate(equity):
+            risk.update(value, in_market=i % 3 == 0)
+
+        curve = np.array(equity)
+        returns = curve[1:] / curve[:-1] - 1
+        recent = returns[-window:]
+        downside = np.minimum(recent, 0)
+        max_drawdown = np.max(1 - curve / np.maximum.accumulate(curve))
+
+        self.assertAlmostEqual(risk.max_drawdown, max_drawdown)
+        self.assertAlmostEqual(
+            risk.sharpe(), recent.mean() / recent.std(ddof=1) * math.sqrt(365)
+        )
+        self.assertAlmostEqual(
+            risk.sortino(),
+            recent.mean() / math.sqrt(np.mean(downside**2)) * math.sqrt(365),
+        )
+        self.assertAlmostEqual(risk.time_in_market, 334 / 1000)
+        self.assertAlmostEqual(risk.drawdown, 1 - curve[-1] / curve.max())
+
+    def test_insufficient_data(self):
+        risk = RiskMetrics()
+        self.assertIsNone(risk.sharpe())
+        self.assertEqual(risk.time_in_market, 0.0)
+        self.assertEqual(risk.drawdown, 0.0)
+
+        # 下落がなければソルティノレシオ・ドローダウンは計算しない
+        for value in (100.0, 101.0, 103.0):
+            risk.update(value, in_market=True)
+        self.assertIsNotNone(risk.sharpe())
+        self.assertIsNone(risk.sortino())
+        self.assertEqual(risk.max_drawdown, 0.0)
+
+    def test_restore_state(self):
+        """保存した状態から復元して更新を続けた結果が、続けて更新した場合と一致すること"""
+        equity = _equity_curve(300)
+        reference = RiskMetrics(window=50, periods_per_year=365)
+        first = RiskMetrics(window=50, periods_per_year=365)
+        for i, value in enumerate(equity):
+            reference.update(value, in_market=i % 2 == 0)
+            if i < 200:
+                first.update(value, in_market=i % 2 == 0)
+
+        restored = RiskMetrics(window=50, periods_per_year=365)
+        restored.restore(json.loads(json.dumps(first.state())))
+        for i, value in enumerate(equity[200:], start=200):
+            restored.update(value, in_market=i % 2 == 0)
+
+        self.assertEqual(restored.peak, reference.peak)
+        self.assertEqual(restored.max_drawdown, reference.max_drawdown)
+        self.assertEqual(restored.time_in_market, reference.time_in_market)
+        self.assertAlmostEqual(restored.sharpe(), reference.sharpe())
+        self.assertAlmostEqual(restored.sortino(), reference.sortino())
+
+
+if __name__ == "__main__":
+    unittest.main()
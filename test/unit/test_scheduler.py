@@ -0,0 +1,103 @@
+import unittest
+
+from src.utils.scheduler import CandleCloseScheduler, CandleTimeoutError
+from src.utils.time_utils import Clock
+
+MINUTE_MS = 60000
+BASE_MS = 1709683200000  # 2024-03-06 00:00:00 UTC (1時間の境界)
+
+
+class FakeClock(Clock):
+    """sleepで時刻が進むだけの偽の時計"""
+
+    def __init__(self, now_ms: int):
+        self._now = now_ms / 1000
+        self.sleeps = []
+
+    def time(self) -> float:
+        return self._now
+
+    def monotonic(self) -> float:
+        return self._now
+
+    def sleep(self, seconds: float) -> None:
+        if seconds > 0:
+            self.sleeps.append(seconds)
+            self._now += seconds
+
+
+class FakeFeed:
+    """
+    時計に合わせてOHLCVを返す偽のfetch_ohlcv
+
+    足が確定してからdelay秒経つまでは、新しい足が現れない(取引所側の反映遅れ)
+    """
+
+    def __init__(self, clock: FakeClock, delay: float = 0.0):
+        self.clock = clock
+        self.delay = delay
+        self.calls = []
+
+    def __call__(self, symbol: str, timeframe: str) -> list:
+        self.calls.append((symbol, timeframe))
+        interval = {"1m": MINUTE_MS, "5m": 5 * MINUTE_MS}[timeframe]
+        visible_ms = int((self.clock.time() - self.delay) * 1000)
+        latest = visible_ms // interval * interval
+        return [
+            [latest - interval, 1.0, 1.0, 1.0, 1.0, 1.0],
+            [latest, 1.0, 1.0, 1.0, 1.0, 1.0],
+        ]
+
+
+class TestCandleCloseScheduler(unittest.TestCase):
+    def test_wait_next_polls_until_confirmed(self):
+        """確定時刻まで待機し、新しい足が現れるまでポーリングすること"""
+        clock = FakeClock(BASE_MS + 30000)
+        feed = FakeFeed(clock, delay=0.5)
+        scheduler = CandleCloseScheduler(feed, clock=clock, poll_interval=0.2)
+        scheduler.add("BTCUSDT", "1m")
+
+        self.assertEqual(scheduler.seconds_until_next(), 30.0)
+        event = scheduler.wait_next()
+
+        self.assertEqual(event.bar[0], BASE_MS)  # 確定した足
+        self.assertEqual(event.close_time, BASE_MS + MINUTE_MS)
+        self.assertEqual(event.polls, 3)
+        # 30秒待機した後、0.2秒, 0.4秒の間隔でポーリング
+        self.assertEqual(clock.sleeps, [30.0, 0.2, 0.4])
+
+    def test_multiple_timeframes(self):
+        """複数のシンボル・タイムフレームを確定時刻の順に検知すること"""
+        clock = FakeClock(BASE_MS + 1000)
+        scheduler = CandleCloseScheduler(FakeFeed(clock), clock=clock)
+        scheduler.add("BTCUSDT", "1m")
+        scheduler.add("ETHUSDT", "5m")
+
+        events = [scheduler.wait_next() for _ in range(6)]
+
+        self.assertEqual(
+            [(event.symbol, event.close_time) for event in events],
+            [
+                ("BTCUSDT", BASE_MS + MINUTE_MS),
+                ("BTCUSDT", BASE_MS + 2 * MINUTE_MS),
+                ("BTCUSDT", BASE_MS + 3 * MINUTE_MS),
+                ("BTCUSDT", BASE_MS + 4 * MINUTE_MS),
+                # 同時刻の場合は先に登録されたものから
+                ("ETHUSDT", BASE_MS + 5 * MINUTE_MS),
+                ("BTCUSDT", BASE_MS + 5 * MINUTE_MS),
+            ],
+        )
+
+    def test_timeout(self):
+        """確定足が取得できない場合はタイムアウトし、次の足の確定を待つこと"""
+        clock = FakeClock(BASE_MS + 30000)
+        feed = FakeFeed(clock, delay=90.0)  # 次の足の確定時刻を過ぎても反映されない
+        scheduler = CandleCloseScheduler(
+            feed, clock=clock, poll_interval=1.0, max_poll_interval=1.0, timeout=5.0
+        )
+        scheduler.add("BTCUSDT", "1m")
+
+        with self.assertRaises(CandleTimeoutError):
+            scheduler.wait_next()
+        # 確定時刻(60秒)からtimeout(5秒)後に諦め、次の確定(120秒)を待つ
+        self.assertAlmostEqual(scheduler.seconds_until_next(), 55.0)
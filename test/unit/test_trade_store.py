@@ -0,0 +1,174 @@
+import random
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock
+
+from src.trade_store import TradeStore
+from src.utils.pnl_tracker import PnLTracker
+
+
+def _tracker(store: TradeStore = None) -> PnLTracker:
+    return PnLTracker(
+        simulation_initial_balance=500,
+        fee_rate=0.00055,
+        leverage=10,
+        discord=MagicMock(),
+        store=store,
+    )
+
+
+def _simulate(tracker: PnLTracker, count: int, seed: int = 0) -> None:
+    """エントリーと決済を交互に行う(たまに同じ方向の取引を挟む)"""
+    rng = random.Random(seed)
+    for i in range(count):
+        price = rng.uniform(90, 110)
+        if tracker.position is None:
+            tracker.add_trade(i, rng.choice(["long", "short"]), price, 0.01)
+        elif rng.random() < 0.05:
+            tracker.add_trade(i, tracker.position.side, price, 0.01)
+        else:
+            side = "sell" if tracker.position.side == "long" else "buy"
+            tracker.add_trade(i, side, price, 0.01)
+
+
+class TestTradeStore(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.directory = Path(self._tmpdir.name)
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def test_append_and_read(self):
+        """追記したレコードを古い順に読み込めること。再度開いても読み込めること"""
+        store = TradeStore.open(self.directory, "bybit", "BTC/USDT:USDT")
+        store.append(1, "long", TradeStore.KIND_ENTRY, 100.0, 0.1, 0.5)
+        store.append(2, "sell", TradeStore.KIND_EXIT, 110.0, 0.1, 0.6, 0, 9.0)
+
+        records = store.read()
+        self.assertEqual(len(store), 2)
+        self.assertEqual(records["side"].tolist(), [b"long", b"sell"])
+        self.assertEqual(records["closed_index"].tolist(), [-1, 0])
+        self.assertEqual(records["closed_pnl"][1], 9.0)
+        store.close()
+
+        reopened = TradeStore.open(self.directory, "bybit", "BTC/USDT:USDT")
+        self.assertEqual(len(reopened), 2)
+        self.assertEqual(reopened.read().tobytes(), records.tobytes())
+        reopened.close()
+
+    def test_truncate_partial_record(self):
+        """末尾の不完全なレコードは開いた時に切り捨てること"""
+        store = TradeStore(self.directory / "trades")
+        store.append(1, "long", TradeStore.KIND_ENTRY, 100.0, 0.1, 0.5)
+        store.close()
+        with open(store.path, "ab") as f:
+            f.write(b"\x01\x02\x03")
+
+        reopened = TradeStore(store.path)
+        self.assertEqual(len(reopened), 1)
+        self.assertEqual(
+            reopened.path.stat().st_size,
+            TradeStore.HEADER_SIZE + TradeStore.RECORD_DTYPE.itemsize,
+        )
+        reopened.close()
+
+    def test_invalid_file(self):
+        path = self.directory / "trades"
+        path.write_bytes(b"NOTATRADESTOREFILE")
+        with self.assertRaises(ValueError):
+            TradeStore(path)
+        with self.assertRaises(ValueError):
+            TradeStore(self.directory / "other", fsync="sometimes")
+
+    def test_fsync_never_buffers_until_close(self):
+        """fsync="never"の場合はclose時にまとめて書き出すこと"""
+        store = TradeStore(self.directory / "trades", fsync="never")
+        store.append(1, "long", TradeStore.KIND_ENTRY, 100.0, 0.1, 0.5)
+        self.assertEqual(store.path.stat().st_size, TradeStore.HEADER_SIZE)
+
+        store.close()
+        self.assertEqual(
+            store.path.stat().st_size,
+            TradeStore.HEADER_SIZE + TradeStore.RECORD_DTYPE.itemsize,
+        )
+
+
+class TestPnLTrackerRestore(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.path = Path(self._tmpdir.name) / "trades"
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def _assert_same_state(self, restored: PnLTracker, original: PnLTracker) -> None:
+        self.assertEqual(restored.get_summary(), original.get_summary())
+        self.assertEqual(restored.current_balance, original.current_balance)
+        self.assertEqual(restored.total_fee, original.total_fee)
+        self.assertEqual(restored.win_trades, original.win_trades)
+        self.assertEqual(restored.total_hold_ms, original.total_hold_ms)
+        self.assertEqual(list(restored.trades), list(original.trades))
+        self.assertEqual(restored.position, original.position)
+        self.assertEqual(restored._position_index, original._position_index)
+
+    def test_restore_matches_original(self):
+        """保存した取引から、元のPnLTrackerと同じ状態を復元できること"""
+        for count in (1, 2, 501):
+            with self.subTest(count=count):
+                path = self.path.with_name(f"trades_{count}")
+                original = _tracker(TradeStore(path, fsync="never"))
+                _simulate(original, count)
+                original.store.close()
+
+                restored = _tracker(TradeStore(path))
+                self._assert_same_state(restored, original)
+                restored.store.close()
+
+    def test_continue_after_restore(self):
+        """復元後に取引を続けた結果が、再起動しなかった場合と一致すること"""
+        reference = _tracker()
+        _simulate(reference, 300)
+        sequence = [
+            (trade.timestamp, trade.side, trade.price, trade.amount)
+            for trade in reference.trades
+        ]
+
+        first = _tracker(TradeStore(self.path))
+        for trade in sequence[:150]:
+            first.add_trade(*trade)
+        first.store.close()
+
+        restored = _tracker(TradeStore(self.path))
+        for trade in sequence[150:]:
+            restored.add_trade(*trade)
+        self._assert_same_state(restored, reference)
+        restored.store.close()
+
+        self._assert_same_state(_tracker(TradeStore(self.path)), reference)
+
+    def test_restore_risk_metrics(self):
+        """足ごとに保存したリスク指標(最大ドローダウンなど)も復元されること"""
+        original = _tracker(TradeStore(self.path))
+        rng = random.Random(0)
+        for i in range(200):
+            price = rng.uniform(90, 110)
+            if i % 10 == 0:
+                if original.position is None:
+                    original.add_trade(i, "long", price, 0.01)
+                else:
+                    original.add_trade(i, "sell", price, 0.01)
+            original.mark_to_market(price)
+        original.store.close()
+
+        restored = _tracker(TradeStore(self.path))
+
+        self.assertGreater(original.risk.max_drawdown, 0)
+        self.assertEqual(restored.risk.state(), original.risk.state())
+        self.assertEqual(restored.get_summary(), original.get_summary())
+        restored.store.close()
+
+
+if __name__ == "__main__":
+    unittest.main()